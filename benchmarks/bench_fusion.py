@@ -0,0 +1,60 @@
+"""Per-element cost of a map/filter/peek chain against its length, with the
+compile step fusing adjacent stateless ops and with it switched off.
+
+    python benchmarks/bench_fusion.py
+
+Each chain alternates map and filter (the filter keeps everything) and ends in
+for_each(), which must visit every element: count() would not, as a chain
+that starts with a map() over a list is SIZED and counted without running.
+The figure is the best of nine runs over 20,000 elements, in nanoseconds per
+element. "sync" drives a list source, so the whole chain runs
+through accept_sync(); "async" drives an async generator, so it does not."""
+
+import asyncio
+import time
+from collections.abc import AsyncGenerator
+from unittest import mock
+
+from snakestream import Stream
+
+N = 20_000
+LENGTHS = (1, 2, 4, 8, 16)
+
+
+def _discard(_: int) -> None:
+    pass
+
+
+async def _agen(n: int) -> AsyncGenerator[int, None]:
+    for i in range(n):
+        yield i
+
+
+def _chain(stream: Stream, length: int) -> Stream:
+    for i in range(length):
+        stream = stream.map(lambda x: x + 1) if i % 2 == 0 else stream.filter(lambda x: x >= 0)
+    return stream
+
+
+async def _best(length: int, source: str) -> float:
+    best = float("inf")
+    for _ in range(9):
+        stream = Stream.of(list(range(N)) if source == "sync" else _agen(N))
+        started = time.perf_counter()
+        await _chain(stream, length).for_each(_discard)
+        best = min(best, time.perf_counter() - started)
+    return best / N * 1e9
+
+
+async def main() -> None:
+    print(f"{'ops':>4} {'source':>6} {'unfused':>9} {'fused':>9}")
+    for source in ("sync", "async"):
+        for length in LENGTHS:
+            with mock.patch("snakestream.execution._compile", list):
+                unfused = await _best(length, source)
+            fused = await _best(length, source)
+            print(f"{length:>4} {source:>6} {unfused:>9.0f} {fused:>9.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
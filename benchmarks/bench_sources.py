@@ -0,0 +1,88 @@
+"""Per-element cost of the sync source paths, each against an await per
+element, as they were pulled before every sync source was held as a
+SyncSource and iterated with a plain `for`.
+
+    python benchmarks/bench_sources.py
+
+"filter" is filter(bool).count() over a range: the filter clears SIZED, so
+count() has to run the chain rather than read the size. "iterator" is an
+`async for` over iterator() on a range; awaited, stream_through() pulls the
+SyncSource with `async for` as it used to. "__next__" is filter(bool).count()
+over an iterator with only __next__, no __iter__; awaited, it is pulled
+through an async generator as it used to be. The figure is the best of five
+runs over 10**6 elements, in nanoseconds per element."""
+
+import asyncio
+import time
+from collections.abc import AsyncGenerator, Callable, Coroutine, Iterator
+from contextlib import AbstractContextManager, nullcontext
+from typing import Any
+from unittest import mock
+
+from snakestream import Stream
+from snakestream.execution import _stream
+
+N = 10**6
+
+
+class _NextOnly:
+    """An iterator with __next__ and nothing else."""
+
+    def __init__(self, n: int) -> None:
+        self._it = iter(range(n))
+
+    def __next__(self) -> int:
+        return next(self._it)
+
+
+async def _agen(it: Iterator[int]) -> AsyncGenerator[int, None]:
+    for i in it:
+        yield i
+
+
+async def _filter(source: Any) -> None:
+    await Stream.of(source).filter(bool).count()
+
+
+async def _iterator(source: Any) -> None:
+    async for _ in Stream.of(source).iterator():
+        pass
+
+
+def _pulled_with_async_for() -> AbstractContextManager[Any]:
+    return mock.patch("snakestream.execution._stream_sync", lambda chain, source, state: _stream(chain, source, state, None))
+
+
+Case = tuple[
+    Callable[[Any], Coroutine[Any, Any, None]], Callable[[], Any], Callable[[], Any], Callable[[], AbstractContextManager[Any]]
+]
+
+# run, awaited source, sync source, what else the awaited run needs
+CASES: dict[str, Case] = {
+    "filter": (_filter, lambda: _agen(iter(range(N))), lambda: range(N), nullcontext),
+    "iterator": (_iterator, lambda: range(N), lambda: range(N), _pulled_with_async_for),
+    "__next__": (_filter, lambda: _agen(iter(_NextOnly(N).__next__, None)), lambda: _NextOnly(N), nullcontext),
+}
+
+
+async def _best(run: Callable[[Any], Coroutine[Any, Any, None]], source: Callable[[], Any]) -> float:
+    best = float("inf")
+    for _ in range(5):
+        s = source()
+        started = time.perf_counter()
+        await run(s)
+        best = min(best, time.perf_counter() - started)
+    return best / N * 1e9
+
+
+async def main() -> None:
+    print(f"{'path':>9} {'awaited':>8} {'sync':>7}")
+    for name, (run, awaited_source, sync_source, awaiting) in CASES.items():
+        with awaiting():
+            awaited = await _best(run, awaited_source)
+        synced = await _best(run, sync_source)
+        print(f"{name:>9} {awaited:>8.0f} {synced:>7.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
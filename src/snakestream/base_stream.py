@@ -3,35 +3,39 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Any, Generic, cast
 from collections.abc import AsyncGenerator, AsyncIterable
 
-from snakestream.exception import IllegalStateException
-from snakestream.execution import RACING, SEQUENTIAL, Executor, _wrap_sink as _wrap_sink
-from snakestream.sink import Op, TerminalSink
+from snakestream.characteristics import Characteristic
+from snakestream.exception import IllegalStateException, StreamBuildException
+from snakestream.execution import (
+    MAX_WORKERS,
+    PIPELINE_QUEUE_SIZE,
+    PROCESSES,
+    RACING,
+    SEQUENTIAL,
+    TEE_BUFFER,
+    AdaptiveRacing,
+    Executor,
+    OrderedRacing,
+    Pipelined,
+    Processes,
+    Racing,
+    Sequential,
+    Threaded,
+    _Prefetched,
+    _Tee,
+    _wrap_sink as _wrap_sink,
+)
+from snakestream.ops import _LimitOp, _SkipOp, _SortedOp
+from snakestream.sink import Op, StatelessOp, TerminalSink
+from snakestream.source import SyncSource
 from snakestream.type import T, CloseHandler
 
 if TYPE_CHECKING:
     from snakestream.stream import Stream  # pragma: no cover
 
 
-async def _normalize(source: Any) -> AsyncGenerator:
-    if isinstance(source, (dict, str, bytes)):
-        yield source
-    elif hasattr(source, "__iter__"):
-        for i in source:
-            yield i
-    elif hasattr(source, "__next__"):
-        # A bare sync iterator, implementing only __next__. It can't be driven
-        # with `for`, and StopIteration must not escape: PEP 479 turns one
-        # raised inside an async generator into RuntimeError. Only the next()
-        # call is guarded, so a StopIteration thrown in at the yield still
-        # propagates to the caller rather than silently ending the stream.
-        while True:
-            try:
-                i = next(source)
-            except StopIteration:
-                return
-            yield i
-    else:
-        yield source
+# Never returned by anything, so iter(x.__next__, _NEVER) runs until
+# x.__next__ raises StopIteration, which iter() takes as the end
+_NEVER = object()
 
 
 def _accept(source: Any) -> AsyncGenerator | None:
@@ -40,9 +44,27 @@ def _accept(source: Any) -> AsyncGenerator | None:
     return None
 
 
+def _source(source: Any) -> AsyncGenerator:
+    """Whatever a stream was built over, as something it can pull from. An
+    async source is taken as it is; anything else is a SyncSource, for the
+    drivers that pull it with a plain `for`: an iterable over its elements, a
+    bare iterator (__next__ with no __iter__) through iter(), and a single
+    value - a str, bytes or dict included - as a stream of that one value."""
+    accepted = _accept(source)
+    if accepted is not None:
+        return accepted
+    if isinstance(source, (dict, str, bytes)):
+        return cast(AsyncGenerator, SyncSource((source,)))
+    if hasattr(source, "__iter__"):
+        return cast(AsyncGenerator, SyncSource(source))
+    if hasattr(source, "__next__"):
+        return cast(AsyncGenerator, SyncSource(iter(source.__next__, _NEVER)))
+    return cast(AsyncGenerator, SyncSource((source,)))
+
+
 class BaseStream(Generic[T]):
     def __init__(self, source: Any, close_handlers: list[CloseHandler] | None = None) -> None:
-        self._stream: AsyncGenerator[T, None] = _accept(source) or _normalize(source)
+        self._stream: AsyncGenerator[T, None] = _source(source)
         self._chain: list[Op] = []
         self._close_handlers: list[CloseHandler] = [] if close_handlers is None else close_handlers
         self._ordered: bool = True
@@ -64,14 +86,48 @@ class BaseStream(Generic[T]):
 
     def _compose(self) -> AsyncGenerator[T, None]:
         """The chain as a generator, under this stream's executor."""
-        return self._executor.elements(self._chain, self._stream)
+        return self._executor.elements(self._pushed_down(self._chain), self._stream)
 
     async def _evaluate(self, terminal: TerminalSink[Any]) -> Any:
         """The chain driven into a terminal sink, under this stream's executor.
         The one place a stream's execution mode is consulted; a terminal that
-        needs encounter order regardless of mode names SEQUENTIAL itself."""
+        needs encounter order regardless of mode asks _ordered_executor()."""
         self._check_not_consumed()
-        return await self._executor.value(self._chain, self._stream, terminal)
+        return await self._executor.value(self._pushed_down(self._chain), self._stream, terminal)
+
+    def _pushed_down(self, chain: list[Op]) -> list[Op]:
+        """The chain to run, less any skip() and limit() at its head, which are
+        applied to a sync source instead (see SyncSource.narrow): Stream.of(a
+        list).skip(10**6).limit(10) then touches ten elements, not a million
+        and ten. Only the head, as anything before them would have to see what
+        they drop. Narrows the source as a side effect, so call it only on the
+        way into a run."""
+        source = self._stream
+        if not isinstance(source, SyncSource):
+            return chain
+        start, stop = 0, None
+        head = 0
+        for op in chain:
+            if type(op) not in (_SkipOp, _LimitOp):
+                break
+            # a negative skip or limit is taken as 0, as their sinks take it,
+            # not as slicing from the end
+            n = max(cast(StatelessOp, op)._args[0], 0)
+            if type(op) is _SkipOp:
+                start += n
+                if stop is not None:
+                    start = min(start, stop)
+            else:
+                stop = start + n if stop is None else min(stop, start + n)
+            head += 1
+        if head:
+            source.narrow(start, stop)
+        return chain[head:]
+
+    def _ordered_executor(self) -> Executor:
+        """The executor for a terminal that needs encounter order: this stream's
+        own when it keeps that order, SEQUENTIAL when it does not."""
+        return self._executor if self._executor.preserves_order else SEQUENTIAL
 
     def _derive_executor(self, executor: Executor) -> Any:
         """A mode switch: a new stream over the SAME source and the SAME queued
@@ -96,8 +152,102 @@ class BaseStream(Generic[T]):
     def sequential(self) -> Stream[T]:
         return cast("Stream[T]", self._derive_executor(SEQUENTIAL))
 
-    def parallel(self) -> Stream[T]:
-        return cast("Stream[T]", self._derive_executor(RACING))
+    def batched(self, size: int) -> Stream[T]:
+        """Sequential, with elements moving down the chain in lists of up to
+        `size` rather than one at a time: one await per op per list instead of
+        per element. The price is granularity - each op sees a whole list
+        before the next op sees any of it, and a short-circuit is noticed only
+        between lists. A mode switch, like sequential() and parallel()."""
+        if size < 1:
+            raise StreamBuildException(f"batched() needs a size of at least 1, got {size}")
+        return cast("Stream[T]", self._derive_executor(Sequential(size)))
+
+    def pipelined(self, queue_size: int = PIPELINE_QUEUE_SIZE) -> Stream[T]:
+        """Each op of the chain in a task of its own, handing its output to
+        the next through a queue of at most `queue_size` elements, so that a
+        slow stage overlaps the stages around it instead of holding them up.
+        Encounter order is kept. A mode switch, like sequential() and
+        parallel(). See Pipelined."""
+        if queue_size < 1:
+            raise StreamBuildException(f"pipelined() needs a queue_size of at least 1, got {queue_size}")
+        return cast("Stream[T]", self._derive_executor(Pipelined(queue_size)))
+
+    def prefetch(self, n: int) -> Stream[T]:
+        """The same stream, with an async source pulled up to `n` elements
+        ahead of the chain by a background task, so that its I/O overlaps the
+        work done on what it already gave (see _Prefetched). It applies to the
+        source wherever in the chain it is called, like a mode switch. A sync
+        source is left as it is: pulling one never awaits, so there is nothing
+        to overlap, and it keeps the drivers that pull it with a plain `for`."""
+        if n < 1:
+            raise StreamBuildException(f"prefetch() needs n of at least 1, got {n}")
+        self._check_not_consumed()
+        source = self._stream
+        if not isinstance(source, SyncSource):
+            source = cast(AsyncGenerator, _Prefetched(source, n))
+        new_stream = type(self)(source, self._close_handlers)
+        new_stream._chain = self._chain
+        new_stream._ordered = self._ordered
+        new_stream._executor = self._executor
+        self._consumed = True
+        return cast("Stream[T]", new_stream)
+
+    def tee(self, n: int = 2, *, buffer: int = TEE_BUFFER) -> tuple[Stream[T], ...]:
+        """`n` sequential streams, each of every element of this one, from one
+        run of its chain over its source: for several terminals over a source
+        too costly to read twice. A branch more than `buffer` elements ahead of
+        the slowest waits for it, so the branches must be consumed together,
+        e.g. under asyncio.gather(), and each consumed to its end or closed;
+        one consumed alone past `buffer` raises IllegalStateException rather
+        than waiting forever on a branch never pulled. For several collectors, collect_all() does the same in one terminal."""
+        if n < 1:
+            raise StreamBuildException(f"tee() needs n of at least 1, got {n}")
+        if buffer < 1:
+            raise StreamBuildException(f"tee() needs a buffer of at least 1, got {buffer}")
+        self._check_not_consumed()
+        branches = _Tee(self._compose(), n, buffer).branches()
+        self._consumed = True
+        return tuple(cast("Stream[T]", type(self)(branch, self._close_handlers)) for branch in branches)
+
+    def parallel(
+        self,
+        *,
+        workers: int | None = None,
+        processes: int | None = None,
+        threads: int | None = None,
+        ordered: bool = False,
+        adaptive: bool = False,
+    ) -> Stream[T]:
+        """Racing asyncio branches by default, `workers` of them (PROCESSES if
+        not given). With `processes`, a pool of that many worker processes
+        instead, for CPU-bound map/filter/peek callables; with `threads`,
+        racing branches whose sync callables run on a pool of that many
+        threads, for blocking ones. See Processes and Threaded.
+
+        `ordered` keeps encounter order while racing, through a bounded reorder
+        buffer (see OrderedRacing). The process pool keeps it regardless.
+
+        `adaptive` leaves the branch count to the run: it grows and shrinks
+        between one and `workers` (MAX_WORKERS if not given) on the observed
+        throughput and latency, and parallelism() reports where it settled.
+        See AdaptiveRacing."""
+        if sum(n is not None for n in (workers, processes, threads)) > 1:
+            raise StreamBuildException("parallel() takes one of workers, processes or threads")
+        if adaptive and (ordered or processes is not None or threads is not None):
+            raise StreamBuildException("adaptive parallel() races unordered asyncio branches only")
+        for name, n in (("workers", workers), ("processes", processes), ("threads", threads)):
+            if n is not None and n < 1:
+                raise StreamBuildException(f"parallel() needs {name} of at least 1, got {n}")
+        executor: Executor = RACING if workers is None else Racing(workers)
+        if adaptive:
+            executor = AdaptiveRacing(MAX_WORKERS if workers is None else workers)
+        elif processes is not None:
+            executor = Processes(processes)
+        elif threads is not None:
+            executor = Threaded(threads, ordered)
+        elif ordered:
+            executor = OrderedRacing(PROCESSES if workers is None else workers)
+        return cast("Stream[T]", self._derive_executor(executor))
 
     def iterator(self) -> AsyncGenerator[T, None]:
         self._check_not_consumed()
@@ -110,6 +260,39 @@ class BaseStream(Generic[T]):
     def is_ordered(self) -> bool:
         return self._ordered
 
+    def characteristics(self) -> Characteristic:
+        """What is known of the elements this stream would yield, without
+        running it: what the source promises (a list is SIZED; a range is
+        SIZED, DISTINCT and SORTED), as each op in the chain keeps, clears or
+        sets it. map() keeps the size but not the order or distinctness,
+        filter() the reverse, sorted() makes it SORTED, distinct() DISTINCT.
+        Racing branches lose the order until a sorted() puts one back."""
+        source = self._stream
+        known = source.characteristics() if isinstance(source, SyncSource) else Characteristic.NONE
+        if self._ordered:
+            known |= Characteristic.ORDERED
+        raced = not self._executor.preserves_order
+        for op in self._chain:
+            known = op.characteristics(known)
+            if type(op) is _SortedOp:
+                raced = False
+        if raced:
+            known &= ~(Characteristic.ORDERED | Characteristic.SORTED)
+        if self._size() is not None:
+            known |= Characteristic.SIZED
+        return known
+
+    def _size(self) -> int | None:
+        """How many elements this stream would yield, if the source knows its
+        size and every op in the chain knows what it makes of it."""
+        source = self._stream
+        size = source.size() if isinstance(source, SyncSource) else None
+        for op in self._chain:
+            if size is None:
+                break
+            size = op.size(size)
+        return size
+
     def on_close(self, close_handler: CloseHandler) -> BaseStream[T]:
         self._close_handlers.append(close_handler)
         return self
@@ -126,3 +309,9 @@ class BaseStream(Generic[T]):
 
     def is_parallel(self) -> bool:
         return self._executor.is_parallel
+
+    def parallelism(self) -> int:
+        """How many branches or workers a terminal would run this stream
+        across: 1 when sequential. Under adaptive racing, the count the run
+        settled on once a terminal has run, and its starting count before."""
+        return self._executor.parallelism
@@ -80,3 +80,24 @@ def _classify_step(fn: Callable, is_async: bool, checked: bool, *args: Any) -> t
     if not checked and isawaitable(result):
         return result, True, True
     return result, is_async, True
+
+
+async def _apply_each(fn: Callable, is_async: bool, checked: bool, elements: list[Any]) -> tuple[list[Any], bool, bool]:
+    # The canonical shape over a batch, for sinks given a list at a time:
+    # every element's result, in order, with the classification carried in
+    # and out the way _classify_step() does. Only the first element of a
+    # composition is ever checked, so once that is settled the whole batch is
+    # one comprehension. The async form awaits each call before making the
+    # next, as per-element dispatch would, so nothing is left un-awaited if
+    # one of them raises.
+    if not checked and elements:
+        first = fn(elements[0])
+        if not is_async and isawaitable(first):
+            is_async = True
+        if is_async:
+            first = await first
+        rest, is_async, checked = await _apply_each(fn, is_async, True, elements[1:])
+        return [first, *rest], is_async, checked
+    if is_async:
+        return [await fn(e) for e in elements], is_async, checked
+    return [fn(e) for e in elements], is_async, checked
@@ -0,0 +1,17 @@
+"""What is known of a stream's elements without looking at them, after Java's
+Spliterator characteristics: set by the source, and passed on, cleared or set
+by each operation in turn (see Op.characteristics and Op.size)."""
+
+from enum import IntFlag
+
+
+class Characteristic(IntFlag):
+    NONE = 0
+    # the elements have an encounter order (see unordered())
+    ORDERED = 1
+    # no two elements are equal
+    DISTINCT = 2
+    # the elements are in ascending natural order
+    SORTED = 4
+    # the number of elements is known before the stream runs
+    SIZED = 8
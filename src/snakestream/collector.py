@@ -5,14 +5,15 @@
 
 from __future__ import annotations
 
+from functools import partial
 from inspect import isawaitable
 from typing import Any, Generic, NamedTuple, Protocol, TypeVar, cast, overload
 from collections.abc import AsyncGenerator, Awaitable, Callable
 
 from snakestream.execution import _maybe_aclosing
-from snakestream.callable_dispatch import AsyncDispatch, _classify_step, _maybe_await, is_async_callable
+from snakestream.callable_dispatch import AsyncDispatch, _apply_each, _classify_step, _maybe_await, is_async_callable
 from snakestream.exception import StreamBuildException
-from snakestream.sink import Counter, TerminalSink, _UNSET
+from snakestream.sink import AwaitRequired, Counter, TerminalSink, _UNSET
 from snakestream.sort import is_new_extremum
 from snakestream.type import (
     A,
@@ -26,6 +27,7 @@ from snakestream.type import (
     Mapper,
     NumberMapper,
     Predicate,
+    StateMap,
     Supplier,
 )
 
@@ -87,11 +89,69 @@ class _CollectorSink(AsyncDispatch, TerminalSink[T]):
                 self._is_async = True
                 await r
 
+    def accept_sync(self, element: Any) -> None:
+        if self._is_async:
+            raise AwaitRequired(self.accept(element))
+        r = self._fn(self._container, element)
+        if not self._checked:
+            self._checked = True
+            if isawaitable(r):
+                self._is_async = True
+                raise AwaitRequired(r)
+
+    async def accept_batch(self, elements: list[Any]) -> None:
+        accumulate = partial(self._fn, self._container)
+        _, self._is_async, self._checked = await _apply_each(accumulate, self._is_async, self._checked, elements)
+
     def _finish(self, container: Any) -> Any:
         finisher = self._collector.finisher
         return container if finisher is None else finisher(container)
 
 
+class _CollectAllSink(TerminalSink[T]):
+    """Several collectors fed in one pass: each element accepted by a
+    _CollectorSink per collector in turn, and the result a tuple of theirs, in
+    the order the collectors were given."""
+
+    def __init__(self, collectors: tuple[Collector[Any, Any, Any], ...]) -> None:
+        super().__init__()
+        self._sinks = [_CollectorSink(collector) for collector in collectors]
+
+    def _create_container(self) -> Any:
+        return None
+
+    async def begin(self, state_map: StateMap) -> None:
+        await super().begin(state_map)
+        for sink in self._sinks:
+            await sink.begin(state_map)
+
+    async def accept(self, element: Any) -> None:
+        for sink in self._sinks:
+            await sink.accept(element)
+
+    def accept_sync(self, element: Any) -> None:
+        for i, sink in enumerate(self._sinks):
+            try:
+                sink.accept_sync(element)
+            except AwaitRequired as e:
+                # the rest of the sinks still have this element to take
+                raise AwaitRequired(self._accept_rest(e.pending, element, i + 1)) from None
+
+    async def _accept_rest(self, pending: Awaitable[None], element: Any, start: int) -> None:
+        await pending
+        for sink in self._sinks[start:]:
+            await sink.accept(element)
+
+    async def accept_batch(self, elements: list[Any]) -> None:
+        for sink in self._sinks:
+            await sink.accept_batch(elements)
+
+    async def end(self) -> None:
+        for sink in self._sinks:
+            await sink.end()
+        self._result = tuple(sink.result() for sink in self._sinks)
+
+
 class StreamingCollector:
     """The one collect() argument that is not a Collector: wraps a
     `(composition) -> AsyncGenerator` callable for a lazy, streaming result.
@@ -652,6 +712,55 @@ def collecting_and_then(downstream: Collector[T, Any, R], finisher: Finisher[R,
     return Collector(_supply, _accumulate, finisher=_finish)
 
 
+class _TeeingBox:
+    __slots__ = ("containers", "acc_is_async", "acc_checked")
+
+    def __init__(self, containers: list[Any]) -> None:
+        self.containers = containers
+        self.acc_is_async = [False] * len(containers)
+        self.acc_checked = [False] * len(containers)
+
+
+async def _finish_teeing(downstreams: tuple[Collector[Any, Any, Any], ...], merger: Callable, containers: list[Any]) -> Any:
+    results = []
+    for downstream, container in zip(downstreams, containers):
+        finisher = downstream.finisher
+        results.append(await _maybe_await(finisher, container) if finisher is not None else container)
+    return await _maybe_await(merger, *results)
+
+
+def teeing(*args: Any) -> Collector[Any, Any, Any]:
+    """teeing(downstream, ..., merger): every element accumulated into each
+    downstream's container in one pass, and `merger` (sync or async) called
+    with their finished results, in the order given. Java's teeing() takes
+    exactly two downstreams; this takes one or more."""
+    if len(args) < 2:
+        raise StreamBuildException("teeing() needs at least one downstream Collector and a merger")
+    *collectors, merger = args
+    for downstream in collectors:
+        _check_downstream(downstream)
+    if isinstance(merger, Collector) or not callable(merger):
+        raise StreamBuildException("teeing() needs a merger after its downstream Collectors")
+    downstreams = tuple(collectors)
+
+    async def _supply() -> _TeeingBox:
+        return _TeeingBox([await _maybe_await(downstream.supplier) for downstream in downstreams])
+
+    async def _accumulate(container: _TeeingBox, element: Any) -> None:
+        is_async, checked = container.acc_is_async, container.acc_checked
+        for i, downstream in enumerate(downstreams):
+            r, is_async[i], checked[i] = _classify_step(
+                downstream.accumulator, is_async[i], checked[i], container.containers[i], element
+            )
+            if is_async[i]:
+                await r
+
+    def _finish(container: _TeeingBox) -> Any:
+        return _finish_teeing(downstreams, merger, container.containers)
+
+    return Collector(_supply, _accumulate, finisher=_finish)
+
+
 class _SupportsAdd(Protocol):
     def add(self, item: Any) -> Any: ...
 
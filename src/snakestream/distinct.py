@@ -0,0 +1,157 @@
+"""How distinct() remembers what it has already let through.
+
+A strategy is a zero-argument callable returning a fresh, empty record of what
+has been seen, one per composition (see _DistinctOp.make_shared_state); racing
+branches share that one record. The record is anything with `in` and `add()`,
+checked and added to with no await between, which is what keeps it correct
+across branches. `set` itself is the exact strategy, and the default."""
+
+from __future__ import annotations
+
+import math
+import pickle
+from collections import OrderedDict
+from functools import partial
+from hashlib import blake2b
+from time import monotonic
+from typing import Any, Protocol
+from collections.abc import Callable
+
+
+class Seen(Protocol):
+    """distinct() calls add() only straight after an `in` that missed, for the
+    same value, so a record may keep what `in` worked out for add() to use."""
+
+    def __contains__(self, value: Any, /) -> bool: ...
+
+    def add(self, value: Any, /) -> None: ...
+
+
+Strategy = Callable[[], Seen]
+
+
+def exact() -> Strategy:
+    """Every element ever seen, in a set: exact, and grows with the number of
+    distinct elements."""
+    return set
+
+
+def recent(maxsize: int | None = None, ttl: float | None = None) -> Strategy:
+    """Only the last `maxsize` distinct elements seen, or only those seen in the
+    last `ttl` seconds, or both: an element drops out of the record once either
+    bound passes it, and is let through again if it comes back. Memory is
+    bounded by `maxsize`, or by how many distinct elements arrive in `ttl`."""
+    if maxsize is None and ttl is None:
+        raise ValueError("recent() needs a maxsize, a ttl, or both")
+    if maxsize is not None and maxsize < 1:
+        raise ValueError(f"maxsize must be at least 1, got {maxsize}")
+    if ttl is not None and ttl <= 0:
+        raise ValueError(f"ttl must be positive, got {ttl}")
+    return partial(Recent, maxsize, ttl)
+
+
+def bloom(capacity: int, error_rate: float = 0.01) -> Strategy:
+    """A Bloom filter sized for `capacity` distinct elements at a false
+    positive rate of `error_rate`: fixed memory, about 1.2 bytes per element
+    of capacity at 1%, however long the stream runs. A false positive drops an
+    element that was never seen; nothing seen is ever let through twice. Past
+    `capacity` the rate climbs."""
+    if capacity < 1:
+        raise ValueError(f"capacity must be at least 1, got {capacity}")
+    if not 0 < error_rate < 1:
+        raise ValueError(f"error_rate must be between 0 and 1, got {error_rate}")
+    return partial(Bloom, capacity, error_rate)
+
+
+class Recent:
+    """The record behind recent(): elements in the order they were last seen,
+    each with when. Seeing one again moves it to the back and restamps it, so
+    the front is always the first to go, by either bound."""
+
+    __slots__ = ("maxsize", "ttl", "_seen", "_now")
+
+    def __init__(self, maxsize: int | None, ttl: float | None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._seen: OrderedDict[Any, float] = OrderedDict()
+        self._now = 0.0
+
+    def __contains__(self, value: Any) -> bool:
+        seen = self._seen
+        self._now = now = monotonic()
+        if self.ttl is not None:
+            horizon = now - self.ttl
+            while seen and next(iter(seen.values())) <= horizon:
+                seen.popitem(last=False)
+        if value in seen:
+            seen.move_to_end(value)
+            seen[value] = now
+            return True
+        return False
+
+    def add(self, value: Any) -> None:
+        # always straight after a miss, so the clock read there still holds
+        self._seen[value] = self._now
+        if self.maxsize is not None and len(self._seen) > self.maxsize:
+            self._seen.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+
+_MASK = (1 << 64) - 1
+
+# hashed alongside each element: hash() of a small int is the int itself, and
+# a tuple's hash mixes its items, so consecutive ints land far apart
+_SALT = 0x5BD1E995
+
+
+class Bloom:
+    """The record behind bloom(): `bits` bits, and `hashes` of them set per
+    element, at positions derived from its hash() by double hashing. The
+    sizes are the textbook optimum for `capacity` and `error_rate`.
+
+    About 4us per element, against a set's 0.25us: the price of fixed memory
+    in pure Python."""
+
+    __slots__ = ("bits", "hashes", "_array", "_positions")
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self._array = bytearray((self.bits + 7) // 8)
+        # the positions `in` worked out, for the add() that always follows a miss
+        self._positions: list[int] = []
+
+    def __contains__(self, value: Any) -> bool:
+        h = hash((value, _SALT)) & _MASK
+        first, step, bits = h >> 32, h & 0xFFFFFFFF | 1, self.bits
+        self._positions = positions = [p % bits for p in range(first, first + self.hashes * step, step)]
+        array = self._array
+        for p in positions:
+            if not array[p >> 3] >> (p & 7) & 1:
+                return False
+        return True
+
+    def add(self, value: Any) -> None:
+        array = self._array
+        for p in self._positions:
+            array[p >> 3] |= 1 << (p & 7)
+
+
+def _digest(value: Any) -> int:
+    """A 64-bit blake2b digest of `value`, to remember in its place: a small
+    int whatever the key was, and defined for a key that is not hashable. Two
+    keys share one with odds of about n**2 / 2**65 over n distinct keys. A tag
+    byte keeps "a" and b"a" apart; anything but str and bytes is pickled.
+
+    Keys are told apart by that encoding, not by ==: 1, 1.0 and True, or two
+    equal dicts filled in a different order, pickle differently and so are
+    different keys here."""
+    if type(value) is str:
+        data = b"s" + value.encode("utf-8", "surrogatepass")
+    elif type(value) is bytes:
+        data = b"b" + value
+    else:
+        data = b"p" + pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+    return int.from_bytes(blake2b(data, digest_size=8).digest(), "little")
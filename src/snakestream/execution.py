@@ -1,12 +1,39 @@
 from __future__ import annotations
 
 import asyncio
+import pickle
 from abc import ABC, abstractmethod
-from contextlib import asynccontextmanager
-from typing import Any, ClassVar
-from collections.abc import AsyncGenerator, AsyncIterator
+from collections import deque
+from concurrent.futures import Executor as PoolExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import aclosing, asynccontextmanager, nullcontext
+from inspect import isawaitable
+from functools import partial
+from itertools import islice
+from operator import itemgetter
+from typing import IO, Any, ClassVar, cast
+from collections.abc import AsyncGenerator, AsyncIterator, Callable, Iterable
 
-from snakestream.sink import GeneratorBridgeSink, Op, Sink, TerminalSink
+from snakestream.callable_dispatch import is_async_callable
+from snakestream.characteristics import Characteristic
+
+from snakestream.exception import IllegalStateException, StreamBuildException
+from snakestream.ops import (
+    _STAGE_KIND,
+    _AdjacentDistinctOp,
+    _AssumeSortedOp,
+    _DistinctOp,
+    _FilterOp,
+    _FusedOp,
+    _LimitOp,
+    _MapOp,
+    _PeekOp,
+    _SortedOp,
+    _SortedRunsOp,
+    _TopKOp,
+)
+from snakestream.sink import AwaitRequired, GeneratorBridgeSink, Op, Sink, StatelessOp, TerminalSink
+from snakestream.sort import merge_runs, read_run, sort_run
+from snakestream.source import SyncSource
 from snakestream.type import StateMap, T
 
 # How many branches the racing executor fans a chain out across. Bound into
@@ -14,6 +41,44 @@ from snakestream.type import StateMap, T
 # the old _parallel() took it as a default argument value.
 PROCESSES: int = 4
 
+# The most branches adaptive racing will grow to when parallel(adaptive=True)
+# names no `workers` ceiling of its own.
+MAX_WORKERS: int = 32
+
+# Adaptive racing hands its controller a sample once at least this many
+# elements have come back since the last one, or twice the armed branch count,
+# whichever is more: enough that one slow element does not decide the count.
+SAMPLE_WINDOW: int = 16
+
+# The largest limit(k) a sorted() directly before it is rewritten to a top-k
+# for. Each element the top-k keeps is placed with list.insert(), which moves
+# up to k references, and input arriving in the worst order for it has every
+# element kept. At this k that worst case measured about three times a full
+# natural-order sort of 100k ints (0.17s against 0.06s; random order ties), and
+# it grows with k, so past it holding k instead of n stops paying for itself.
+TOP_K_MAX: int = 1024
+
+# How many source elements the process executor ships to a worker per task.
+# Large enough that the pickling round trip and the worker's event loop start
+# are paid per chunk rather than per element, small enough that a short stream
+# still spreads across every worker.
+CHUNK_SIZE: int = 64
+
+# How many elements the pipelined executor lets queue up between two stages
+# when pipelined() names no queue_size: enough to ride out a stage whose time
+# per element varies, few enough that a stage held up downstream does not pull
+# far ahead of it.
+PIPELINE_QUEUE_SIZE: int = 16
+
+# How many elements a tee() branch may hold that it has yet to take, when tee()
+# names no buffer: how far the fastest branch may run ahead of the slowest.
+TEE_BUFFER: int = 64
+
+# The ops a worker process can run, by the name a user wrote them as: one
+# element in, at most one out, and no state shared with any other sink, so a
+# chunk can be pushed through them with no knowledge of the chunks around it.
+_OFFLOADABLE: dict[type[Op], str] = {_MapOp: "map", _FilterOp: "filter", _PeekOp: "peek"}
+
 
 @asynccontextmanager
 async def _maybe_aclosing(thing: AsyncGenerator) -> AsyncIterator[AsyncGenerator]:
@@ -30,28 +95,173 @@ async def _maybe_aclosing(thing: AsyncGenerator) -> AsyncIterator[AsyncGenerator
             await thing.aclose()
 
 
+def _top_k(chain: list[Op]) -> list[Op]:
+    """The chain with every sorted() directly followed by a limit(k) of at most
+    TOP_K_MAX replaced by a _TopKOp holding k elements; the limit stays, to
+    stop the stream once the top k have gone by."""
+    rewritten = list(chain)
+    for i, (op, after) in enumerate(zip(chain, chain[1:])):
+        if type(op) is _SortedOp and type(after) is _LimitOp and 0 < after._args[0] <= TOP_K_MAX:
+            comparator, reverse, key = op._args[:3]
+            rewritten[i] = _TopKOp(comparator, reverse, key, after._args[0])
+    return rewritten
+
+
+def _drop_redundant(chain: list[Op]) -> list[Op]:
+    """The chain less the ops that its characteristics so far make no-ops: a
+    distinct() over elements already distinct, and a natural-order sorted()
+    over elements already in that order. Everything else is kept."""
+    kept: list[Op] = []
+    known = Characteristic.NONE
+    for op in chain:
+        if type(op) is _DistinctOp and Characteristic.DISTINCT in known:
+            continue
+        if type(op) is _SortedOp and op.natural() and Characteristic.SORTED in known:
+            continue
+        known = op.characteristics(known)
+        kept.append(op)
+    return kept
+
+
+def _keeps_order(op: Op) -> bool:
+    # passes on a subsequence of what it is given, in the order given
+    return Characteristic.SORTED in op.characteristics(Characteristic.SORTED)
+
+
+def _adjacent_distinct(chain: list[Op]) -> list[Op]:
+    """The chain with every exact distinct() that is sure to see equal elements
+    next to each other - after a natural-order sorted() either way round or an
+    assume_sorted(), with only order-keeping ops in between - replaced by an
+    _AdjacentDistinctOp, which remembers one element instead of all of them.
+    A distinct() with a key or another strategy is left as it is.
+
+    That needs `<` to be a total order consistent with ==. Under a partial
+    one, such as frozensets by subset, sorting need not bring equal elements
+    together, and a repeat gets through where the set would have caught it;
+    no such order can be told from the chain, so it is left to the docs."""
+    rewritten = list(chain)
+    in_order = False
+    for i, op in enumerate(chain):
+        if type(op) is _SortedOp:
+            comparator, _, key = op._args[:3]
+            in_order = comparator is None and key is None
+        elif type(op) is _AssumeSortedOp:
+            in_order = True
+        elif type(op) is _DistinctOp and in_order and op._strategy is set:
+            rewritten[i] = _AdjacentDistinctOp()
+        elif not _keeps_order(op):
+            in_order = False
+    return rewritten
+
+
+def _rewrite(chain: list[Op]) -> list[Op]:
+    """The chain with redundant ops dropped and top-k and adjacent distinct
+    put in, as _compile() has it before fusing."""
+    return _top_k(_adjacent_distinct(_drop_redundant(chain)))
+
+
+def _compile(chain: list[Op]) -> list[Op]:
+    """The chain as it will actually be linked: less the ops it makes redundant
+    (see _drop_redundant), sorted().limit(k) as a top-k (see _top_k), distinct()
+    over sorted elements as an adjacent-only one (see _adjacent_distinct), and
+    every run of two or more adjacent map/filter/peek ops replaced by one
+    _FusedOp doing the same stages in the same order. Only
+    ever applied on the way into _wrap_sink(), so a stream's own chain, and
+    anything that inspects it by op type (the process and thread executors),
+    still sees the ops the user wrote."""
+    compiled: list[Op] = []
+    run: list[Op] = []
+    for op in [*_rewrite(chain), None]:
+        if op is not None and type(op) in _STAGE_KIND:
+            run.append(op)
+            continue
+        if len(run) > 1:
+            compiled.append(_FusedOp(tuple((_STAGE_KIND[type(r)], cast(StatelessOp, r)._args[0]) for r in run)))
+        else:
+            compiled.extend(run)
+        run = []
+        if op is not None:
+            compiled.append(op)
+    return compiled
+
+
 def _wrap_sink(intermediaries: list[Op], terminal: Sink[Any]) -> Sink[Any]:
     """Link a chain of ops onto a terminal sink, innermost last, and return the
-    head. Java's AbstractPipeline.wrapSink() does exactly this."""
+    head. Java's AbstractPipeline.wrapSink() does exactly this, less the
+    compile step."""
     sink = terminal
-    for op in reversed(intermediaries):
+    for op in reversed(_compile(intermediaries)):
         sink = op.link(sink)
     return sink
 
 
-async def _copy_into(head: Sink[Any], src: AsyncGenerator, state_map: StateMap) -> None:
+async def _copy_into(head: Sink[Any], src: AsyncGenerator, state_map: StateMap, batch_size: int | None = None) -> None:
     """Push every element of a source into a wrapped sink, honouring
-    cancellation. Java's AbstractPipeline.copyInto() does exactly this."""
+    cancellation. Java's AbstractPipeline.copyInto() does exactly this. With a
+    batch_size, the source is pushed in lists of up to that many elements."""
     await head.begin(state_map)
     # a chain can already be cancelled before it has seen anything
     # (limit(0)); pulling even one element would run every upstream
     # op on a value nobody wants
     if not head.cancellation_requested():
-        async for item in src:
+        if batch_size is not None:
+            async with aclosing(_batches(src, batch_size)) as batches:
+                async for batch in batches:
+                    await head.accept_batch(batch)
+                    if head.cancellation_requested():
+                        break
+        elif isinstance(src, SyncSource):
+            await _copy_sync_first(head, src)
+        else:
+            async for item in src:
+                await head.accept(item)
+                if head.cancellation_requested():
+                    break
+    await head.end()
+
+
+async def _copy_sync_first(head: Sink[Any], src: SyncSource) -> None:
+    """_copy_into() over a sync source: a plain `for` and accept_sync() for as
+    long as no sink in the chain needs an await, then accept() from the first
+    element one does. Every element is processed exactly once either way; the
+    one that tripped the switch finishes through the AwaitRequired it raised.
+
+    For a chain of plain-def callables this skips a coroutine per sink per
+    element and the async-generator hop the source used to be wrapped in,
+    which is most of what such a chain costs (see Sequential.value)."""
+    it = src.iterator
+    try:
+        for item in it:
+            head.accept_sync(item)
+            if head.cancellation_requested():
+                return
+    except AwaitRequired as e:
+        await e.pending
+        if head.cancellation_requested():
+            return
+        for item in it:
             await head.accept(item)
             if head.cancellation_requested():
-                break
-    await head.end()
+                return
+
+
+async def _batches(src: AsyncGenerator, size: int) -> AsyncGenerator[list[Any], None]:
+    """A source as lists of up to `size` elements, the last possibly shorter.
+    A sync source is sliced straight off its iterator; anything else still
+    has to be pulled an element at a time, and only the push is batched."""
+    if isinstance(src, SyncSource):
+        it = src.iterator
+        while batch := list(islice(it, size)):
+            yield batch
+        return
+    batch = []
+    async for item in src:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
 
 async def _guarded(source: AsyncGenerator, lock: asyncio.Lock) -> AsyncGenerator:
@@ -70,6 +280,182 @@ async def _guarded(source: AsyncGenerator, lock: asyncio.Lock) -> AsyncGenerator
             await source.aclose()
 
 
+# What a _Prefetched source's filling task puts last on its queue when the
+# source has run out, and what a _Tee holds once its source has.
+_END = object()
+
+
+class _Raised:
+    """What the filling task puts on the queue when the source raised: the
+    exception, wrapped, since an exception instance is also a valid element."""
+
+    __slots__ = ("error",)
+
+    def __init__(self, error: Exception) -> None:
+        self.error = error
+
+
+class _Prefetched:
+    """An async source pulled ahead of the chain by a task of its own, into a
+    queue of up to `n` elements, so that the source's I/O (the next page of a
+    cursor, the next read of a file) overlaps the chain's work on what came
+    before. Pulling takes from the queue; the task starts on the first pull.
+
+    aclose() cancels the task, whose _maybe_aclosing() then closes the source,
+    or closes the source itself if nothing was ever pulled. An exception from
+    the source reaches the puller in its place in the queue, after every
+    element pulled before it."""
+
+    __slots__ = ("_source", "_queue", "_task", "_ended")
+
+    def __init__(self, source: AsyncGenerator, n: int) -> None:
+        self._source = source
+        self._queue: asyncio.Queue[Any] = asyncio.Queue(n)
+        self._task: asyncio.Task[None] | None = None
+        self._ended = False
+
+    def __aiter__(self) -> _Prefetched:
+        return self
+
+    async def __anext__(self) -> Any:
+        if self._ended:
+            raise StopAsyncIteration
+        if self._task is None:
+            self._task = asyncio.create_task(self._fill())
+        item = await self._queue.get()
+        if item is _END or type(item) is _Raised:
+            self._ended = True
+            if item is _END:
+                raise StopAsyncIteration
+            raise item.error
+        return item
+
+    async def _fill(self) -> None:
+        try:
+            async with _maybe_aclosing(self._source) as src:
+                async for item in src:
+                    await self._queue.put(item)
+        except Exception as e:
+            await self._queue.put(_Raised(e))
+        else:
+            await self._queue.put(_END)
+
+    async def aclose(self) -> None:
+        self._ended = True
+        if self._task is None:
+            if hasattr(self._source, "aclose"):
+                await self._source.aclose()
+            return
+        self._task.cancel()
+        # waits out the task's own cancellation without swallowing one of ours
+        await asyncio.gather(self._task, return_exceptions=True)
+
+
+class _Tee:
+    """One async source read once on behalf of several branches, each with a
+    queue of up to `buffer` elements it has yet to take. A branch that finds
+    its queue empty pulls the next element for all of them, under a lock so
+    that only one pulls at a time, and waits while any open branch's queue is
+    full: the fastest branch is never more than `buffer` elements ahead of the
+    slowest. The source's end, or its exception, reaches each branch once its
+    queue is drained. A closed branch's queue is emptied and left out from then
+    on, and the source is closed with the last branch.
+
+    A branch consumed alone to its end, before another is started, would wait
+    forever on the other's full queue. So a pull that finds the queue of a
+    branch never yet pulled full, even after letting other tasks run once,
+    fails every branch with IllegalStateException instead."""
+
+    __slots__ = ("_source", "_queues", "_open", "_started", "_lock", "_end")
+
+    def __init__(self, source: AsyncGenerator, n: int, buffer: int) -> None:
+        self._source = source
+        self._queues: list[asyncio.Queue[Any]] = [asyncio.Queue(buffer) for _ in range(n)]
+        self._open = set(range(n))
+        self._started: set[int] = set()
+        self._lock = asyncio.Lock()
+        self._end: Any = None
+
+    def branches(self) -> list[_TeeBranch]:
+        return [_TeeBranch(self, i) for i in range(len(self._queues))]
+
+    async def next(self, i: int) -> Any:
+        self._started.add(i)
+        queue = self._queues[i]
+        while queue.empty() and self._end is None:
+            async with self._lock:
+                if queue.empty() and self._end is None:
+                    await self._pull()
+        if not queue.empty():
+            return queue.get_nowait()
+        if self._end is _END:
+            raise StopAsyncIteration
+        raise self._end.error
+
+    async def _pull(self) -> None:
+        try:
+            item = await self._source.__anext__()
+        except StopAsyncIteration:
+            self._end = _END
+            return
+        except Exception as e:
+            self._end = _Raised(e)
+            return
+        for j, queue in enumerate(self._queues):
+            if queue.full() and j not in self._started:
+                # a task consuming it may be just about to start
+                await asyncio.sleep(0)
+                if j in self._open and j not in self._started:
+                    self._end = _Raised(
+                        IllegalStateException(
+                            f"tee() branch {j} was never pulled while another ran {queue.maxsize} elements ahead "
+                            "of it: consume the branches concurrently, or raise the buffer"
+                        )
+                    )
+                    return
+            # checked at each put, as a branch may close while one waits
+            if j in self._open:
+                await queue.put(item)
+
+    async def close(self, i: int) -> None:
+        if i not in self._open:
+            return
+        self._open.discard(i)
+        queue = self._queues[i]
+        # room for a put that is waiting on this queue, so it can finish
+        while not queue.empty():
+            queue.get_nowait()
+        if not self._open:
+            await self._source.aclose()
+
+
+class _TeeBranch:
+    """One of a _Tee's branches, as an async source of its own."""
+
+    __slots__ = ("_tee", "_i", "_ended")
+
+    def __init__(self, tee: _Tee, i: int) -> None:
+        self._tee = tee
+        self._i = i
+        self._ended = False
+
+    def __aiter__(self) -> _TeeBranch:
+        return self
+
+    async def __anext__(self) -> Any:
+        if self._ended:
+            raise StopAsyncIteration
+        try:
+            return await self._tee.next(self._i)
+        except Exception:
+            self._ended = True
+            raise
+
+    async def aclose(self) -> None:
+        self._ended = True
+        await self._tee.close(self._i)
+
+
 # --- the execution primitives -------------------------------------------
 #
 # Two things a pipeline can produce, and two ways to run it, but not a
@@ -79,24 +465,36 @@ async def _guarded(source: AsyncGenerator, lock: asyncio.Lock) -> AsyncGenerator
 # needs a stream instance.
 
 
-async def stream_through(
+def stream_through(
     chain: list[Op],
     source: AsyncGenerator,
     state_map: StateMap | None = None,
+    batch_size: int | None = None,
 ) -> AsyncGenerator[T, None]:
     """Push the chain, pull the results: one worker, elements out lazily.
     Java's StreamSpliterators.WrappingSpliterator adapts push to pull the same
-    way, buffering what the sink emits until the caller asks for it."""
+    way, buffering what the sink emits until the caller asks for it. With a
+    batch_size, the push is in lists and the pull is still one element at a
+    time, out of the bridge's buffer. Over a sync source, unbatched, the
+    source is pulled with a plain `for` (see _stream_sync)."""
     if state_map is None:
         state_map = {}
+    if batch_size is None and isinstance(source, SyncSource):
+        return _stream_sync(chain, source, state_map)
+    return _stream(chain, source, state_map, batch_size)
+
+
+async def _stream_sync(chain: list[Op], source: SyncSource, state_map: StateMap) -> AsyncGenerator[T, None]:
+    """stream_through() over a sync source: a `for` over its iterator rather
+    than an awaited __anext__() per element, which is about half of what a
+    chain of cheap ops costs per element pulled."""
     bridge: GeneratorBridgeSink = GeneratorBridgeSink()
     head = _wrap_sink(chain, bridge)
-    async with _maybe_aclosing(source) as src:
+    async with aclosing(source):
         await head.begin(state_map)
-        # same pre-first-pull guard as _copy_into(), which carries the
-        # reasoning; this loop cannot share it because it has to yield
+        # the same pre-first-pull guard as _copy_into()
         if not head.cancellation_requested():
-            async for item in src:
+            for item in source.iterator:
                 await head.accept(item)
                 if bridge.buffer:
                     for out in bridge.buffer:
@@ -111,14 +509,64 @@ async def stream_through(
             bridge.buffer.clear()
 
 
-async def race_through(chain: list[Op], source: AsyncGenerator, workers: int) -> AsyncGenerator:
-    """The same chain, run by `workers` branches racing over one shared source.
-    Ordering is not preserved: elements are yielded as branches finish them."""
+async def _stream(
+    chain: list[Op], source: AsyncGenerator, state_map: StateMap, batch_size: int | None
+) -> AsyncGenerator[T, None]:
+    """stream_through() over any source, pulled with `async for`."""
+    bridge: GeneratorBridgeSink = GeneratorBridgeSink()
+    head = _wrap_sink(chain, bridge)
+    async with _maybe_aclosing(source) as src:
+        await head.begin(state_map)
+        # same pre-first-pull guard as _copy_into(), which carries the
+        # reasoning; this loop cannot share it because it has to yield
+        if not head.cancellation_requested():
+            if batch_size is None:
+                pushes, accept = nullcontext(src), head.accept
+            else:
+                pushes, accept = aclosing(_batches(src, batch_size)), head.accept_batch
+            async with pushes as pushed:
+                async for item in pushed:
+                    await accept(item)
+                    if bridge.buffer:
+                        for out in bridge.buffer:
+                            yield out
+                        bridge.buffer.clear()
+                    if head.cancellation_requested():
+                        break
+        await head.end()
+        if bridge.buffer:
+            for out in bridge.buffer:
+                yield out
+            bridge.buffer.clear()
+
+
+def _shared_state(chain: list[Op]) -> StateMap:
+    """The state every racing branch's sinks share, one entry per op that has any."""
     state_map: StateMap = {}
     for op in chain:
         state = op.make_shared_state()
         if state is not None:
             state_map[op] = state
+    return state_map
+
+
+def race_through(chain: list[Op], source: AsyncGenerator, workers: int) -> AsyncGenerator:
+    """The same chain, run by `workers` branches racing over one shared source.
+    Ordering is not preserved: elements are yielded as branches finish them,
+    except that a sorted() sorts the whole stream (see sorted_race_through)."""
+    return sorted_race_through(chain, source, partial(_race, workers=workers))
+
+
+def _unordered(chain: list[Op]) -> list[Op]:
+    """The chain less its assume_sorted() marks: racing branches take elements
+    in whatever order they finish, so what held of the source holds of no
+    branch's share of it."""
+    return [op for op in chain if type(op) is not _AssumeSortedOp]
+
+
+async def _race(chain: list[Op], source: AsyncGenerator, workers: int) -> AsyncGenerator:
+    chain = _unordered(chain)
+    state_map = _shared_state(chain)
     lock = asyncio.Lock()
     branches = [stream_through(chain, _guarded(source, lock), state_map) for _ in range(workers)]
     # the in-flight __anext__() per branch, keyed by task so a completed one
@@ -151,13 +599,391 @@ async def race_through(chain: list[Op], source: AsyncGenerator, workers: int) ->
         await asyncio.gather(*pending, return_exceptions=True)
 
 
-async def feed_through(chain: list[Op], source: AsyncGenerator, terminal: TerminalSink[Any]) -> Any:
+class _Aimd:
+    """Additive increase, multiplicative decrease over a branch count, fed one
+    sample at a time: a window's throughput and its mean per-element latency.
+    While a new branch is paid for in throughput, or costs no latency, one more
+    is added; once latency rises and throughput does not rise with it, the
+    branches are queueing on a shared bottleneck rather than overlapping, and
+    the count is halved. `tolerance` is the relative change either figure must
+    make to count as a rise, so that noise alone moves neither.
+
+    record() gathers the window itself and observes it once it is full."""
+
+    __slots__ = ("level", "minimum", "maximum", "tolerance", "_throughput", "_latency", "_count", "_total", "_started")
+
+    def __init__(self, minimum: int, maximum: int, tolerance: float = 0.1) -> None:
+        self.level = minimum
+        self.minimum = minimum
+        self.maximum = maximum
+        self.tolerance = tolerance
+        self._throughput: float | None = None
+        self._latency = 0.0
+        self.begin(0.0)
+
+    def begin(self, now: float) -> None:
+        """Opens a window: nothing back yet, timed from `now`."""
+        self._count, self._total, self._started = 0, 0.0, now
+
+    def record(self, latency: float, now: float) -> None:
+        self._count += 1
+        self._total += latency
+        if self._count >= max(SAMPLE_WINDOW, 2 * self.level):
+            # a window of sync callables can finish inside one clock tick
+            self.observe(self._count / max(now - self._started, 1e-9), self._total / self._count)
+            self.begin(now)
+
+    def observe(self, throughput: float, latency: float) -> int:
+        previous, self._throughput = self._throughput, throughput
+        previous_latency, self._latency = self._latency, latency
+        grow = 1 + self.tolerance
+        if previous is not None and latency > previous_latency * grow and throughput < previous * grow:
+            self.level = max(self.minimum, self.level // 2)
+        else:
+            self.level = min(self.maximum, self.level + 1)
+        return self.level
+
+
+def adaptive_race_through(chain: list[Op], source: AsyncGenerator, control: _Aimd) -> AsyncGenerator:
+    """race_through with the branch count left to `control`. Branches are made
+    as the count first reaches them, and at most `control.level` are armed at a
+    time; a branch above it is parked once it yields rather than re-armed, and
+    parked ones are re-armed first when the count grows again. None is ever
+    cancelled mid-element. Once any branch ends the source is spent, and every
+    parked branch is re-armed so that it can end too."""
+    return sorted_race_through(chain, source, partial(_adaptive_race, control=control))
+
+
+async def _adaptive_race(chain: list[Op], source: AsyncGenerator, control: _Aimd) -> AsyncGenerator:
+    chain = _unordered(chain)
+    state_map = _shared_state(chain)
+    lock = asyncio.Lock()
+    loop = asyncio.get_running_loop()
+    branches: list[AsyncGenerator] = []
+    parked: deque[int] = deque()
+    # as in race_through, keyed by task; each also carries when it was armed
+    in_flight: dict[asyncio.Task[Any], tuple[int, float]] = {}
+
+    def arm(branch: int) -> None:
+        in_flight[asyncio.ensure_future(branches[branch].__anext__())] = (branch, loop.time())
+
+    def fill(draining: bool) -> None:
+        while parked and (draining or len(in_flight) < control.level):
+            arm(parked.popleft())
+        while not draining and len(in_flight) < control.level:
+            branches.append(stream_through(chain, _guarded(source, lock), state_map))
+            arm(len(branches) - 1)
+
+    draining = False
+    control.begin(loop.time())
+    fill(draining)
+    try:
+        while in_flight:
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            now = loop.time()
+            results = []
+            for task in done:
+                branch, armed = in_flight.pop(task)
+                try:
+                    results.append(task.result())
+                except StopAsyncIteration:
+                    draining = True
+                    continue
+                parked.append(branch)
+                control.record(now - armed, now)
+            fill(draining)
+            for result in results:
+                yield result
+    finally:
+        pending = list(in_flight)
+        for t in pending:
+            t.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+def sorted_race_through(
+    chain: list[Op], source: AsyncGenerator, race: Callable[[list[Op], AsyncGenerator], AsyncGenerator]
+) -> AsyncGenerator:
+    """`race` over the chain, unless it holds a sorted(): then the chain up to
+    it is raced, and the rest runs once over the whole stream sorted. One
+    _SortedSink per branch would push each branch's share sorted on its own,
+    interleaved with the others'.
+
+    Each branch spills sorted runs, if the sort spills, as it goes, and hands
+    back what it has not spilled. That is sorted in one go, with `concurrency`
+    async comparisons or keys in flight per branch, and merged k-way with the
+    runs. Sorting the rest per branch instead would leave it as unevenly
+    spread as the race left it, all of it in one branch over a sync source."""
+    prefix, rest = _split_at_sorted(chain)
+    if not rest:
+        return race(chain, source)
+    op = cast(StatelessOp, rest[0])
+    comparator, reverse, key = op._args[:3]
+    # the merged stream is as sorted as the op would have left it
+    after = [_AssumeSortedOp(reverse), *rest[1:]] if comparator is None and key is None else rest[1:]
+    return stream_through(after, _merged_race(prefix, op, source, race))
+
+
+def _split_at_sorted(chain: list[Op]) -> tuple[list[Op], list[Op]]:
+    for idx, op in enumerate(chain):
+        if type(op) is _SortedOp:
+            return chain[:idx], chain[idx:]
+    return chain, []
+
+
+async def _merged_race(
+    prefix: list[Op], op: StatelessOp, source: AsyncGenerator, race: Callable[[list[Op], AsyncGenerator], AsyncGenerator]
+) -> AsyncGenerator:
+    comparator, reverse, key, _, concurrency = op._args
+    files: list[IO[bytes]] = []
+    rest: list[Any] = []
+    # a branch that spilled has probed the comparator; one that did not, has not
+    awaits = None
+    branches = 0
+    try:
+        # each branch yields exactly one value, from its _SortedRunsSink
+        async with aclosing(race([*prefix, _SortedRunsOp(*op._args)], source)) as shares:
+            async for spilled, unsorted, branch_awaits in shares:
+                files.extend(spilled)
+                rest.extend(unsorted)
+                awaits = branch_awaits if awaits is None else awaits
+                branches += 1
+        run = await sort_run(rest, comparator, reverse, key, awaits, branches * concurrency)
+        if not files:
+            for item in run:
+                yield item[1] if key is not None else item
+            return
+        runs: list[Iterable[Any]] = [*map(read_run, files), run]
+        if reverse:
+            # as _SortedSink._merged() orders them, so one branch ties as a sequential sort would
+            runs.reverse()
+        keyed = itemgetter(0) if key is not None else None
+        async with aclosing(merge_runs(runs, reverse, comparator, bool(awaits), keyed)) as merged:
+            async for item in merged:
+                yield item[1] if key is not None else item
+    finally:
+        for f in files:
+            f.close()
+
+
+async def _ordered_race(stages: list[Op], source: AsyncGenerator, workers: int, window: int) -> AsyncGenerator:
+    """`stages` run over up to `workers` elements at once, their results
+    yielded in encounter order. Each element pulled gets a task, queued in
+    pull order, which borrows one of `workers` sink chains to push it through
+    and returns whatever that element produced; the queue itself is the
+    reorder buffer, so the head task's output is always the next to yield. At
+    most `window` elements are pulled and not yet yielded, however far the
+    fastest branch gets ahead of the slowest."""
+    idle: asyncio.Queue[tuple[Sink[Any], GeneratorBridgeSink]] = asyncio.Queue()
+    heads: list[Sink[Any]] = []
+    for _ in range(workers):
+        bridge: GeneratorBridgeSink = GeneratorBridgeSink()
+        head = _wrap_sink(stages, bridge)
+        await head.begin({})
+        heads.append(head)
+        idle.put_nowait((head, bridge))
+
+    async def run(item: Any) -> list[Any]:
+        head, bridge = await idle.get()
+        try:
+            await head.accept(item)
+            out = list(bridge.buffer)
+            bridge.buffer.clear()
+            return out
+        finally:
+            idle.put_nowait((head, bridge))
+
+    in_flight: deque[asyncio.Task[list[Any]]] = deque()
+    try:
+        async with _maybe_aclosing(source) as src:
+            async for item in src:
+                in_flight.append(asyncio.ensure_future(run(item)))
+                if len(in_flight) >= window:
+                    for out in await in_flight.popleft():
+                        yield out
+        while in_flight:
+            for out in await in_flight.popleft():
+                yield out
+        for head in heads:
+            await head.end()
+    finally:
+        pending = list(in_flight)
+        for t in pending:
+            t.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+def ordered_race_through(chain: list[Op], source: AsyncGenerator, workers: int, window: int) -> AsyncGenerator:
+    """The chain's leading map/filter/peek raced in encounter order, and the
+    rest run once over their ordered output. Only that leading run can race:
+    each of its ops maps one element to at most one, independently of every
+    other element, which is what lets an element's output be held back until
+    its turn. A stateful op (limit, distinct, skip) or one that buffers
+    (sorted) would see elements in completion order on a branch and so answer
+    differently from the sequential stream."""
+    stages, rest = _offloadable_prefix(chain)
+    if not stages:
+        return stream_through(rest, source)
+    return stream_through(rest, _ordered_race(stages, source, workers, window))
+
+
+def _offloadable_prefix(chain: list[Op]) -> tuple[list[Op], list[Op]]:
+    """Split a chain at its first op a worker process cannot run: the leading
+    run of map/filter/peek, and everything from there on."""
+    for idx, op in enumerate(chain):
+        if type(op) not in _OFFLOADABLE:
+            return chain[:idx], chain[idx:]
+    return chain, []
+
+
+def _check_picklable(stages: list[Op]) -> None:
+    for op in stages:
+        try:
+            pickle.dumps(op)
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            raise StreamBuildException(
+                f"{_OFFLOADABLE[type(op)]}() was given a callable that cannot be "
+                f"pickled, so it cannot run in a worker process under .parallel(processes=...): {e}. "
+                "Use a module-level function instead of a lambda or a local closure."
+            ) from e
+
+
+async def _run_stages(stages: list[Op], chunk: list[Any]) -> list[Any]:
+    bridge: GeneratorBridgeSink = GeneratorBridgeSink()
+    head = _wrap_sink(stages, bridge)
+    await head.begin({})
+    for item in chunk:
+        await head.accept(item)
+    await head.end()
+    return bridge.buffer
+
+
+def _run_chunk(stages: list[Op], chunk: list[Any]) -> list[Any]:
+    """The worker side of process_through(): the stages' own sinks, driven over
+    one chunk on an event loop of the worker's own, so an async mapper is
+    dispatched exactly as it would be in the parent."""
+    return asyncio.run(_run_stages(stages, chunk))
+
+
+async def process_through(
+    stages: list[Op],
+    source: AsyncGenerator,
+    workers: int,
+    chunk_size: int,
+) -> AsyncGenerator:
+    """Run `stages` over the source in a pool of `workers` processes, a chunk
+    at a time, and yield the results in encounter order. At most two chunks per
+    worker are in flight, so the source is never pulled further ahead than
+    that."""
+    loop = asyncio.get_running_loop()
+    pool = ProcessPoolExecutor(workers)
+    in_flight: deque[asyncio.Future[list[Any]]] = deque()
+    try:
+        async with _maybe_aclosing(source) as src:
+            chunk: list[Any] = []
+            async for item in src:
+                chunk.append(item)
+                if len(chunk) < chunk_size:
+                    continue
+                in_flight.append(loop.run_in_executor(pool, _run_chunk, stages, chunk))
+                chunk = []
+                if len(in_flight) >= 2 * workers:
+                    for out in await in_flight.popleft():
+                        yield out
+            if chunk:
+                in_flight.append(loop.run_in_executor(pool, _run_chunk, stages, chunk))
+        while in_flight:
+            for out in await in_flight.popleft():
+                yield out
+    finally:
+        # leaving early (a downstream limit, or a worker raised): nothing still
+        # queued is wanted, and a chunk already running is left to finish on
+        # its own rather than blocking the event loop on it
+        for pending in in_flight:
+            pending.cancel()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _in_thread(fn: Callable, pool: PoolExecutor) -> Callable:
+    """A sync callable as an async one that runs it on `pool`, so a blocking
+    call suspends only the branch that made it, not the event loop."""
+
+    async def call(element: Any) -> Any:
+        r = await asyncio.get_running_loop().run_in_executor(pool, fn, element)
+        # the one-time safety net, moved here: a plain def that returns an
+        # awaitable hands back something to await on the loop, not in a thread
+        return await r if isawaitable(r) else r
+
+    return call
+
+
+def _offload_sync_callables(chain: list[Op], pool: PoolExecutor) -> list[Op]:
+    """The chain with every sync map/filter/peek callable moved onto `pool`.
+    Async callables already yield to the loop while they wait, so they stay
+    where they are."""
+    offloaded: list[Op] = []
+    for op in chain:
+        if isinstance(op, StatelessOp) and type(op) in _OFFLOADABLE:
+            (fn,) = op._args
+            if not is_async_callable(fn):
+                op = type(op)(_in_thread(fn, pool))
+        offloaded.append(op)
+    return offloaded
+
+
+async def thread_through(chain: list[Op], source: AsyncGenerator, workers: int, window: int | None) -> AsyncGenerator:
+    """race_through() over a chain whose sync callables run on a pool of
+    `workers` threads, one per branch, so blocking calls actually overlap. With
+    a `window`, ordered_race_through() instead."""
+    pool = ThreadPoolExecutor(workers)
+    offloaded = _offload_sync_callables(chain, pool)
+    try:
+        if window is None:
+            elements = race_through(offloaded, source, workers)
+        else:
+            elements = ordered_race_through(offloaded, source, workers, window)
+        async with aclosing(elements) as raced:
+            async for item in raced:
+                yield item
+    finally:
+        # every call this pool was given has been awaited or cancelled by now;
+        # a cancelled one still running in its thread is left to finish there
+        pool.shutdown(wait=False)
+
+
+async def pipeline_through(chain: list[Op], source: AsyncGenerator, queue_size: int) -> AsyncGenerator:
+    """Each op of the chain as a stage of its own: stream_through() over that
+    one op, pulled by a task of its own into a bounded queue (see _Prefetched)
+    that the next stage pulls from. The chain is rewritten first, as a whole,
+    so that a top-k or an adjacent distinct still sees what comes before it;
+    only fusion is left out, since a fused run would be one stage.
+
+    A full queue holds its stage back, an empty one the stage after it. A
+    stage that stops early (limit) closes the one before it, which cancels its
+    task and so on up to the source; closing the last one does the same from
+    the end. An exception reaches the end in its place, after every element
+    the failing stage passed on before it."""
+    elements = source
+    for op in _rewrite(chain):
+        if type(op) is not _AssumeSortedOp:
+            elements = cast(AsyncGenerator, _Prefetched(stream_through([op], elements), queue_size))
+    async with _maybe_aclosing(elements) as staged:
+        async for item in staged:
+            yield item
+
+
+async def feed_through(
+    chain: list[Op],
+    source: AsyncGenerator,
+    terminal: TerminalSink[Any],
+    batch_size: int | None = None,
+) -> Any:
     """Push source -> head -> terminal in a single ordered pass, with nothing
     buffered on the way: the last intermediate sink pushes straight into the
     terminal, so no generator sits between them."""
     head = _wrap_sink(chain, terminal)
     async with _maybe_aclosing(source) as src:
-        await _copy_into(head, src, {})
+        await _copy_into(head, src, {}, batch_size)
     return terminal.result()
 
 
@@ -179,6 +1005,15 @@ class Executor(ABC):
     the chain into a terminal sink."""
 
     is_parallel: ClassVar[bool]
+    # Whether elements() yields in encounter order. A terminal that needs that
+    # order runs under an executor for which this holds, and names SEQUENTIAL
+    # only when the stream's own executor does not.
+    preserves_order: bool
+
+    @property
+    def parallelism(self) -> int:
+        """How many branches or workers this executor runs a chain across."""
+        return 1
 
     @abstractmethod
     def elements(self, chain: list[Op], source: AsyncGenerator) -> AsyncGenerator: ...
@@ -190,10 +1025,21 @@ class Executor(ABC):
 
 
 class Sequential(Executor):
+    """One worker, in encounter order. With a batch_size, elements move down
+    the chain in lists of up to that many (see BaseStream.batched)."""
+
     is_parallel = False
+    preserves_order = True
+
+    __slots__ = ("batch_size",)
+
+    def __init__(self, batch_size: int | None = None) -> None:
+        if batch_size is not None and batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+        self.batch_size = batch_size
 
     def elements(self, chain: list[Op], source: AsyncGenerator) -> AsyncGenerator:
-        return stream_through(chain, source)
+        return stream_through(chain, source, batch_size=self.batch_size)
 
     async def value(self, chain: list[Op], source: AsyncGenerator, terminal: TerminalSink[Any]) -> Any:
         """Overrides the general form with the fused push, which is the one
@@ -203,18 +1049,30 @@ class Sequential(Executor):
         chain, best of 5). Removing the generator between the last sink and the
         terminal removes an accept, a buffer append, a truthiness check, a
         yield across the async-generator boundary and a list clear, per
-        element. Results are identical to the general form."""
-        return await feed_through(chain, source, terminal)
+        element. Results are identical to the general form.
+
+        Over a sync source the push itself starts sync, see _copy_sync_first():
+        against the async push, count() went from 232 to 71 ns per element,
+        map().filter().count() from 698 to 351 and reduce() from 304 to 123
+        (Python 3.11.7, same shape of run)."""
+        return await feed_through(chain, source, terminal, self.batch_size)
 
 
 class Racing(Executor):
     is_parallel = True
+    preserves_order = False
 
     __slots__ = ("workers",)
 
     def __init__(self, workers: int) -> None:
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
         self.workers = workers
 
+    @property
+    def parallelism(self) -> int:
+        return self.workers
+
     def elements(self, chain: list[Op], source: AsyncGenerator) -> AsyncGenerator:
         return race_through(chain, source, self.workers)
 
@@ -223,5 +1081,133 @@ class Racing(Executor):
     # the only form available here, which is why it is the base.
 
 
+class OrderedRacing(Racing):
+    """Racing that yields in encounter order: the chain's leading map/filter/
+    peek race across `workers` branches through a reorder buffer of at most
+    `window` elements, and the rest of the chain runs over their ordered
+    output. Memory is bounded by the window, not by the stream."""
+
+    preserves_order = True
+
+    __slots__ = ("window",)
+
+    def __init__(self, workers: int, window: int | None = None) -> None:
+        if window is not None and window < 1:
+            raise ValueError(f"window must be at least 1, got {window}")
+        super().__init__(workers)
+        self.window = 4 * workers if window is None else window
+
+    def elements(self, chain: list[Op], source: AsyncGenerator) -> AsyncGenerator:
+        return ordered_race_through(chain, source, self.workers, self.window)
+
+
+class Threaded(Racing):
+    """Racing, with the chain's sync map/filter/peek callables dispatched onto a
+    bounded pool of threads, for callables that block (sync database drivers,
+    HTTP clients, file reads). Without it a blocking call holds the event loop
+    and the racing branches take turns. Async callables stay on the loop, and a
+    terminal's own callable (a for_each consumer, say) is not offloaded.
+
+    `ordered` races the way OrderedRacing does instead, window and all."""
+
+    __slots__ = ("window", "preserves_order")
+
+    def __init__(self, workers: int, ordered: bool = False) -> None:
+        super().__init__(workers)
+        self.window = 4 * workers if ordered else None
+        self.preserves_order = ordered
+
+    def elements(self, chain: list[Op], source: AsyncGenerator) -> AsyncGenerator:
+        return thread_through(chain, source, self.workers, self.window)
+
+
+class AdaptiveRacing(Racing):
+    """Racing whose branch count is not fixed: it starts at `min_workers` and
+    moves between that and `workers` as the run goes, by additive increase and
+    multiplicative decrease on each window's throughput and per-element latency
+    (see _Aimd). Suits a chain whose best width is not known up front, such as
+    a mapper calling a service that degrades past some number of concurrent
+    requests. `parallelism` reads the count the last run settled on."""
+
+    __slots__ = ("min_workers", "_control")
+
+    def __init__(self, workers: int = MAX_WORKERS, min_workers: int = 1) -> None:
+        super().__init__(workers)
+        if min_workers < 1 or min_workers > workers:
+            raise ValueError(f"min_workers must be between 1 and {workers}, got {min_workers}")
+        self.min_workers = min_workers
+        self._control = _Aimd(min_workers, workers)
+
+    @property
+    def parallelism(self) -> int:
+        return self._control.level
+
+    def elements(self, chain: list[Op], source: AsyncGenerator) -> AsyncGenerator:
+        self._control = _Aimd(self.min_workers, self.workers)
+        return adaptive_race_through(chain, source, self._control)
+
+
+class Processes(Executor):
+    """Real parallelism: the chain's leading map/filter/peek ops run in a pool
+    of worker processes, over chunks of the source, and the rest of the chain
+    runs in this process over their results. Encounter order is preserved.
+
+    Every callable those ops hold is pickled to reach a worker, so it must be a
+    module-level function, not a lambda or a local closure; elements() checks
+    that up front. A peek() consumer runs in the worker, so its side effects
+    happen there too."""
+
+    is_parallel = True
+    preserves_order = True
+
+    __slots__ = ("workers", "chunk_size")
+
+    def __init__(self, workers: int, chunk_size: int = CHUNK_SIZE) -> None:
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+        self.workers = workers
+        self.chunk_size = chunk_size
+
+    @property
+    def parallelism(self) -> int:
+        return self.workers
+
+    def elements(self, chain: list[Op], source: AsyncGenerator) -> AsyncGenerator:
+        stages, rest = _offloadable_prefix(chain)
+        if not stages:
+            # nothing a worker could run, so a pool would only add a round trip
+            return stream_through(rest, source)
+        _check_picklable(stages)
+        return stream_through(rest, process_through(stages, source, self.workers, self.chunk_size))
+
+    # value() is inherited, as for Racing: the ops that ran in the workers have
+    # no sinks in this process to fuse a terminal onto.
+
+
+class Pipelined(Executor):
+    """Every op of the chain in a task of its own, each handing its output to
+    the next through a queue of at most `queue_size` elements (see
+    pipeline_through). A slow async mapper then holds up the filter and the
+    terminal behind it only once its queue runs dry, and the stages before it
+    only once theirs fills. Encounter order is kept, since each stage takes
+    its elements in order. Stages overlap, but none runs twice at once, so it
+    is not parallel."""
+
+    is_parallel = False
+    preserves_order = True
+
+    __slots__ = ("queue_size",)
+
+    def __init__(self, queue_size: int = PIPELINE_QUEUE_SIZE) -> None:
+        if queue_size < 1:
+            raise ValueError(f"queue_size must be at least 1, got {queue_size}")
+        self.queue_size = queue_size
+
+    def elements(self, chain: list[Op], source: AsyncGenerator) -> AsyncGenerator:
+        return pipeline_through(chain, source, self.queue_size)
+
+
 SEQUENTIAL = Sequential()
 RACING = Racing(PROCESSES)
@@ -0,0 +1,154 @@
+"""Fan-in of several sources into one: merge() yields elements as they arrive
+from whichever source has one, merge_sorted() interleaves sources already in
+order into one order. Both pull their sources concurrently, and both close
+every source however the run ends."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+from collections import deque
+from contextlib import aclosing
+from functools import cmp_to_key
+from typing import Any, cast
+from collections.abc import AsyncGenerator, Awaitable, Callable
+
+from snakestream.callable_dispatch import _maybe_await, is_async_callable
+from snakestream.sort import _EXHAUSTED, check_comparator_result_type
+from snakestream.type import Comparator
+
+
+async def merge(sources: list[AsyncGenerator], max_concurrency: int | None = None) -> AsyncGenerator:
+    """Every source pulled at once, or `max_concurrency` of them taking turns,
+    and each element yielded as its pull completes. The in-flight __anext__()
+    per source is keyed by its task, as in execution._race; a source that has
+    given an element goes to the back of the line, so that under a limit every
+    source gets its turn."""
+    limit = len(sources) if max_concurrency is None else max_concurrency
+    waiting = deque(range(len(sources)))
+    in_flight: dict[asyncio.Task[Any], int] = {}
+    try:
+        while waiting or in_flight:
+            while waiting and len(in_flight) < limit:
+                i = waiting.popleft()
+                in_flight[asyncio.ensure_future(sources[i].__anext__())] = i
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                i = in_flight.pop(task)
+                try:
+                    result = task.result()
+                except StopAsyncIteration:
+                    continue
+                waiting.append(i)
+                yield result
+    finally:
+        pending = list(in_flight)
+        for t in pending:
+            t.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        await _close(sources)
+
+
+async def merge_sorted(
+    sources: list[AsyncGenerator],
+    comparator: Comparator | None = None,
+    reverse: bool = False,
+    key: Callable[[Any], Any] | None = None,
+) -> AsyncGenerator:
+    """Sources each already in order (descending under `reverse`) merged into
+    one such order, by `key`, by `comparator`, or by natural order: through a
+    heap of each source's head, with the next head pulled from the source
+    whose head was just yielded. The first heads are pulled concurrently. Ties
+    go to the source given first. An async comparator cannot order a heap, so
+    under one the heads are scanned, as sort.merge_runs does for runs."""
+    try:
+        heads = await _firsts(sources)
+        if comparator is not None and is_async_callable(comparator):
+            merged = _merge_scanning(sources, heads, comparator, reverse)
+        else:
+            if comparator is not None:
+                key = cmp_to_key(cast("Callable[[Any, Any], int]", comparator))
+            merged = _merge_heap(sources, heads, key, reverse)
+        async with aclosing(merged) as items:
+            async for item in items:
+                yield item
+    finally:
+        await _close(sources)
+
+
+class _Reversed:
+    """A sort key ordered the other way round, for a min-heap to yield the
+    greatest first."""
+
+    __slots__ = ("key",)
+
+    def __init__(self, key: Any) -> None:
+        self.key = key
+
+    def __lt__(self, other: _Reversed) -> bool:
+        return other.key < self.key
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Reversed) and self.key == other.key
+
+
+async def _merge_heap(
+    sources: list[AsyncGenerator], heads: list[Any], key: Callable[[Any], Any] | None, reverse: bool
+) -> AsyncGenerator:
+    async def entry(i: int, element: Any) -> tuple[Any, int, Any]:
+        k = element if key is None else await _maybe_await(key, element)
+        # the source's index breaks a tie, so elements are never compared
+        return (_Reversed(k) if reverse else k, i, element)
+
+    heap = [await entry(i, head) for i, head in enumerate(heads) if head is not _EXHAUSTED]
+    heapq.heapify(heap)
+    while heap:
+        _, i, element = heap[0]
+        yield element
+        head = await _next(sources[i])
+        if head is _EXHAUSTED:
+            heapq.heappop(heap)
+        else:
+            heapq.heapreplace(heap, await entry(i, head))
+
+
+async def _merge_scanning(
+    sources: list[AsyncGenerator], heads: list[Any], comparator: Comparator, reverse: bool
+) -> AsyncGenerator:
+    live = [i for i, head in enumerate(heads) if head is not _EXHAUSTED]
+    while live:
+        best = live[0]
+        for i in live[1:]:
+            sign = await cast("Awaitable[int]", comparator(heads[i], heads[best]))
+            check_comparator_result_type(sign)
+            # strictly, so that the earlier of tied heads stays best
+            if sign > 0 if reverse else sign < 0:
+                best = i
+        yield heads[best]
+        heads[best] = await _next(sources[best])
+        if heads[best] is _EXHAUSTED:
+            live.remove(best)
+
+
+async def _next(source: AsyncGenerator) -> Any:
+    try:
+        return await source.__anext__()
+    except StopAsyncIteration:
+        return _EXHAUSTED
+
+
+async def _firsts(sources: list[AsyncGenerator]) -> list[Any]:
+    # every pull run to its end before a failure is raised, so none is left
+    # running when the sources are closed; a second failure is retrieved too,
+    # so it is not logged as never retrieved
+    pulls = [asyncio.ensure_future(_next(source)) for source in sources]
+    if pulls:
+        await asyncio.wait(pulls)
+    for pull in pulls:
+        pull.exception()
+    return [pull.result() for pull in pulls]
+
+
+async def _close(sources: list[AsyncGenerator]) -> None:
+    for source in sources:
+        await source.aclose()
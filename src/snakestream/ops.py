@@ -1,13 +1,36 @@
 from __future__ import annotations
 
+import asyncio
+from bisect import bisect_right
+from collections import deque
 from contextlib import aclosing
 from inspect import isawaitable
-from typing import Any, cast
-from collections.abc import Awaitable
+from operator import itemgetter
+from typing import IO, Any, cast
+from collections.abc import AsyncGenerator, Awaitable, Iterable
 
-from snakestream.callable_dispatch import AsyncDispatch
-from snakestream.sink import Counter, IntermediateSink, Op, Sink, StatefulOp, StatefulSink, StatelessOp
-from snakestream.sort import merge_sort
+from snakestream.callable_dispatch import AsyncDispatch, _apply_each, is_async_callable
+from snakestream.characteristics import Characteristic
+from snakestream.distinct import Seen, Strategy, _digest
+from snakestream.sink import (
+    _UNSET,
+    AwaitRequired,
+    Counter,
+    IntermediateSink,
+    Op,
+    Sink,
+    StatefulOp,
+    StatefulSink,
+    StatelessOp,
+)
+from snakestream.sort import (
+    awaits_comparisons,
+    check_comparator_result_type,
+    merge_runs,
+    read_run,
+    sort_run,
+    write_run,
+)
 from snakestream.type import (
     T,
     Comparator,
@@ -18,6 +41,10 @@ from snakestream.type import (
     StateMap,
 )
 
+# What an op that passes on a subsequence of its input, in the order given,
+# keeps: order, sortedness and distinctness alike.
+_SUBSEQUENCE = Characteristic.ORDERED | Characteristic.SORTED | Characteristic.DISTINCT
+
 
 class _FilterSink(AsyncDispatch, IntermediateSink[T]):
     def __init__(self, downstream: Sink[Any], predicate: Predicate) -> None:
@@ -36,9 +63,32 @@ class _FilterSink(AsyncDispatch, IntermediateSink[T]):
         if keep:
             await self.downstream.accept(element)
 
+    def accept_sync(self, element: Any) -> None:
+        if self._is_async:
+            raise AwaitRequired(self.accept(element))
+        keep = self._fn(element)
+        if not self._checked:
+            self._checked = True
+            if isawaitable(keep):
+                self._is_async = True
+                raise AwaitRequired(self._resume(element, keep))
+        if keep:
+            self.downstream.accept_sync(element)
+
+    async def _resume(self, element: Any, keep: Awaitable[bool]) -> None:
+        if await keep:
+            await self.downstream.accept(element)
+
+    async def accept_batch(self, elements: list[Any]) -> None:
+        keeps, self._is_async, self._checked = await _apply_each(self._fn, self._is_async, self._checked, elements)
+        kept = [element for element, keep in zip(elements, keeps) if keep]
+        if kept:
+            await self.downstream.accept_batch(kept)
+
 
 class _FilterOp(StatelessOp):
     _sink_cls = _FilterSink
+    _keeps = _SUBSEQUENCE
 
 
 class _MapSink(AsyncDispatch, IntermediateSink[T]):
@@ -57,9 +107,28 @@ class _MapSink(AsyncDispatch, IntermediateSink[T]):
                 r = await r
         await self.downstream.accept(r)
 
+    def accept_sync(self, element: Any) -> None:
+        if self._is_async:
+            raise AwaitRequired(self.accept(element))
+        r = self._fn(element)
+        if not self._checked:
+            self._checked = True
+            if isawaitable(r):
+                self._is_async = True
+                raise AwaitRequired(self._resume(r))
+        self.downstream.accept_sync(r)
+
+    async def _resume(self, r: Awaitable[Any]) -> None:
+        await self.downstream.accept(await r)
+
+    async def accept_batch(self, elements: list[Any]) -> None:
+        results, self._is_async, self._checked = await _apply_each(self._fn, self._is_async, self._checked, elements)
+        await self.downstream.accept_batch(results)
+
 
 class _MapOp(StatelessOp):
     _sink_cls = _MapSink
+    _one_to_one = True
 
 
 class _PeekSink(AsyncDispatch, IntermediateSink[T]):
@@ -78,44 +147,437 @@ class _PeekSink(AsyncDispatch, IntermediateSink[T]):
                 await r
         await self.downstream.accept(element)
 
+    def accept_sync(self, element: Any) -> None:
+        if self._is_async:
+            raise AwaitRequired(self.accept(element))
+        r = self._fn(element)
+        if not self._checked:
+            self._checked = True
+            if isawaitable(r):
+                self._is_async = True
+                raise AwaitRequired(self._resume(element, r))
+        self.downstream.accept_sync(element)
+
+    async def _resume(self, element: Any, r: Awaitable[None]) -> None:
+        await r
+        await self.downstream.accept(element)
+
+    async def accept_batch(self, elements: list[Any]) -> None:
+        _, self._is_async, self._checked = await _apply_each(self._fn, self._is_async, self._checked, elements)
+        await self.downstream.accept_batch(elements)
+
 
 class _PeekOp(StatelessOp):
+    """peek(). Every element it sees goes on, but it does not pass on the size:
+    it is there for its callable's side effects, and a count() that knew the
+    size would not run it (see Stream.count)."""
+
     _sink_cls = _PeekSink
+    _keeps = _SUBSEQUENCE
+
+
+# What a fused stage does with its callable's result: take it as the element,
+# keep the element only if it is truthy, or ignore it.
+_MAP, _FILTER, _PEEK = 0, 1, 2
+
+_STAGE_KIND: dict[type[Op], int] = {_MapOp: _MAP, _FilterOp: _FILTER, _PeekOp: _PEEK}
+
+
+class _FusedSink(IntermediateSink[T]):
+    """A run of adjacent map/filter/peek ops as one sink: one accept() per
+    element for the whole run instead of one per op, and one link in the chain
+    for cancellation_requested() to walk past instead of several.
+
+    Each stage keeps its own classification, exactly as its unfused sink's
+    AsyncDispatch state would, so the run is async only from the first stage
+    that is. Until every stage has been confirmed sync, accept_sync() goes the
+    careful way; from then on it is a plain loop with no checks but the
+    stage kind."""
+
+    def __init__(self, downstream: Sink[Any], stages: tuple[tuple[int, Any], ...]) -> None:
+        super().__init__(downstream)
+        self._stages = stages
+        self._is_async = [is_async_callable(fn) for _, fn in stages]
+        self._checked = [False] * len(stages)
+        self._all_sync = False
+
+    async def accept(self, element: Any, start: int = 0) -> None:
+        # `start` is for resuming an element part-way through the run, after
+        # accept_sync() found a stage it could not finish without an await
+        is_async = self._is_async
+        checked = self._checked
+        for i in range(start, len(self._stages)):
+            kind, fn = self._stages[i]
+            r = fn(element)
+            if is_async[i]:
+                r = await r
+            elif not checked[i]:
+                checked[i] = True
+                if isawaitable(r):
+                    is_async[i] = True
+                    r = await r
+            if kind == _MAP:
+                element = r
+            elif kind == _FILTER and not r:
+                return
+        await self.downstream.accept(element)
+
+    async def _resume(self, i: int, element: Any, r: Awaitable[Any]) -> None:
+        kind = self._stages[i][0]
+        r = await r
+        if kind == _MAP:
+            element = r
+        elif kind == _FILTER and not r:
+            return
+        await self.accept(element, i + 1)
+
+    def accept_sync(self, element: Any) -> None:
+        if not self._all_sync:
+            self._accept_sync_checked(element)
+            return
+        for kind, fn in self._stages:
+            r = fn(element)
+            if kind == _MAP:
+                element = r
+            elif kind == _FILTER and not r:
+                return
+        self.downstream.accept_sync(element)
+
+    def _accept_sync_checked(self, element: Any) -> None:
+        is_async = self._is_async
+        checked = self._checked
+        for i, (kind, fn) in enumerate(self._stages):
+            if is_async[i]:
+                raise AwaitRequired(self.accept(element, i))
+            r = fn(element)
+            if not checked[i]:
+                checked[i] = True
+                if isawaitable(r):
+                    is_async[i] = True
+                    raise AwaitRequired(self._resume(i, element, r))
+            if kind == _MAP:
+                element = r
+            elif kind == _FILTER and not r:
+                # the stages after this one have not been checked yet, so
+                # the run cannot be declared all-sync on this element
+                return
+        self._all_sync = all(checked) and not any(is_async)
+        self.downstream.accept_sync(element)
+
+    async def accept_batch(self, elements: list[Any]) -> None:
+        # stage by stage over the whole batch, as the unfused sinks would
+        # hand it along, rather than element by element through the run
+        is_async = self._is_async
+        checked = self._checked
+        for i, (kind, fn) in enumerate(self._stages):
+            results, is_async[i], checked[i] = await _apply_each(fn, is_async[i], checked[i], elements)
+            if kind == _MAP:
+                elements = results
+            elif kind == _FILTER:
+                elements = [element for element, keep in zip(elements, results) if keep]
+                if not elements:
+                    return
+        await self.downstream.accept_batch(elements)
+
+
+class _FusedOp(StatelessOp):
+    """Built only by the compile step in execution, never queued on a stream:
+    a stream's chain always holds the ops the user wrote."""
+
+    _sink_cls = _FusedSink
 
 
 class _SortedSink(IntermediateSink[T]):
-    def __init__(self, downstream: Sink[Any], comparator: Comparator | None, reverse: bool) -> None:
+    """Buffers the stream and pushes it on sorted from end(). With a
+    `spill_after`, the buffer holds no more than that: each time it fills it
+    is sorted and written out to a temporary file as a run, and end() merges
+    the runs, with what is left in the buffer, on the way downstream, so the
+    stream is never in memory whole. The run files are closed when end()
+    finishes, whether the merge ran out or downstream cancelled it.
+
+    `concurrency` is how many calls of an async comparator or key a sort may
+    have in flight at once (see merge_sort and sort_by_key)."""
+
+    def __init__(
+        self,
+        downstream: Sink[Any],
+        comparator: Comparator | None,
+        reverse: bool,
+        key: Mapper | None,
+        spill_after: int | None,
+        concurrency: int,
+    ) -> None:
         super().__init__(downstream)
         self._comparator = comparator
         self._reverse = reverse
+        self._key = key
+        self._spill_after = spill_after
+        self._concurrency = concurrency
         self._buffer: list[Any] = []
+        self._runs: list[IO[bytes]] = []
+        # awaits_comparisons() for the comparator, once a spill has probed it
+        self._awaits: bool | None = None
+
+    def _full(self) -> bool:
+        return self._spill_after is not None and len(self._buffer) >= self._spill_after
 
     async def accept(self, element: Any) -> None:
         self._buffer.append(element)
+        if self._full():
+            await self._spill()
+
+    def accept_sync(self, element: Any) -> None:
+        self._buffer.append(element)
+        if self._full():
+            # sorting a run may await the comparator or the key, so the drive
+            # goes async from the first spill on; pickling it costs far more
+            raise AwaitRequired(self._spill())
+
+    async def accept_batch(self, elements: list[Any]) -> None:
+        self._buffer.extend(elements)
+        if self._full():
+            await self._spill()
+
+    async def _run(self) -> list[Any]:
+        # the buffer, emptied, in the order it is emitted in: reversed under
+        # reverse, and as (key, element) pairs under a key
+        run, self._buffer = self._buffer, []
+        comparator = self._comparator
+        if comparator is not None and self._awaits is None and self._spill_after is not None and len(run) > 1:
+            self._awaits = await awaits_comparisons(comparator, run[0], run[1])
+        return await sort_run(run, comparator, self._reverse, self._key, self._awaits, self._concurrency)
+
+    async def _spill(self) -> None:
+        self._runs.append(write_run(await self._run()))
+
+    async def end(self) -> None:
+        try:
+            run = await self._run()
+            if not self._runs:
+                for item in run:
+                    if await self._push(item):
+                        break
+            else:
+                async with aclosing(self._merged(run)) as merged:
+                    async for item in merged:
+                        if await self._push(item):
+                            break
+        finally:
+            for f in self._runs:
+                f.close()
+        await super().end()
+
+    def _merged(self, run: list[Any]) -> AsyncGenerator[Any, None]:
+        runs: list[Iterable[Any]] = [*map(read_run, self._runs), run]
+        if self._reverse:
+            # later runs first, so that a tie goes to the later element, as
+            # reversing one stable sort of the whole stream would have it
+            runs.reverse()
+        key = itemgetter(0) if self._key is not None else None
+        return merge_runs(runs, self._reverse, self._comparator, bool(self._awaits), key)
+
+    async def _push(self, item: Any) -> bool:
+        await self.downstream.accept(item[1] if self._key is not None else item)
+        # the whole stream is flushed in one go, with no driving loop in
+        # between to notice cancellation - so check it here, the same way
+        # _FlatMapSink does between the elements of one inner stream
+        return self.downstream.cancellation_requested()
+
+
+class _SortedOp(StatelessOp):
+    _sink_cls = _SortedSink
+    _one_to_one = True
+
+    def natural(self) -> bool:
+        """Whether this sorts in ascending natural order: no comparator, no key,
+        not reversed."""
+        comparator, reverse, key = self._args[:3]
+        return comparator is None and key is None and not reverse
+
+    def characteristics(self, upstream: Characteristic) -> Characteristic:
+        ordered = upstream & Characteristic.DISTINCT | Characteristic.ORDERED
+        return ordered | Characteristic.SORTED if self.natural() else ordered
+
+
+class _SortedRunsSink(_SortedSink):
+    """One racing branch's share of a sorted(): spilled into sorted runs as
+    _SortedSink would spill them, but pushed on from end() as a single value,
+    (run files, the unsorted rest, whether the comparator awaits), for
+    execution.sorted_race_through() to sort and merge with every other
+    branch's, and to close the run files once it has.
+
+    Built only by the racing executors; the chain a user builds still holds
+    the _SortedOp."""
 
     async def end(self) -> None:
-        cache = self._buffer
-        if self._comparator is not None:
-            # Always merge_sort here rather than list.sort()+cmp_to_key: the
-            # comparator may be an async-__call__ object, which needs an await
-            # merge_sort's _merge already does. Trades away Timsort's speed for
-            # sync comparators; see the add-maybe-await-helper design doc.
-            cache = await merge_sort(cache, self._comparator)
+        rest, self._buffer = self._buffer, []
+        await self.downstream.accept((self._runs, rest, self._awaits))
+        await self.downstream.end()
+
+
+class _SortedRunsOp(StatelessOp):
+    _sink_cls = _SortedRunsSink
+
+
+class _TopKSink(AsyncDispatch, IntermediateSink[T]):
+    """sorted() directly followed by limit(k), holding k elements rather than
+    the whole stream: the k that sort first so far, kept in sorted order. Once
+    k are held, a new element is first compared with the one it would have to
+    displace - the last kept, or the first under `reverse` - so most elements
+    of a long stream are dropped after one comparison; one that is kept is
+    placed by binary search.
+
+    Stable, as sorted() is: an element is placed after every kept element it
+    ties with. Under `reverse` that makes the later of two ties the one kept,
+    since reversing a stable ascending order puts it first. A `key` is called
+    once per element, and the kept keys are what a new one is compared with.
+
+    Built only by the compile step (see execution._compile); the chain a user
+    builds still holds the _SortedOp."""
+
+    def __init__(
+        self, downstream: Sink[Any], comparator: Comparator | None, reverse: bool, key: Mapper | None, k: int
+    ) -> None:
+        super().__init__(downstream)
+        # one of the comparator and the key at most, so one dispatch serves
+        self._by_comparator = comparator is not None
+        fn = comparator if comparator is not None else key
+        if fn is None:
+            self._is_async = False
+        else:
+            self._init_dispatch(fn)
+        self._keyed = key is not None
+        self._reverse = reverse
+        self._k = k
+        self._kept: list[Any] = []
+        # natural order compares the kept elements themselves
+        self._keys: list[Any] = [] if self._keyed else self._kept
+
+    def _probe(self) -> int:
+        # the first index to compare a new element with: the kept element it
+        # would displace once k are held, the middle of them until then
+        if len(self._kept) < self._k:
+            return len(self._kept) // 2
+        return 0 if self._reverse else self._k - 1
+
+    def _place(self, element: Any, index: int) -> None:
+        kept = self._kept
+        if len(kept) == self._k and index == (0 if self._reverse else self._k):
+            return
+        kept.insert(index, element)
+        if len(kept) > self._k:
+            kept.pop(0 if self._reverse else -1)
+
+    def _place_by_key(self, element: Any, key: Any) -> None:
+        keys = self._keys
+        if len(keys) == self._k and (key < keys[0] if self._reverse else not key < keys[-1]):
+            return
+        index = bisect_right(keys, key)
+        keys.insert(index, key)
+        if self._keyed:
+            self._kept.insert(index, element)
+        if len(keys) > self._k:
+            end = 0 if self._reverse else -1
+            keys.pop(end)
+            if self._keyed:
+                self._kept.pop(end)
+
+    async def accept(self, element: Any) -> None:
+        if self._by_comparator:
+            await self._search(element, 0, len(self._kept), self._probe(), None)
+        elif not self._keyed:
+            self._place_by_key(element, element)
         else:
-            cache.sort()
-        items = reversed(cache) if self._reverse else cache
+            key = self._fn(element)
+            if self._is_async:
+                key = await key
+            elif not self._checked:
+                self._checked = True
+                if isawaitable(key):
+                    self._is_async = True
+                    key = await key
+            self._place_by_key(element, key)
+
+    def accept_sync(self, element: Any) -> None:
+        if not self._by_comparator and not self._keyed:
+            self._place_by_key(element, element)
+            return
+        if self._is_async:
+            raise AwaitRequired(self.accept(element))
+        if self._keyed:
+            self._key_sync(element)
+            return
+        lo, hi, mid = 0, len(self._kept), self._probe()
+        while lo < hi:
+            sign = self._fn(element, self._kept[mid])
+            if not self._checked:
+                self._checked = True
+                if isawaitable(sign):
+                    self._is_async = True
+                    raise AwaitRequired(self._search(element, lo, hi, mid, sign))
+            lo, hi = _narrow(sign, lo, hi, mid)
+            mid = (lo + hi) // 2
+        self._place(element, lo)
+
+    def _key_sync(self, element: Any) -> None:
+        key = self._fn(element)
+        if not self._checked:
+            self._checked = True
+            if isawaitable(key):
+                self._is_async = True
+                raise AwaitRequired(self._place_awaited(element, key))
+        self._place_by_key(element, key)
+
+    async def _place_awaited(self, element: Any, key: Awaitable[Any]) -> None:
+        self._place_by_key(element, await key)
+
+    async def _search(self, element: Any, lo: int, hi: int, mid: int, pending: Awaitable[int] | None) -> None:
+        # bisect_right over self._kept[lo:hi], starting from `mid`, and from an
+        # already-made comparison when accept_sync() found the comparator async
+        while lo < hi:
+            if pending is not None:
+                sign, pending = await pending, None
+            else:
+                sign = self._fn(element, self._kept[mid])
+                if self._is_async:
+                    sign = await sign
+                elif not self._checked:
+                    self._checked = True
+                    if isawaitable(sign):
+                        self._is_async = True
+                        sign = await sign
+            lo, hi = _narrow(sign, lo, hi, mid)
+            mid = (lo + hi) // 2
+        self._place(element, lo)
+
+    async def accept_batch(self, elements: list[Any]) -> None:
+        for element in elements:
+            if self._is_async:
+                await self.accept(element)
+                continue
+            try:
+                self.accept_sync(element)
+            except AwaitRequired as e:
+                await e.pending
+
+    async def end(self) -> None:
+        items = reversed(self._kept) if self._reverse else self._kept
         for item in items:
             await self.downstream.accept(item)
-            # the whole buffer is flushed in one go, with no driving loop in
-            # between to notice cancellation - so check it here, the same way
-            # _FlatMapSink does between the elements of one inner stream
             if self.downstream.cancellation_requested():
                 break
         await super().end()
 
 
-class _SortedOp(StatelessOp):
-    _sink_cls = _SortedSink
+def _narrow(sign: int, lo: int, hi: int, mid: int) -> tuple[int, int]:
+    # one bisect_right step: ties go right, after the kept element
+    if type(sign) is not int:
+        check_comparator_result_type(sign)
+    return (lo, mid) if sign < 0 else (mid + 1, hi)
+
+
+class _TopKOp(StatelessOp):
+    _sink_cls = _TopKSink
 
 
 class _FlatMapSink(IntermediateSink[T]):
@@ -135,6 +597,193 @@ class _FlatMapOp(StatelessOp):
     _sink_cls = _FlatMapSink
 
 
+class _MergeFlatMapSink(IntermediateSink[T]):
+    """flat_map() with up to `concurrency` inner streams running at once, their
+    elements pushed downstream as they arrive. Each running inner stream has
+    one __anext__() in flight, its own task, keyed by that task as merge()
+    keys its sources. accept() starts an inner stream, then pushes whatever
+    has arrived, waiting only while the window is full; end() drains the rest.
+
+    Once downstream requests cancellation, or an inner stream or the flat
+    mapper raises, every pull still in flight is cancelled and every inner
+    stream closed, so none outlives the sink's part in the drive."""
+
+    def __init__(self, downstream: Sink[Any], flat_mapper: FlatMapper, concurrency: int) -> None:
+        super().__init__(downstream)
+        self._flat_mapper = flat_mapper
+        self._concurrency = concurrency
+        self._in_flight: dict[asyncio.Future[Any], AsyncGenerator] = {}
+        self._cancelled = False
+
+    async def accept(self, element: Any) -> None:
+        try:
+            self._pull(self._flat_mapper(element)._compose())
+            await self._push_arrived(self._concurrency - 1)
+        except BaseException:
+            await self._close_inner()
+            raise
+
+    def _pull(self, inner: AsyncGenerator) -> None:
+        self._in_flight[asyncio.ensure_future(inner.__anext__())] = inner
+
+    async def _push_arrived(self, keep: int) -> None:
+        """Push elements downstream until at most `keep` inner streams are
+        running, along with any others that have already arrived."""
+        while self._in_flight and not self._cancelled:
+            if len(self._in_flight) > keep:
+                await asyncio.wait(self._in_flight, return_when=asyncio.FIRST_COMPLETED)
+            arrived = [pull for pull in self._in_flight if pull.done()]
+            if not arrived:
+                return
+            for pull in arrived:
+                inner = self._in_flight.pop(pull)
+                try:
+                    element = pull.result()
+                except StopAsyncIteration:
+                    await inner.aclose()
+                    continue
+                self._pull(inner)
+                await self.downstream.accept(element)
+                if self.downstream.cancellation_requested():
+                    self._cancelled = True
+                    break
+        if self._cancelled:
+            await self._close_inner()
+
+    async def _close_inner(self) -> None:
+        pulls = list(self._in_flight)
+        inners = list(self._in_flight.values())
+        self._in_flight.clear()
+        for pull in pulls:
+            pull.cancel()
+        await asyncio.gather(*pulls, return_exceptions=True)
+        for inner in inners:
+            await inner.aclose()
+
+    async def end(self) -> None:
+        try:
+            await self._push_arrived(0)
+        except BaseException:
+            await self._close_inner()
+            raise
+        await super().end()
+
+    def cancellation_requested(self) -> bool:
+        return self._cancelled or super().cancellation_requested()
+
+
+class _MergeFlatMapOp(StatelessOp):
+    _sink_cls = _MergeFlatMapSink
+    # inner streams interleave, so no order holds between them
+    _keeps = Characteristic.NONE
+
+
+class _MapAsyncSink(AsyncDispatch, IntermediateSink[T]):
+    """map() with up to `concurrency` calls of its mapper in flight at once,
+    each its own task. accept() starts a call, then pushes downstream whatever
+    has finished - in encounter order when `ordered`, as completed otherwise -
+    waiting only when the window is full. end() drains the rest.
+
+    Once downstream requests cancellation, or a call raises, every call still
+    in flight is cancelled and awaited, so no task outlives the sink's part in
+    the drive."""
+
+    def __init__(self, downstream: Sink[Any], mapper: Mapper, concurrency: int, ordered: bool) -> None:
+        super().__init__(downstream)
+        self._init_dispatch(mapper)
+        self._concurrency = concurrency
+        self._ordered = ordered
+        self._in_flight: deque[asyncio.Future[Any]] = deque()
+        self._cancelled = False
+
+    async def accept(self, element: Any) -> None:
+        try:
+            self._in_flight.append(self._start(element))
+            await self._push_finished(self._concurrency - 1)
+        except BaseException:
+            await self._cancel_in_flight()
+            raise
+
+    def _start(self, element: Any) -> asyncio.Future[Any]:
+        r = self._fn(element)
+        if not self._is_async and not self._checked:
+            self._checked = True
+            self._is_async = isawaitable(r)
+        if self._is_async:
+            return asyncio.ensure_future(cast("Awaitable[Any]", r))
+        # a sync mapper has nothing to overlap; it has already run, and its
+        # result only waits its turn in the window
+        done = asyncio.get_running_loop().create_future()
+        done.set_result(r)
+        return done
+
+    async def _push_finished(self, keep: int) -> None:
+        """Push results downstream until at most `keep` calls are in flight,
+        along with any others that have already finished."""
+        while self._in_flight and not self._cancelled:
+            finished = await (self._next_in_order(keep) if self._ordered else self._next_completed(keep))
+            if not finished:
+                return
+            for call in finished:
+                self._in_flight.remove(call)
+                await self._push(call.result())
+                if self._cancelled:
+                    break
+        if self._cancelled:
+            await self._cancel_in_flight()
+
+    async def _next_in_order(self, keep: int) -> list[asyncio.Future[Any]]:
+        in_flight = self._in_flight
+        head = in_flight[0]
+        if len(in_flight) <= keep and not head.done():
+            return []
+        # waiting on the head alone would hide a later call's failure until
+        # the head finished, however long that took
+        while not head.done():
+            await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for call in in_flight:
+                if call.done() and call.exception() is not None:
+                    call.result()
+        return [head]
+
+    async def _next_completed(self, keep: int) -> list[asyncio.Future[Any]]:
+        if len(self._in_flight) > keep:
+            await asyncio.wait(self._in_flight, return_when=asyncio.FIRST_COMPLETED)
+        return [call for call in self._in_flight if call.done()]
+
+    async def _push(self, result: Any) -> None:
+        await self.downstream.accept(result)
+        if self.downstream.cancellation_requested():
+            self._cancelled = True
+
+    async def _cancel_in_flight(self) -> None:
+        calls = list(self._in_flight)
+        self._in_flight.clear()
+        for call in calls:
+            call.cancel()
+        await asyncio.gather(*calls, return_exceptions=True)
+
+    async def end(self) -> None:
+        try:
+            await self._push_finished(0)
+        except BaseException:
+            await self._cancel_in_flight()
+            raise
+        await super().end()
+
+    def cancellation_requested(self) -> bool:
+        return self._cancelled or super().cancellation_requested()
+
+
+class _MapAsyncOp(StatelessOp):
+    _sink_cls = _MapAsyncSink
+    _one_to_one = True
+
+    def characteristics(self, upstream: Characteristic) -> Characteristic:
+        ordered = self._args[2]
+        return upstream & Characteristic.ORDERED if ordered else Characteristic.NONE
+
+
 class _DistinctSink(StatefulSink[T]):
     async def accept(self, element: Any) -> None:
         if element in self._state:
@@ -142,12 +791,164 @@ class _DistinctSink(StatefulSink[T]):
         self._state.add(element)
         await self.downstream.accept(element)
 
+    def accept_sync(self, element: Any) -> None:
+        if element in self._state:
+            return
+        self._state.add(element)
+        self.downstream.accept_sync(element)
+
+    async def accept_batch(self, elements: list[Any]) -> None:
+        seen = self._state
+        fresh = []
+        for element in elements:
+            if element not in seen:
+                seen.add(element)
+                fresh.append(element)
+        if fresh:
+            await self.downstream.accept_batch(fresh)
+
 
 class _DistinctOp(StatefulOp):
+    """distinct(), remembering what it has seen in whatever record `strategy`
+    makes (see snakestream.distinct); a plain set unless told otherwise."""
+
     _sink_cls = _DistinctSink
 
-    def make_shared_state(self) -> set:
-        return set()
+    def __init__(self, strategy: Strategy = set) -> None:
+        super().__init__()
+        self._strategy = strategy
+
+    def make_shared_state(self) -> Seen:
+        return self._strategy()
+
+    def characteristics(self, upstream: Characteristic) -> Characteristic:
+        # only the exact record is sure never to let a repeat through
+        return upstream | Characteristic.DISTINCT if self._strategy is set else upstream
+
+
+class _DistinctBySink(AsyncDispatch, StatefulSink[T]):
+    """distinct() by what `key` returns for each element: the keys go into the
+    record, or with `digest` a 64-bit digest of each, and the first element
+    with a given key is the one let through. Digests compare keys by their
+    encoding rather than by == (see distinct._digest)."""
+
+    def __init__(self, downstream: Sink[Any], op: Op, key: Mapper, digest: bool = False) -> None:
+        super().__init__(downstream, op)
+        self._init_dispatch(key)
+        self._digest = digest
+
+    def _first(self, k: Any) -> bool:
+        if self._digest:
+            k = _digest(k)
+        # no await between the check and the add, for racing branches
+        if k in self._state:
+            return False
+        self._state.add(k)
+        return True
+
+    async def accept(self, element: Any) -> None:
+        k = self._fn(element)
+        if self._is_async:
+            k = await k
+        elif not self._checked:
+            self._checked = True
+            if isawaitable(k):
+                self._is_async = True
+                k = await k
+        if self._first(k):
+            await self.downstream.accept(element)
+
+    def accept_sync(self, element: Any) -> None:
+        if self._is_async:
+            raise AwaitRequired(self.accept(element))
+        k = self._fn(element)
+        if not self._checked:
+            self._checked = True
+            if isawaitable(k):
+                self._is_async = True
+                raise AwaitRequired(self._resume(element, k))
+        if self._first(k):
+            self.downstream.accept_sync(element)
+
+    async def _resume(self, element: Any, k: Awaitable[Any]) -> None:
+        if self._first(await k):
+            await self.downstream.accept(element)
+
+    async def accept_batch(self, elements: list[Any]) -> None:
+        keys, self._is_async, self._checked = await _apply_each(self._fn, self._is_async, self._checked, elements)
+        fresh = [element for k, element in zip(keys, elements) if self._first(k)]
+        if fresh:
+            await self.downstream.accept_batch(fresh)
+
+
+class _DistinctByOp(StatefulOp):
+    _sink_cls = _DistinctBySink
+    # unequal keys say nothing of == between elements, so not DISTINCT
+    _keeps = _SUBSEQUENCE
+
+    def __init__(self, key: Mapper, strategy: Strategy = set, digest: bool = False) -> None:
+        super().__init__(key, digest)
+        self._strategy = strategy
+
+    def make_shared_state(self) -> Seen:
+        return self._strategy()
+
+
+class _AdjacentDistinctSink(IntermediateSink[T]):
+    """distinct() over a stream in which equal elements arrive next to each
+    other: an element is dropped if it equals the one before it, so only that
+    one is remembered, not every element seen.
+
+    Built only by the compile step (see execution._adjacent_distinct), which
+    proves the order first; the chain a user builds still holds the
+    _DistinctOp."""
+
+    def __init__(self, downstream: Sink[Any]) -> None:
+        super().__init__(downstream)
+        self._last: Any = _UNSET
+
+    def _repeats(self, element: Any) -> bool:
+        last, self._last = self._last, element
+        # `is` first, as a set's lookup does, for an element not equal to itself
+        return element is last or element == last
+
+    async def accept(self, element: Any) -> None:
+        if not self._repeats(element):
+            await self.downstream.accept(element)
+
+    def accept_sync(self, element: Any) -> None:
+        if not self._repeats(element):
+            self.downstream.accept_sync(element)
+
+    async def accept_batch(self, elements: list[Any]) -> None:
+        fresh = [element for element in elements if not self._repeats(element)]
+        if fresh:
+            await self.downstream.accept_batch(fresh)
+
+
+class _AdjacentDistinctOp(StatelessOp):
+    _sink_cls = _AdjacentDistinctSink
+
+
+class _AssumeSortedOp(Op):
+    """assume_sorted(): links no sink of its own. It only marks the chain, for
+    the compile step, as sorted in natural order from here on - descending,
+    if `descending`, which still puts equal elements next to each other but
+    is not SORTED."""
+
+    _keeps = _SUBSEQUENCE
+    _one_to_one = True
+
+    def __init__(self, descending: bool = False) -> None:
+        self._descending = descending
+
+    def link(self, downstream: Sink[Any]) -> Sink[Any]:
+        return downstream
+
+    def characteristics(self, upstream: Characteristic) -> Characteristic:
+        if self._descending:
+            return upstream & ~Characteristic.SORTED
+        return upstream | Characteristic.SORTED
 
 
 class _LimitSink(StatefulSink[T]):
@@ -177,12 +978,38 @@ class _LimitSink(StatefulSink[T]):
             self._cancelled = True
         await self.downstream.accept(element)
 
+    def accept_sync(self, element: Any) -> None:
+        if self._state.value >= self._max_size:
+            self._cancelled = True
+            return
+        self._state.value += 1
+        if self._state.value >= self._max_size:
+            self._cancelled = True
+        self.downstream.accept_sync(element)
+
+    async def accept_batch(self, elements: list[Any]) -> None:
+        # the same reservation as accept(), for as much of the batch as fits
+        room = self._max_size - self._state.value
+        if room <= 0:
+            self._cancelled = True
+            return
+        taken = elements if len(elements) <= room else elements[:room]
+        self._state.value += len(taken)
+        if self._state.value >= self._max_size:
+            self._cancelled = True
+        await self.downstream.accept_batch(taken)
+
     def cancellation_requested(self) -> bool:
         return self._cancelled or super().cancellation_requested()
 
 
 class _LimitOp(StatefulOp):
     _sink_cls = _LimitSink
+    _keeps = _SUBSEQUENCE
+
+    def size(self, upstream: int) -> int | None:
+        # a negative limit passes nothing, as the sink has it
+        return min(upstream, max(self._args[0], 0))
 
     def make_shared_state(self) -> Counter:
         return Counter()
@@ -199,9 +1026,29 @@ class _SkipSink(StatefulSink[T]):
             return
         await self.downstream.accept(element)
 
+    def accept_sync(self, element: Any) -> None:
+        if self._state.value < self._n:
+            self._state.value += 1
+            return
+        self.downstream.accept_sync(element)
+
+    async def accept_batch(self, elements: list[Any]) -> None:
+        dropped = min(self._n - self._state.value, len(elements))
+        if dropped > 0:
+            self._state.value += dropped
+            elements = elements[dropped:]
+            if not elements:
+                return
+        await self.downstream.accept_batch(elements)
+
 
 class _SkipOp(StatefulOp):
     _sink_cls = _SkipSink
+    _keeps = _SUBSEQUENCE
+
+    def size(self, upstream: int) -> int | None:
+        # a negative skip drops nothing, as the sink has it
+        return max(upstream - max(self._args[0], 0), 0)
 
     def make_shared_state(self) -> Counter:
         return Counter()
@@ -2,9 +2,10 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from typing import Any, ClassVar, Generic
-from collections.abc import Callable
+from collections.abc import Awaitable, Callable
 
 from snakestream.callable_dispatch import _maybe_await
+from snakestream.characteristics import Characteristic
 from snakestream.type import StateMap, T
 
 # Sentinel for "no value yet": distinguishes an unseeded reduction/accumulation
@@ -34,9 +35,36 @@ class Counter(Box):
         super().__init__(value)
 
 
+class AwaitRequired(Exception):
+    """Raised by accept_sync() for an element whose processing needs an await
+    after all. `pending` is the rest of that element's processing, from the
+    raising sink downstream: the driving loop awaits it and then carries on
+    with accept() for every element after.
+
+    A sink can only raise this, or let it pass through from its downstream, as
+    the last thing it does for an element - which holds because every sink's
+    accept_sync() pushes downstream last - so nothing upstream of the raising
+    sink is left half-done for that element."""
+
+    def __init__(self, pending: Awaitable[None]) -> None:
+        super().__init__()
+        self.pending = pending
+
+
 class Sink(ABC, Generic[T]):
     """Push-based op protocol: begin(state_map) / accept(element) / end(),
-    plus a synchronous cancellation_requested() query."""
+    plus a synchronous cancellation_requested() query.
+
+    accept_sync() is accept() for a driving loop with no event-loop hop per
+    element. It is optional: the default hands the whole element to accept()
+    by raising AwaitRequired, which turns the drive async from that element
+    on. A sink overrides it when it can usually finish an element without
+    awaiting, and raises AwaitRequired itself when it finds it cannot.
+
+    accept_batch() is accept() for a list of elements, in a stream switched to
+    batch mode with .batched(). Also optional: the default accepts them one at
+    a time, stopping once cancellation is requested, and a sink overrides it
+    when it can do a whole list in one go. A batch is never empty."""
 
     @abstractmethod
     async def begin(self, state_map: StateMap) -> None: ...
@@ -44,6 +72,15 @@ class Sink(ABC, Generic[T]):
     @abstractmethod
     async def accept(self, element: T) -> None: ...
 
+    def accept_sync(self, element: T) -> None:
+        raise AwaitRequired(self.accept(element))
+
+    async def accept_batch(self, elements: list[T]) -> None:
+        for element in elements:
+            await self.accept(element)
+            if self.cancellation_requested():
+                return
+
     @abstractmethod
     async def end(self) -> None: ...
 
@@ -60,7 +97,15 @@ class Op(ABC):
     share when several chains are built from the same op list (see
     ParallelStream), or None for a stateless op. None means "no shared state",
     so an op that does need state returns a container — a set, a list, a
-    counter object — never None."""
+    counter object — never None.
+
+    characteristics() and size() say what the op's output is known to be from
+    what its input is known to be (see snakestream.characteristics). By default
+    an op keeps the characteristics in _keeps, the encounter order alone, and
+    knows its size only if it is _one_to_one: one element out per element in."""
+
+    _keeps: ClassVar[Characteristic] = Characteristic.ORDERED
+    _one_to_one: ClassVar[bool] = False
 
     @abstractmethod
     def link(self, downstream: Sink[Any]) -> Sink[Any]: ...
@@ -68,6 +113,12 @@ class Op(ABC):
     def make_shared_state(self) -> Any:
         return None
 
+    def characteristics(self, upstream: Characteristic) -> Characteristic:
+        return upstream & self._keeps
+
+    def size(self, upstream: int) -> int | None:
+        return upstream if self._one_to_one else None
+
 
 class StatelessOp(Op):
     """An Op that holds the arguments it was constructed with and hands them to
@@ -200,3 +251,6 @@ class GeneratorBridgeSink(TerminalSink[T]):
 
     async def accept(self, element: T) -> None:
         self._container.append(element)
+
+    async def accept_batch(self, elements: list[T]) -> None:
+        self._container.extend(elements)
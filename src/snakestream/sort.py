@@ -1,6 +1,19 @@
+import asyncio
+import heapq
+import pickle
+import tempfile
+from functools import cmp_to_key
 from inspect import isawaitable
+from operator import itemgetter
 
-from snakestream.callable_dispatch import is_async_callable
+from snakestream.callable_dispatch import _apply_each, is_async_callable
+
+# How many elements of a spilled run go into one pickle: enough that pickling
+# is paid per chunk rather than per element, few enough that merging many runs
+# holds only this many of each in memory.
+RUN_CHUNK: int = 1024
+
+_EXHAUSTED = object()
 
 
 def check_comparator_result_type(value: int) -> None:
@@ -30,38 +43,225 @@ def is_new_extremum(sign: int, asc: bool) -> bool:
     return sign < 0 if asc else sign > 0
 
 
-async def merge_sort(arr, comparator):
-    # state[0] = is_async, state[1] = checked; a shared mutable list so the
-    # classification made in one _merge call is visible to every other
-    # _merge call in this merge_sort run, not just recursive callees.
-    state = [is_async_callable(comparator), False]
-    return await _merge_sort(arr, comparator, state)
+async def awaits_comparisons(comparator, a, b):
+    """Whether comparator has to be awaited. is_async_callable() settles most
+    comparators up front; one it calls sync may still be a plain `def
+    __call__` returning a coroutine, so `a` and `b` are compared as a probe,
+    whose result is awaited if need be and checked either way.
+
+    The probe is also the one result list.sort() has checked against the
+    3-way int contract: a comparator returns one type, as it is one kind of
+    callable, and checking every comparison in Python cost half again the
+    sort's time (0.51s against 0.34s over 100k ints)."""
+    if is_async_callable(comparator):
+        return True
+    probe = comparator(a, b)
+    if isawaitable(probe):
+        check_comparator_result_type(await probe)
+        return True
+    check_comparator_result_type(probe)
+    return False
+
+
+async def sort_by_comparator(arr, comparator, awaits=None, concurrency=1):
+    """arr sorted by a 3-way comparator, stably. A sync comparator gets
+    list.sort() through cmp_to_key - Timsort, in C, with no coroutine per
+    comparison - and only an async one gets merge_sort, which awaits each,
+    up to `concurrency` at once. `awaits` is awaits_comparisons() for this
+    comparator, when a caller sorting more than once has it already;
+    otherwise the first pair is the probe."""
+    if len(arr) < 2:
+        return arr
+    if awaits is None:
+        awaits = await awaits_comparisons(comparator, arr[0], arr[1])
+    if awaits:
+        return await merge_sort(arr, comparator, concurrency)
+    arr.sort(key=cmp_to_key(comparator))
+    return arr
+
+
+async def sort_by_key(arr, key, concurrency=1):
+    """arr as (key, element) pairs sorted by key, stably. The key is called
+    once per element, sync or async, and the keys compared by their natural
+    order; the elements themselves are never compared. An async key is
+    awaited for up to `concurrency` elements at once."""
+    if concurrency > 1 and arr:
+        keys = await _keys_concurrently(arr, key, concurrency)
+    else:
+        keys, _, _ = await _apply_each(key, is_async_callable(key), False, arr)
+    pairs = list(zip(keys, arr))
+    pairs.sort(key=itemgetter(0))
+    return pairs
+
+
+async def _keys_concurrently(arr, key, concurrency):
+    # classified by the first call, as _apply_each() does: a sync key is just
+    # called down the list, and only an async one pays for a task per element
+    first = key(arr[0])
+    if not isawaitable(first):
+        return [first, *map(key, arr[1:])]
+    slots = asyncio.Semaphore(concurrency)
+
+    async def first_key():
+        async with slots:
+            return await first
+
+    async def awaited(element):
+        # the call is made once a slot is free, so a key cancelled before its
+        # turn never leaves an unawaited coroutine behind
+        async with slots:
+            return await key(element)
+
+    return await _gather_all([first_key(), *(awaited(element) for element in arr[1:])])
+
+
+async def _gather_all(aws):
+    """asyncio.gather(), except that once one of them raises, the rest are
+    cancelled and waited for before it propagates, so no call outlives the
+    sort that made it."""
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+async def sort_run(run, comparator, reverse, key, awaits=None, concurrency=1):
+    """run sorted, in place where it can be, into the order it is to be
+    emitted in: descending under `reverse`, and as (key, element) pairs under a
+    `key`. By the key, by the comparator, or by natural order, in that order."""
+    if key is not None:
+        run = await sort_by_key(run, key, concurrency)
+    elif comparator is not None:
+        run = await sort_by_comparator(run, comparator, awaits, concurrency)
+    else:
+        run.sort()
+    if reverse:
+        run.reverse()
+    return run
+
+
+def write_run(run):
+    """A sorted run pickled to an anonymous temporary file, RUN_CHUNK elements
+    per pickle, and rewound for read_run(). The file has no name to clean up:
+    closing it, or its being collected, releases the disk."""
+    f = tempfile.TemporaryFile()
+    try:
+        for i in range(0, len(run), RUN_CHUNK):
+            pickle.dump(run[i : i + RUN_CHUNK], f, pickle.HIGHEST_PROTOCOL)
+        f.seek(0)
+    except BaseException:
+        f.close()
+        raise
+    return f
+
+
+def read_run(f):
+    """A run back from write_run(), one chunk in memory at a time."""
+    while True:
+        try:
+            chunk = pickle.load(f)
+        except EOFError:
+            return
+        yield from chunk
+
+
+async def merge_runs(runs, reverse, comparator=None, awaits=False, key=None):
+    """Sorted runs, each already in the order it is to be emitted in
+    (descending under `reverse`), merged into one such order: by `key`, by a
+    sync comparator through cmp_to_key, or by natural order, with
+    heapq.merge(); by an async comparator with a scan of the run heads that
+    awaits each comparison, since a heap cannot. Ties go to the run given
+    first, as heapq.merge() resolves them."""
+    if awaits:
+        async for item in _merge_awaiting(runs, comparator, reverse):
+            yield item
+        return
+    if comparator is not None:
+        key = cmp_to_key(comparator)
+    for item in heapq.merge(*runs, key=key, reverse=reverse):
+        yield item
+
+
+async def _merge_awaiting(runs, comparator, reverse):
+    # each run's next element, and the rest of that run, side by side
+    heads = []
+    rests = []
+    for run in runs:
+        rest = iter(run)
+        head = next(rest, _EXHAUSTED)
+        if head is not _EXHAUSTED:
+            heads.append(head)
+            rests.append(rest)
+    while heads:
+        best = 0
+        for i in range(1, len(heads)):
+            sign = await comparator(heads[i], heads[best])
+            check_comparator_result_type(sign)
+            # strictly, so that the earlier of tied heads stays best
+            if sign > 0 if reverse else sign < 0:
+                best = i
+        yield heads[best]
+        head = next(rests[best], _EXHAUSTED)
+        if head is _EXHAUSTED:
+            del heads[best], rests[best]
+        else:
+            heads[best] = head
+
+
+async def merge_sort(arr, comparator, concurrency=1):
+    """arr sorted by an async 3-way comparator, stably, awaiting each
+    comparison. sort_by_comparator() is the entry point; it sends a sync
+    comparator to list.sort() instead.
+
+    The two halves of every split are independent, so with a `concurrency`
+    above 1 they are sorted concurrently, with at most that many comparisons
+    in flight. Only the merges along one path down the tree then wait on each
+    other: about 2n comparisons' latency end to end, against n log n one at
+    a time."""
+    if concurrency > 1:
+        slots = asyncio.Semaphore(concurrency)
+
+        async def bounded(a, b):
+            async with slots:
+                return await comparator(a, b)
+
+        return await _merge_sort_concurrently(arr, bounded)
+    return await _merge_sort(arr, comparator)
+
+
+async def _merge_sort(arr, comparator):
+    if len(arr) <= 1:
+        return arr
+
+    middle = len(arr) // 2
+    left = await _merge_sort(arr[:middle], comparator)
+    right = await _merge_sort(arr[middle:], comparator)
+
+    return await _merge(left, right, comparator)
 
 
-async def _merge_sort(arr, comparator, state):
+async def _merge_sort_concurrently(arr, comparator):
     if len(arr) <= 1:
         return arr
 
     middle = len(arr) // 2
-    left = await _merge_sort(arr[:middle], comparator, state)
-    right = await _merge_sort(arr[middle:], comparator, state)
+    left, right = await _gather_all(
+        [_merge_sort_concurrently(arr[:middle], comparator), _merge_sort_concurrently(arr[middle:], comparator)]
+    )
 
-    return await _merge(left, right, comparator, state)
+    return await _merge(left, right, comparator)
 
 
-async def _merge(left, right, comparator, state):
+async def _merge(left, right, comparator):
     result = []
     i = 0
     j = 0
     while i < len(left) and j < len(right):
-        sign = comparator(left[i], right[j])
-        if state[0]:
-            sign = await sign
-        elif not state[1]:
-            state[1] = True
-            if isawaitable(sign):
-                state[0] = True
-                sign = await sign
+        sign = await comparator(left[i], right[j])
         check_comparator_result_type(sign)
         if sign <= 0:
             result.append(left[i])
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from itertools import islice
+from typing import Any
+from collections.abc import Iterable, Iterator, MappingView, Sequence, Set
+
+from snakestream.characteristics import Characteristic
+
+
+class SyncSource:
+    """A sync iterable presented as an async iterator, so that everything that
+    pulls from a stream's source sees one protocol, while a driver that knows
+    the difference can reach through to `iterator` and pull with a plain `for`.
+
+    The iterator is taken on first use rather than at construction, as the
+    async generator this replaces did: an iterable whose __iter__ has side
+    effects still sees them only once the stream is run."""
+
+    __slots__ = ("_iterable", "_iterator")
+
+    def __init__(self, iterable: Iterable[Any]) -> None:
+        self._iterable = iterable
+        self._iterator: Iterator[Any] | None = None
+
+    @property
+    def iterator(self) -> Iterator[Any]:
+        if self._iterator is None:
+            self._iterator = iter(self._iterable)
+        return self._iterator
+
+    def __aiter__(self) -> SyncSource:
+        return self
+
+    async def __anext__(self) -> Any:
+        try:
+            return next(self.iterator)
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+    def size(self) -> int | None:
+        """How many elements are still to come, if that is known without
+        pulling any: for a sequence, set or mapping view not yet started. Only
+        those promise that len() counts what iteration yields; other sized
+        iterables (a table whose len() counts rows but iterates columns) may not."""
+        if self._iterator is None and isinstance(self._iterable, (Sequence, Set, MappingView)):
+            return len(self._iterable)
+        return None
+
+    def characteristics(self) -> Characteristic:
+        """What the iterable promises of its elements: none repeated for a set
+        or a range, and ascending too for a range that counts up."""
+        iterable = self._iterable
+        if isinstance(iterable, range):
+            return Characteristic.DISTINCT | Characteristic.SORTED if iterable.step > 0 else Characteristic.DISTINCT
+        if isinstance(iterable, Set):
+            return Characteristic.DISTINCT
+        return Characteristic.NONE
+
+    def narrow(self, start: int, stop: int | None) -> None:
+        """Leave only the elements from `start` up to `stop` still to come, as
+        skip(start) and limit(stop - start) at the head of the chain would. A
+        sequence not yet started is indexed into, so what is skipped is never
+        touched; anything else is skipped through by islice(), in C."""
+        if self._iterator is None and isinstance(self._iterable, Sequence):
+            self._iterator = map(self._iterable.__getitem__, range(len(self._iterable))[start:stop])
+        else:
+            self._iterator = islice(self.iterator, start, stop)
+
+    async def aclose(self) -> None:
+        # only leaves this view exhausted, as closing an async generator does;
+        # the iterable belongs to the caller, and a generator they passed in is
+        # left for them to close, which is what the async generator did too
+        self._iterator = iter(())
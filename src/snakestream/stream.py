@@ -6,15 +6,21 @@ from collections.abc import AsyncGenerator, Callable, Coroutine, Generator
 
 from snakestream.base_stream import BaseStream
 from snakestream.callable_dispatch import _maybe_await
-from snakestream.collector import Collector, StreamingCollector, _CollectorSink, to_list
+from snakestream.collector import Collector, StreamingCollector, _CollectAllSink, _CollectorSink, to_list
+from snakestream.distinct import Strategy, exact
 from snakestream.exception import StreamBuildException
-from snakestream.execution import PROCESSES as PROCESSES, SEQUENTIAL
+from snakestream.execution import PROCESSES as PROCESSES
+from snakestream.merge import merge as _merge, merge_sorted as _merge_sorted
 from snakestream.ops import (
+    _AssumeSortedOp,
+    _DistinctByOp,
     _DistinctOp,
     _FilterOp,
     _FlatMapOp,
     _LimitOp,
+    _MapAsyncOp,
     _MapOp,
+    _MergeFlatMapOp,
     _PeekOp,
     _SkipOp,
     _SortedOp,
@@ -71,6 +77,31 @@ class Stream(BaseStream[T]):
         new_stream = _concat(a, b)
         return Stream(new_stream)
 
+    @staticmethod
+    def merge(*streams: Stream[T], max_concurrency: int | None = None) -> Stream[T]:
+        """Every element of every stream, as it arrives: all of them pulled at
+        once, or at most `max_concurrency` at a time taking turns, rather than
+        one drained before the next as concat() does. No order between streams
+        is kept; each stream's own elements still come in its order."""
+        if max_concurrency is not None and max_concurrency < 1:
+            raise StreamBuildException(f"merge() needs a max_concurrency of at least 1, got {max_concurrency}")
+        return Stream(_merge([s._compose() for s in streams], max_concurrency))
+
+    @staticmethod
+    def merge_sorted(
+        *streams: Stream[T],
+        comparator: Comparator[T] | None = None,
+        reverse: bool = False,
+        key: Mapper[T, Any] | None = None,
+    ) -> Stream[T]:
+        """Streams each already sorted, as sorted() with the same arguments
+        would have them, merged into one sorted stream through a heap of their
+        heads. Ties go to the stream given first. Only as many elements are
+        held as there are streams."""
+        if comparator is not None and key is not None:
+            raise StreamBuildException("merge_sorted() takes a comparator or a key, not both")
+        return Stream(_merge_sorted([s._compose() for s in streams], comparator, reverse, key))
+
     @staticmethod
     def builder() -> StreamBuilder:
         from snakestream.stream_builder import StreamBuilder
@@ -94,20 +125,61 @@ class Stream(BaseStream[T]):
     def map(self, mapper: Mapper[T, R]) -> Stream[R]:
         return cast("Stream[R]", self._derive(_MapOp(mapper)))
 
-    def flat_map(self, flat_mapper: FlatMapper[T, R]) -> Stream[R]:
+    def map_async(self, mapper: Mapper[T, R], *, concurrency: int, ordered: bool = True) -> Stream[R]:
+        """map(), with up to `concurrency` calls of an async mapper in flight at
+        once while the rest of the chain runs as it otherwise would. Results
+        come out in encounter order, or as they complete if not `ordered`."""
+        if concurrency < 1:
+            raise StreamBuildException(f"map_async() needs a concurrency of at least 1, got {concurrency}")
+        return cast("Stream[R]", self._derive(_MapAsyncOp(mapper, concurrency, ordered)))
+
+    def flat_map(self, flat_mapper: FlatMapper[T, R], *, concurrency: int = 1) -> Stream[R]:
+        """Each element replaced by the elements of the stream flat_mapper
+        makes of it. With a `concurrency` above 1, up to that many inner
+        streams run at once and their elements interleave as they arrive, so
+        no order is kept between them; each inner stream's own order is."""
         # Pre-call rejection, not a dispatch site: flat_mapper must return a
         # Stream synchronously, so an async def here is always a caller
         # mistake. This is unrelated to _maybe_await's post-call awaiting.
         if iscoroutinefunction(flat_mapper):
             raise StreamBuildException("flat_map() does not support coroutines")
-
+        if concurrency < 1:
+            raise StreamBuildException(f"flat_map() needs a concurrency of at least 1, got {concurrency}")
+        if concurrency > 1:
+            return cast("Stream[R]", self._derive(_MergeFlatMapOp(flat_mapper, concurrency)))
         return cast("Stream[R]", self._derive(_FlatMapOp(flat_mapper)))
 
-    def sorted(self, comparator: Comparator[T] | None = None, reverse=False) -> Stream[T]:
-        return cast("Stream[T]", self._derive(_SortedOp(comparator, reverse)))
-
-    def distinct(self) -> Stream[T]:
-        return cast("Stream[T]", self._derive(_DistinctOp()))
+    def sorted(
+        self,
+        comparator: Comparator[T] | None = None,
+        reverse=False,
+        *,
+        key: Mapper[T, Any] | None = None,
+        spill_after: int | None = None,
+        concurrency: int = 1,
+    ) -> Stream[T]:
+        if comparator is not None and key is not None:
+            raise StreamBuildException("sorted() takes a comparator or a key, not both")
+        if spill_after is not None and spill_after < 2:
+            raise StreamBuildException(f"spill_after must be at least 2, got {spill_after}")
+        if concurrency < 1:
+            raise StreamBuildException(f"concurrency must be at least 1, got {concurrency}")
+        return cast("Stream[T]", self._derive(_SortedOp(comparator, reverse, key, spill_after, concurrency)))
+
+    def assume_sorted(self) -> Stream[T]:
+        return cast("Stream[T]", self._derive(_AssumeSortedOp()))
+
+    def distinct(self, *, key: Mapper[T, Any] | None = None, strategy: Strategy | None = None) -> Stream[T]:
+        if strategy is None:
+            strategy = exact()
+        if key is None:
+            return cast("Stream[T]", self._derive(_DistinctOp(strategy)))
+        return cast("Stream[T]", self._derive(_DistinctByOp(key, strategy)))
+
+    def distinct_by(self, key: Mapper[T, Any], *, digest: bool = False, strategy: Strategy | None = None) -> Stream[T]:
+        if strategy is None:
+            strategy = exact()
+        return cast("Stream[T]", self._derive(_DistinctByOp(key, strategy, digest)))
 
     def peek(self, consumer: Consumer[T]) -> Stream[T]:
         return cast("Stream[T]", self._derive(_PeekOp(consumer)))
@@ -159,6 +231,19 @@ class Stream(BaseStream[T]):
         container = await _maybe_await(supplier)
         return cast(R, await self._evaluate(_MutableReductionSink(container, accumulator)))
 
+    def collect_all(self, *collectors: Collector[T, Any, Any]) -> Coroutine[Any, Any, tuple[Any, ...]]:
+        """collect() into every one of `collectors` in one pass over the
+        stream, giving a tuple of their results in the same order: a count, a
+        summary and a grouping of a source too costly to read three times."""
+        self._check_not_consumed()
+        for collector in collectors:
+            if not isinstance(collector, Collector):
+                raise StreamBuildException(
+                    "collect_all() requires Collectors (see snakestream.collector.Collector); "
+                    "for lazy, streaming results use tee()"
+                )
+        return self._evaluate(_CollectAllSink(collectors))
+
     @overload
     async def reduce(self, identity: T | R, accumulator: Accumulator[T, R]) -> T | R: ...
 
@@ -177,7 +262,7 @@ class Stream(BaseStream[T]):
 
     async def for_each_ordered(self, consumer: Consumer[T]) -> None:
         self._check_not_consumed()
-        return await SEQUENTIAL.value(self._chain, self._stream, _ForEachSink(consumer))
+        return await self._ordered_executor().value(self._pushed_down(self._chain), self._stream, _ForEachSink(consumer))
 
     async def to_array(self) -> list[T]:
         # collect() runs _check_not_consumed() itself
@@ -185,11 +270,16 @@ class Stream(BaseStream[T]):
 
     async def find_first(self) -> T | None:
         # ordered means encounter order regardless of executor, so this one
-        # names SEQUENTIAL itself instead of following self._executor
+        # falls back to SEQUENTIAL itself when self._executor would lose it
         if not self.is_ordered():
             return await self.find_any()
         self._check_not_consumed()
-        return await SEQUENTIAL.value(self._chain, self._stream, _FindSink())
+        chain = self._chain
+        if chain and type(chain[-1]) is _SortedOp:
+            # only the least element is wanted, which limit(1) lets the compile
+            # step see, so sorted() holds one element rather than the stream
+            chain = [*chain, _LimitOp(1)]
+        return await self._ordered_executor().value(self._pushed_down(chain), self._stream, _FindSink())
 
     async def find_any(self) -> T | None:
         return await self._evaluate(_FindSink())
@@ -216,4 +306,13 @@ class Stream(BaseStream[T]):
         return await self._match(predicate, short_circuit_on=True, default=False)
 
     async def count(self) -> int:
-        return await self._evaluate(_CountSink())
+        """The number of elements. When characteristics() has it SIZED - a
+        sized source and only ops that keep or bound its size - it is worked
+        out without running the chain at all, so, as in Java, no map() or
+        peek() callable is called; the source is left consumed all the same."""
+        size = self._size()
+        if size is None:
+            return await self._evaluate(_CountSink())
+        self._check_not_consumed()
+        await self._stream.aclose()
+        return size
@@ -4,8 +4,8 @@ from inspect import isawaitable
 from typing import Any, cast
 from collections.abc import Awaitable
 
-from snakestream.callable_dispatch import AsyncDispatch
-from snakestream.sink import TerminalSink, _UNSET
+from snakestream.callable_dispatch import AsyncDispatch, _apply_each
+from snakestream.sink import AwaitRequired, TerminalSink, _UNSET
 from snakestream.sort import is_new_extremum
 from snakestream.type import (
     T,
@@ -30,6 +30,12 @@ class _CountSink(TerminalSink[T]):
     async def accept(self, element: Any) -> None:
         self._container += 1
 
+    def accept_sync(self, element: Any) -> None:
+        self._container += 1
+
+    async def accept_batch(self, elements: list[Any]) -> None:
+        self._container += len(elements)
+
 
 class _ForEachSink(AsyncDispatch, TerminalSink[T]):
     def __init__(self, consumer: Consumer) -> None:
@@ -49,6 +55,19 @@ class _ForEachSink(AsyncDispatch, TerminalSink[T]):
                 self._is_async = True
                 await r
 
+    def accept_sync(self, element: Any) -> None:
+        if self._is_async:
+            raise AwaitRequired(self.accept(element))
+        r = self._fn(element)
+        if not self._checked:
+            self._checked = True
+            if isawaitable(r):
+                self._is_async = True
+                raise AwaitRequired(r)
+
+    async def accept_batch(self, elements: list[Any]) -> None:
+        _, self._is_async, self._checked = await _apply_each(self._fn, self._is_async, self._checked, elements)
+
     def _finish(self, container: Any) -> None:
         return None
 
@@ -89,6 +108,23 @@ class _ReduceSink(AsyncDispatch, TerminalSink[T]):
                 r = await r
         self._container = r
 
+    def accept_sync(self, element: Any) -> None:
+        if self._container is _UNSET:
+            self._container = element
+            return
+        if self._is_async:
+            raise AwaitRequired(self.accept(element))
+        r = self._fn(self._container, element)
+        if not self._checked:
+            self._checked = True
+            if isawaitable(r):
+                self._is_async = True
+                raise AwaitRequired(self._resume(r))
+        self._container = r
+
+    async def _resume(self, r: Awaitable[Any]) -> None:
+        self._container = await r
+
     def _finish(self, container: Any) -> Any:
         return None if container is _UNSET else container
 
@@ -118,6 +154,25 @@ class _MinMaxSink(AsyncDispatch, TerminalSink[T]):
         if is_new_extremum(cast(int, sign), self._asc):
             self._container = element
 
+    def accept_sync(self, element: Any) -> None:
+        if self._container is _UNSET:
+            self._container = element
+            return
+        if self._is_async:
+            raise AwaitRequired(self.accept(element))
+        sign = self._fn(element, self._container)
+        if not self._checked:
+            self._checked = True
+            if isawaitable(sign):
+                self._is_async = True
+                raise AwaitRequired(self._resume(element, sign))
+        if is_new_extremum(cast(int, sign), self._asc):
+            self._container = element
+
+    async def _resume(self, element: Any, sign: Awaitable[int]) -> None:
+        if is_new_extremum(await sign, self._asc):
+            self._container = element
+
     def _finish(self, container: Any) -> Any:
         return None if container is _UNSET else container
 
@@ -145,6 +200,16 @@ class _MutableReductionSink(AsyncDispatch, TerminalSink[T]):
                 self._is_async = True
                 await r
 
+    def accept_sync(self, element: Any) -> None:
+        if self._is_async:
+            raise AwaitRequired(self.accept(element))
+        r = self._fn(self._container, element)
+        if not self._checked:
+            self._checked = True
+            if isawaitable(r):
+                self._is_async = True
+                raise AwaitRequired(r)
+
 
 class _FindSink(TerminalSink[T]):
     """Keeps the first element it is given and asks the chain to stop. Backs
@@ -167,6 +232,12 @@ class _FindSink(TerminalSink[T]):
         self._container = element
         self._cancelled = True
 
+    def accept_sync(self, element: Any) -> None:
+        if self._cancelled:
+            return
+        self._container = element
+        self._cancelled = True
+
     def cancellation_requested(self) -> bool:
         return self._cancelled
 
@@ -208,5 +279,25 @@ class _MatchSink(AsyncDispatch, TerminalSink[T]):
             self._container = self._short_circuit_on
             self._cancelled = True
 
+    def accept_sync(self, element: Any) -> None:
+        if self._cancelled:
+            return
+        if self._is_async:
+            raise AwaitRequired(self.accept(element))
+        r = self._fn(element)
+        if not self._checked:
+            self._checked = True
+            if isawaitable(r):
+                self._is_async = True
+                raise AwaitRequired(self._resume(r))
+        if bool(r) is self._short_circuit_on:
+            self._container = self._short_circuit_on
+            self._cancelled = True
+
+    async def _resume(self, r: Awaitable[Any]) -> None:
+        if bool(await r) is self._short_circuit_on:
+            self._container = self._short_circuit_on
+            self._cancelled = True
+
     def cancellation_requested(self) -> bool:
         return self._cancelled
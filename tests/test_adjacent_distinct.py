@@ -0,0 +1,134 @@
+"""Covers the compile step's rewrite of distinct() over sorted elements - after
+a natural-order sorted() or an assume_sorted() - into one that remembers only
+the last element, with the same result as the set it replaces."""
+
+import asyncio
+
+import pytest
+from hypothesis import given
+from hypothesis import strategies as st
+
+from snakestream import Stream
+from snakestream.collector import to_list
+from snakestream.distinct import bloom
+from snakestream.execution import _compile
+from snakestream.ops import (
+    _AdjacentDistinctOp,
+    _AssumeSortedOp,
+    _DistinctByOp,
+    _DistinctOp,
+    _FilterOp,
+    _LimitOp,
+    _MapOp,
+    _SortedOp,
+)
+
+
+async def slowly(x):
+    await asyncio.sleep(0.001)
+    return x
+
+
+async def _async_source(items: list):
+    for i in items:
+        yield i
+
+
+def _natural() -> _SortedOp:
+    return _SortedOp(None, False, None, None, 1)
+
+
+def test_compile_rewrites_only_a_distinct_that_sees_sorted_elements() -> None:
+    # given
+    def kinds(chain: list) -> list[type]:
+        return [type(op) for op in _compile(chain) if type(op) is not _AssumeSortedOp]
+
+    # then
+    assert kinds([_natural(), _DistinctOp()]) == [_SortedOp, _AdjacentDistinctOp]
+    assert kinds([_AssumeSortedOp(), _DistinctOp()]) == [_AdjacentDistinctOp]
+    assert kinds([_natural(), _FilterOp(bool), _LimitOp(9), _DistinctOp()]) == [
+        _SortedOp,
+        _FilterOp,
+        _LimitOp,
+        _AdjacentDistinctOp,
+    ]
+    assert kinds([_natural(), _MapOp(abs), _DistinctOp()]) == [_SortedOp, _MapOp, _DistinctOp]
+    assert kinds([_SortedOp(None, False, abs, None, 1), _DistinctOp()]) == [_SortedOp, _DistinctOp]
+    assert kinds([_natural(), _DistinctOp(bloom(10))]) == [_SortedOp, _DistinctOp]
+    assert kinds([_natural(), _DistinctByOp(abs)]) == [_SortedOp, _DistinctByOp]
+    assert kinds([_DistinctOp(), _natural()]) == [_DistinctOp, _SortedOp]
+
+
+@given(values=st.lists(st.integers(min_value=-20, max_value=20)))
+@pytest.mark.asyncio
+async def test_sorted_then_distinct_matches_the_set(values: list[int]) -> None:
+    # when
+    it = await Stream.of(values).sorted().distinct().collect(to_list())
+    reverse = await Stream.of(values).sorted(reverse=True).filter(lambda x: x != 0).distinct().collect(to_list())
+    # then
+    assert it == sorted(set(values))
+    assert reverse == sorted(set(values) - {0}, reverse=True)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("batched", [False, True])
+@pytest.mark.parametrize("source", [list, _async_source])
+async def test_assume_sorted_dedups_remembering_one_element(mocker, source, batched) -> None:
+    # given
+    record = mocker.spy(_DistinctOp, "make_shared_state")
+    stream = Stream.of(source([1, 1, 2, 3, 3, 3, 7, 8, 8]))
+    if batched:
+        stream = stream.batched(4)
+
+    # when
+    it = await stream.assume_sorted().distinct().collect(to_list())
+
+    # then
+    assert it == [1, 2, 3, 7, 8]
+    assert record.call_count == 0
+
+
+@pytest.mark.asyncio
+async def test_an_element_not_equal_to_itself_is_still_a_repeat_of_itself() -> None:
+    # given
+    nan = float("nan")
+    # when
+    it = await Stream.of([nan, nan, 1.0]).assume_sorted().distinct().collect(to_list())
+    # then
+    assert it[1:] == [1.0]
+    assert len(it) == 2
+
+
+@pytest.mark.asyncio
+async def test_racing_branches_ignore_assume_sorted() -> None:
+    # given: each branch's share of a sorted source is sorted, but a duplicate
+    # can land in two branches
+    data = [i // 4 for i in range(80)]
+    # when
+    it = await Stream.of(data).parallel().assume_sorted().map(slowly).distinct().collect(to_list())
+    # then
+    assert sorted(it) == list(range(20))
+
+
+@pytest.mark.asyncio
+async def test_a_raced_sort_still_feeds_the_adjacent_distinct(mocker) -> None:
+    # given
+    record = mocker.spy(_DistinctOp, "make_shared_state")
+    data = [i % 10 for i in range(100)]
+    # when
+    it = await Stream.of(data).parallel().map(slowly).sorted().distinct().collect(to_list())
+    # then
+    assert it == list(range(10))
+    assert record.call_count == 0
+
+
+@pytest.mark.asyncio
+async def test_a_partial_order_lets_a_repeat_through() -> None:
+    # given: subset order, under which {1} and {2} are neither < nor >
+    data = [frozenset({1}), frozenset({2}), frozenset({1})]
+    # when
+    adjacent = await Stream.of(data).sorted().distinct().collect(to_list())
+    exact = await Stream.of(data).distinct().collect(to_list())
+    # then: as documented, only a total order gives the set-based result
+    assert adjacent == data
+    assert exact == data[:2]
@@ -0,0 +1,202 @@
+"""Covers .batched(size): a sequential stream whose elements move down the
+chain in lists, through accept_batch(), rather than one at a time."""
+
+import asyncio
+from collections.abc import AsyncGenerator
+from typing import Any
+
+import pytest
+
+from snakestream import Stream
+from snakestream.collector import to_generator, to_list
+from snakestream.exception import StreamBuildException
+from snakestream.execution import Sequential
+from snakestream.ops import _LimitOp
+from snakestream.sink import Counter, GeneratorBridgeSink, IntermediateSink, StatelessOp
+
+
+async def _async_source(items: list[int]) -> AsyncGenerator[int, None]:
+    for i in items:
+        yield i
+
+
+def _naturals():
+    n = 0
+    while True:
+        yield n
+        n += 1
+
+
+class _ReturnsCoroutine:
+    def __init__(self, fn: Any) -> None:
+        self.fn = fn
+
+    def __call__(self, *args: Any):
+        return self._run(*args)
+
+    async def _run(self, *args: Any) -> Any:
+        await asyncio.sleep(0)
+        return self.fn(*args)
+
+
+class _PassThroughSink(IntermediateSink[Any]):
+    async def accept(self, element: Any) -> None:
+        await self.downstream.accept(element)
+
+
+class _PassThroughOp(StatelessOp):
+    _sink_cls = _PassThroughSink
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [1, 3, 1000])
+@pytest.mark.parametrize("source", [list, _async_source])
+async def test_a_batched_chain_gives_what_the_unbatched_one_gives(size, source) -> None:
+    # given
+    data = [5, 3, 8, 3, 1, 9, 5, 2, 7, 8, 6, 4]
+
+    def build(stream: Stream) -> Stream:
+        return stream.skip(1).map(lambda x: x * 2).filter(lambda x: x != 6).distinct().limit(7).sorted()
+
+    # when
+    batched = await build(Stream.of(source(data)).batched(size)).collect(to_list())
+    unbatched = await build(Stream.of(data)).collect(to_list())
+
+    # then
+    assert batched == unbatched == [2, 4, 10, 12, 14, 16, 18]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("source", [list, _async_source])
+async def test_batched_terminals(source) -> None:
+    # given
+    def stream() -> Stream:
+        return Stream.of(source(list(range(10)))).batched(4)
+
+    seen: list[int] = []
+
+    # when / then
+    assert await stream().count() == 10
+    assert await stream().filter(lambda x: x > 3).count() == 6
+    assert await stream().reduce(0, lambda a, b: a + b) == 45
+    assert await stream().find_first() == 0
+    assert await stream().any_match(lambda x: x == 6) is True
+    assert await stream().max(lambda a, b: a - b) == 9
+    await stream().for_each(seen.append)
+    assert seen == list(range(10))
+
+
+@pytest.mark.asyncio
+async def test_batched_iterator_yields_every_element_in_order() -> None:
+    # when
+    it = [x async for x in Stream.of(list(range(10))).batched(3).map(lambda x: x + 1).iterator()]
+    streamed = [x async for x in Stream.of(_async_source([1, 2, 3])).batched(2).collect(to_generator)]
+
+    # then
+    assert it == list(range(1, 11))
+    assert streamed == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_a_batched_limit_stops_an_infinite_source() -> None:
+    # when
+    pushed = await Stream.of(_naturals()).batched(8).map(lambda x: x * 2).limit(5).collect(to_list())
+    streamed = [x async for x in Stream.iterate(0, lambda n: n + 1).batched(8).limit(3).iterator()]
+
+    # then
+    assert pushed == [0, 2, 4, 6, 8]
+    assert streamed == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_a_limit_already_full_takes_nothing_from_a_batch() -> None:
+    # given: a counter another chain has already filled, as racing branches share one
+    op = _LimitOp(2)
+    bridge = GeneratorBridgeSink()
+    limited = op.link(bridge)
+    full = Counter()
+    full.value = 2
+    await limited.begin({op: full})
+
+    # when
+    await limited.accept_batch([1, 2, 3])
+
+    # then
+    assert bridge.buffer == []
+    assert limited.cancellation_requested() is True
+
+
+@pytest.mark.asyncio
+async def test_a_skip_spanning_several_batches() -> None:
+    # when
+    it = await Stream.of(list(range(10))).batched(3).skip(7).collect(to_list())
+    # then
+    assert it == [7, 8, 9]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("source", [list, _async_source])
+async def test_callables_found_async_on_the_first_batch(source) -> None:
+    # given
+    async def inc(x: int) -> int:
+        await asyncio.sleep(0)
+        return x + 1
+
+    seen: list[int] = []
+    collected: list[int] = []
+
+    # when
+    it = await (
+        Stream.of(source(list(range(6))))
+        .batched(4)
+        .map(_ReturnsCoroutine(lambda x: x * 2))
+        .filter(_ReturnsCoroutine(lambda x: x % 4 == 0))
+        .peek(_ReturnsCoroutine(seen.append))
+        .map(inc)
+        .collect(to_list())
+    )
+    single = await Stream.of(source([1, 2, 3])).batched(2).map(_ReturnsCoroutine(lambda x: -x)).collect(to_list())
+    kept = await Stream.of(source([1, 2, 3])).batched(2).filter(_ReturnsCoroutine(lambda x: x != 2)).collect(to_list())
+    peeked = await Stream.of(source([1, 2])).batched(2).peek(_ReturnsCoroutine(collected.append)).count()
+    await Stream.of(source([3, 4])).batched(2).for_each(_ReturnsCoroutine(collected.append))
+
+    # then
+    assert it == [1, 5, 9]
+    assert seen == [0, 4, 8]
+    assert single == [-1, -2, -3]
+    assert kept == [1, 3]
+    assert peeked == 2
+    assert collected == [1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_each_op_sees_the_whole_batch_before_the_next_op() -> None:
+    # given
+    log: list[str] = []
+
+    # when
+    await Stream.of([1, 2, 3]).batched(3).peek(lambda x: log.append(f"a{x}")).peek(lambda x: log.append(f"b{x}")).count()
+
+    # then: the documented price of batching, against a1 b1 a2 b2 a3 b3 unbatched
+    assert log == ["a1", "a2", "a3", "b1", "b2", "b3"]
+
+
+@pytest.mark.asyncio
+async def test_a_sink_without_accept_batch_takes_the_batch_one_element_at_a_time() -> None:
+    # when
+    it = await Stream.of(list(range(5))).batched(2)._derive(_PassThroughOp()).map(lambda x: x + 1).limit(3).collect(to_list())  # type: ignore[attr-defined]
+    # then
+    assert it == [1, 2, 3]
+
+
+def test_batched_is_sequential_and_a_mode_switch() -> None:
+    assert Stream.of([1]).batched(2).is_parallel() is False
+    assert Stream.of([1]).batched(2).parallel().is_parallel() is True
+    assert Stream.of([1]).parallel().batched(2).is_parallel() is False
+
+
+def test_batch_size_below_one_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        Sequential(0)
+    with pytest.raises(StreamBuildException):
+        Stream.of([1]).batched(0)
@@ -0,0 +1,217 @@
+"""Covers stream characteristics - SIZED, SORTED, DISTINCT, ORDERED - as the
+source sets them and each op passes them on, and what is done with them: a
+count() that need not run the chain, and a distinct() or sorted() the compile
+step can drop."""
+
+import asyncio
+
+import pytest
+
+from snakestream import Stream
+from snakestream import ops
+from snakestream.characteristics import Characteristic
+from snakestream.collector import to_list
+from snakestream.distinct import recent
+from snakestream.execution import _compile
+from snakestream.ops import _DistinctByOp, _DistinctOp, _MapOp, _SortedOp
+
+ORDERED, DISTINCT, SORTED, SIZED = (
+    Characteristic.ORDERED,
+    Characteristic.DISTINCT,
+    Characteristic.SORTED,
+    Characteristic.SIZED,
+)
+
+
+async def slowly(x):
+    await asyncio.sleep(0.001)
+    return x
+
+
+async def _async_source(items: list):
+    for i in items:
+        yield i
+
+
+class _Table:
+    # len() counts one thing, iteration yields another
+    def __len__(self) -> int:
+        return 100
+
+    def __iter__(self):
+        return iter(["a", "b"])
+
+
+def _natural() -> _SortedOp:
+    return _SortedOp(None, False, None, None, 1)
+
+
+@pytest.mark.parametrize(
+    "source, expected",
+    [
+        ([3, 1, 2], ORDERED | SIZED),
+        ((3, 1), ORDERED | SIZED),
+        ({3, 1}, ORDERED | SIZED | DISTINCT),
+        ({"a": 1}.keys(), ORDERED | SIZED | DISTINCT),
+        (range(5), ORDERED | SIZED | DISTINCT | SORTED),
+        (range(5, 0, -1), ORDERED | SIZED | DISTINCT),
+        ((i for i in range(3)), ORDERED),
+        (_Table(), ORDERED),
+    ],
+)
+def test_the_source_sets_the_characteristics(source, expected) -> None:
+    assert Stream.of(source).characteristics() == expected
+
+
+def test_an_async_source_promises_nothing_but_order() -> None:
+    assert Stream.of(_async_source([1])).characteristics() == ORDERED
+
+
+@pytest.mark.parametrize(
+    "build, expected",
+    [
+        (lambda s: s.map(abs), ORDERED | SIZED),
+        (lambda s: s.filter(bool), ORDERED | DISTINCT | SORTED),
+        (lambda s: s.peek(print), ORDERED | DISTINCT | SORTED),
+        (lambda s: s.limit(3), ORDERED | SIZED | DISTINCT | SORTED),
+        (lambda s: s.skip(3), ORDERED | SIZED | DISTINCT | SORTED),
+        (lambda s: s.map(abs).sorted(), ORDERED | SIZED | SORTED),
+        (lambda s: s.sorted(reverse=True), ORDERED | SIZED | DISTINCT),
+        (lambda s: s.map(abs).sorted(key=abs), ORDERED | SIZED),
+        (lambda s: s.map(abs).distinct(), ORDERED | DISTINCT),
+        (lambda s: s.map(abs).distinct(strategy=recent(maxsize=2)), ORDERED),
+        (lambda s: s.map(abs).distinct_by(abs), ORDERED),
+        (lambda s: s.distinct_by(abs), ORDERED | DISTINCT | SORTED),
+        (lambda s: s.map(abs).assume_sorted(), ORDERED | SIZED | SORTED),
+        (lambda s: s.map_async(slowly, concurrency=2), ORDERED | SIZED),
+        (lambda s: s.map_async(slowly, concurrency=2, ordered=False), SIZED),
+        (lambda s: s.flat_map(lambda x: Stream.of([x])), ORDERED),
+        (lambda s: s.flat_map(lambda x: Stream.of([x]), concurrency=2), Characteristic.NONE),
+        (lambda s: s.unordered(), SIZED | DISTINCT | SORTED),
+        (lambda s: s.parallel(), SIZED | DISTINCT),
+        (lambda s: s.parallel().filter(bool).sorted(), ORDERED | DISTINCT | SORTED),
+        (lambda s: s.parallel(ordered=True), ORDERED | SIZED | DISTINCT | SORTED),
+    ],
+)
+def test_each_op_keeps_clears_or_sets_them(build, expected) -> None:
+    assert build(Stream.of(range(10))).characteristics() == expected
+
+
+@pytest.mark.asyncio
+async def test_a_sized_count_calls_no_callable() -> None:
+    # given
+    calls = []
+
+    def mapper(x: int) -> int:
+        calls.append(x)
+        return x
+
+    # when
+    it = await Stream.of(list(range(10))).map(mapper).sorted().skip(2).limit(5).count()
+
+    # then
+    assert it == 5
+    assert calls == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "build, expected",
+    [
+        (lambda s: s.skip(20), 0),
+        (lambda s: s.limit(20), 10),
+        (lambda s: s.limit(-1), 0),
+        (lambda s: s.skip(-1), 10),
+        (lambda s: s.map(abs).limit(-1), 0),
+        (lambda s: s.map(abs).skip(-1), 10),
+        (lambda s: s.filter(lambda x: x % 2), 5),
+        (lambda s: s.peek(lambda x: None), 10),
+        (lambda s: s.parallel().map(slowly), 10),
+    ],
+)
+async def test_a_count_agrees_whether_sized_or_run(build, expected) -> None:
+    # when
+    sized = await build(Stream.of(list(range(10)))).count()
+    run = await build(Stream.of(iter(range(10)))).count()
+    # then
+    assert sized == run == expected
+
+
+@pytest.mark.asyncio
+async def test_a_sized_count_still_consumes_the_source() -> None:
+    # given
+    stream = Stream.of([1, 2, 3])
+    # when
+    first = await stream.count()
+    again = await stream.count()
+    # then: as a second count over a run source would
+    assert (first, again) == (3, 0)
+
+
+@pytest.mark.asyncio
+async def test_a_table_is_counted_by_running_it() -> None:
+    assert await Stream.of(_Table()).count() == 2
+
+
+def test_compile_drops_what_the_characteristics_make_redundant() -> None:
+    # given
+    def kinds(chain: list) -> list[type]:
+        return [type(op) for op in _compile(chain)]
+
+    # then
+    assert kinds([_DistinctOp(), _DistinctOp()]) == [_DistinctOp]
+    assert kinds([_DistinctByOp(abs), _DistinctOp()]) == [_DistinctByOp, _DistinctOp]
+    assert kinds([_natural(), _natural()]) == [_SortedOp]
+    assert kinds([_DistinctOp(), _natural(), _DistinctOp()]) == [_DistinctOp, _SortedOp]
+    assert kinds([_natural(), _SortedOp(None, True, None, None, 1)]) == [_SortedOp, _SortedOp]
+    assert kinds([_natural(), _MapOp(abs), _natural()]) == [_SortedOp, _MapOp, _SortedOp]
+    assert kinds([_DistinctOp(recent(maxsize=1)), _DistinctOp()]) == [_DistinctOp, _DistinctOp]
+
+
+@pytest.mark.asyncio
+async def test_sorted_twice_sorts_once(mocker) -> None:
+    # given
+    sorts = mocker.spy(ops, "sort_run")
+    # when
+    it = await Stream.of([3, 1, 2, 1]).sorted().filter(bool).sorted().collect(to_list())
+    # then
+    assert it == [1, 1, 2, 3]
+    assert sorts.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_distinct_twice_remembers_once(mocker) -> None:
+    # given
+    records = mocker.spy(_DistinctOp, "make_shared_state")
+    # when
+    it = await Stream.of([3, 1, 3, 1]).distinct().map(str).filter(bool).distinct().collect(to_list())
+    # then: map() may make equal elements of unequal ones, so both stay
+    assert it == ["3", "1"]
+    assert records.call_count == 2
+
+    # when
+    records.reset_mock()
+    it = await Stream.of([3, 1, 3, 1]).distinct().filter(bool).distinct().collect(to_list())
+    # then
+    assert it == [3, 1]
+    assert records.call_count == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", [lambda s: s, lambda s: s.parallel()])
+async def test_a_descending_sort_is_not_taken_for_an_ascending_one(mode) -> None:
+    # when
+    resorted = await mode(Stream.of([3, 1, 2])).sorted(reverse=True).sorted().collect(to_list())
+    deduplicated = await mode(Stream.of([3, 1, 2, 3, 1])).sorted(reverse=True).distinct().collect(to_list())
+    # then
+    assert resorted == [1, 2, 3]
+    assert deduplicated == [3, 2, 1]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("by_key", [lambda s: s.distinct_by(type), lambda s: s.distinct(key=type)])
+async def test_distinct_by_a_key_leaves_a_later_distinct_in(by_key) -> None:
+    # when: 1 and 1.0 differ in type, but are equal
+    it = await by_key(Stream.of([1, 1.0, 2])).distinct().collect(to_list())
+    # then
+    assert it == [1]
@@ -0,0 +1,138 @@
+"""Covers sorted(concurrency=N): an async comparator's independent merges, and
+an async key's calls, run up to N at a time, with the same result as the
+serial sort."""
+
+import asyncio
+import random
+import time
+
+import pytest
+
+from snakestream import Stream
+from snakestream.collector import to_list
+from snakestream.exception import StreamBuildException
+
+
+class _Service:
+    """An async ranking call with a fixed latency, recording how many of its
+    calls are in flight at most."""
+
+    def __init__(self, delay: float = 0.0, fail_on: int | None = None) -> None:
+        self.delay = delay
+        self.fail_on = fail_on
+        self.calls = 0
+        self.running = 0
+        self.peak = 0
+
+    async def _call(self, value: int) -> int:
+        self.calls += 1
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+            if value == self.fail_on:
+                raise ValueError("boom")
+            return value
+        finally:
+            self.running -= 1
+
+    async def compare(self, a: tuple[int, str], b: tuple[int, str]) -> int:
+        await self._call(a[0])
+        return (a[0] > b[0]) - (a[0] < b[0])
+
+    async def key(self, t: tuple[int, str]) -> int:
+        return await self._call(t[0])
+
+
+def _others() -> list[asyncio.Task]:
+    return [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+
+_RNG = random.Random(5)
+_DATA = [(_RNG.randrange(8), f"#{i}") for i in range(64)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("reverse", [False, True])
+@pytest.mark.parametrize("concurrency", [2, 8, 1000])
+async def test_a_concurrent_comparator_sort_matches_the_serial_one(concurrency, reverse) -> None:
+    # given
+    serial = await Stream.of(_DATA).sorted(_Service().compare, reverse).collect(to_list())
+    service = _Service()
+
+    # when
+    it = await Stream.of(_DATA).sorted(service.compare, reverse, concurrency=concurrency).collect(to_list())
+
+    # then
+    assert it == serial
+    assert 1 < service.peak <= concurrency
+
+
+@pytest.mark.asyncio
+async def test_concurrent_comparisons_cut_the_wall_time() -> None:
+    # given
+    data = _DATA[:32]
+
+    # when
+    started = time.time()
+    await Stream.of(data).sorted(_Service(0.005).compare).collect(to_list())
+    serial = time.time() - started
+    started = time.time()
+    await Stream.of(data).sorted(_Service(0.005).compare, concurrency=16).collect(to_list())
+    concurrent = time.time() - started
+
+    # then: the last merges are serial, so about 2x is what the split-up gives
+    assert concurrent < serial * 0.75
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("concurrency", [4, 1000])
+async def test_a_concurrent_async_key_is_called_once_per_element(concurrency) -> None:
+    # given
+    service = _Service(0.001)
+
+    # when
+    it = await Stream.of(_DATA).sorted(key=service.key, concurrency=concurrency).collect(to_list())
+
+    # then
+    assert it == sorted(_DATA, key=lambda t: t[0])
+    assert service.calls == len(_DATA)
+    assert service.peak == min(concurrency, len(_DATA))
+
+
+@pytest.mark.asyncio
+async def test_a_sync_key_with_concurrency_is_just_called() -> None:
+    # when
+    it = await Stream.of(_DATA).sorted(key=lambda t: t[0], concurrency=4).collect(to_list())
+    # then
+    assert it == sorted(_DATA, key=lambda t: t[0])
+
+
+@pytest.mark.asyncio
+async def test_a_concurrent_sort_spills_and_merges_the_same() -> None:
+    # given
+    service = _Service()
+
+    # when
+    it = await Stream.of(_DATA).sorted(service.compare, spill_after=10, concurrency=4).collect(to_list())
+
+    # then
+    assert it == sorted(_DATA, key=lambda t: t[0])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("by", ["compare", "key"])
+async def test_a_failing_call_cancels_the_rest(by) -> None:
+    # given
+    service = _Service(0.001, fail_on=3)
+    ordering = {"comparator": service.compare} if by == "compare" else {"key": service.key}
+
+    # when / then
+    with pytest.raises(ValueError, match="boom"):
+        await Stream.of(_DATA).sorted(concurrency=8, **ordering).collect(to_list())
+    assert _others() == []
+
+
+def test_concurrency_below_one_is_rejected() -> None:
+    with pytest.raises(StreamBuildException):
+        Stream.of([1]).sorted(concurrency=0)
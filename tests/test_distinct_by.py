@@ -0,0 +1,86 @@
+"""Covers distinct_by(key, digest=...): dedup of elements that are unhashable
+or costly to hash by a key, remembering only the key, or only a 64-bit digest
+of it."""
+
+import asyncio
+from dataclasses import dataclass
+
+import pytest
+
+from snakestream import Stream
+from snakestream.collector import to_list
+from snakestream.distinct import _digest, recent
+
+
+@dataclass
+class Record:
+    # a plain dataclass with eq=True sets __hash__ to None: unhashable
+    id: str
+    tags: list[str]
+
+
+_RECORDS = [Record(f"r{i % 3}", [str(i)]) for i in range(9)]
+
+
+async def async_id(record: Record) -> str:
+    await asyncio.sleep(0)
+    return record.id
+
+
+async def slowly(x):
+    await asyncio.sleep(0.001)
+    return x
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("digest", [False, True])
+@pytest.mark.parametrize("key", [lambda r: r.id, async_id])
+async def test_distinct_by_keeps_the_first_record_per_key(key, digest) -> None:
+    # when
+    it = await Stream.of(_RECORDS).distinct_by(key, digest=digest).collect(to_list())
+    # then
+    assert it == _RECORDS[:3]
+
+
+@pytest.mark.asyncio
+async def test_a_digest_stands_in_for_an_unhashable_key() -> None:
+    # when
+    it = await Stream.of(_RECORDS).distinct_by(lambda r: [r.id], digest=True).collect(to_list())
+    # then
+    assert it == _RECORDS[:3]
+
+
+@pytest.mark.asyncio
+async def test_distinct_by_takes_a_strategy() -> None:
+    # when
+    stream = Stream.of(["a", "b", "a", "c", "a"]).distinct_by(str.upper, digest=True, strategy=recent(maxsize=1))
+    it = await stream.collect(to_list())
+    # then
+    assert it == ["a", "b", "a", "c", "a"]
+
+
+@pytest.mark.asyncio
+async def test_racing_branches_share_the_digests() -> None:
+    # when
+    it = await Stream.of(_RECORDS * 5).parallel().map(slowly).distinct_by(lambda r: r.id, digest=True).count()
+    # then
+    assert it == 3
+
+
+def test_digests_are_64_bit_and_keep_types_apart() -> None:
+    assert _digest("a") == _digest("a")
+    assert _digest("a") != _digest(b"a")
+    assert _digest(1) != _digest("1")
+    assert _digest(("a", 1)) == _digest(("a", 1))
+    assert all(0 <= _digest(v) < 2**64 for v in ["", b"", 0, None, ("x",)])
+
+
+@pytest.mark.asyncio
+async def test_a_digest_tells_keys_apart_by_encoding_not_by_equality() -> None:
+    # when
+    by_digest = await Stream.of([1, 1.0, True]).distinct_by(lambda x: x, digest=True).collect(to_list())
+    by_key = await Stream.of([1, 1.0, True]).distinct_by(lambda x: x).collect(to_list())
+    # then: equal, but pickled differently
+    assert by_digest == [1, 1.0, True]
+    assert by_key == [1]
+    assert _digest({"a": 1, "b": 2}) != _digest({"b": 2, "a": 1})
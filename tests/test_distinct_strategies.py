@@ -0,0 +1,175 @@
+"""Covers distinct(key=..., strategy=...): dedup by a sync or async key, and
+records of what has been seen that stay bounded - the recent elements only, or
+a Bloom filter of fixed size."""
+
+import asyncio
+
+import pytest
+
+from snakestream import Stream
+from snakestream.collector import to_list
+from snakestream.distinct import Bloom, Recent, bloom, exact, recent
+
+
+def by_id(record: dict) -> int:
+    return record["id"]
+
+
+async def async_by_id(record: dict) -> int:
+    await asyncio.sleep(0)
+    return record["id"]
+
+
+class _LateAsync:
+    def __call__(self, record: dict):
+        return async_by_id(record)
+
+
+async def slowly(x):
+    await asyncio.sleep(0.001)
+    return x
+
+
+_RECORDS = [{"id": i % 4, "seq": i} for i in range(10)]
+
+
+async def _async_source(items: list):
+    for i in items:
+        yield i
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("batched", [False, True])
+@pytest.mark.parametrize("key", [by_id, async_by_id, _LateAsync()])
+@pytest.mark.parametrize("source", [list, _async_source])
+async def test_distinct_by_key_keeps_the_first_element_per_key(source, key, batched) -> None:
+    # given: dicts, which distinct() alone could not even hash
+    stream = Stream.of(source(_RECORDS))
+    if batched:
+        stream = stream.batched(3)
+
+    # when
+    it = await stream.distinct(key=key).collect(to_list())
+
+    # then
+    assert [r["seq"] for r in it] == [0, 1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_exact_is_the_default() -> None:
+    # when
+    it = await Stream.of([1, 2, 1, 3]).distinct(strategy=exact()).collect(to_list())
+    # then
+    assert it == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_recent_forgets_all_but_the_last_maxsize_seen() -> None:
+    # when: seeing 1 again refreshes it, so 3 pushes out 2, not 1
+    it = await Stream.of([1, 2, 1, 3, 1, 2]).distinct(strategy=recent(maxsize=2)).collect(to_list())
+    # then
+    assert it == [1, 2, 3, 2]
+
+
+@pytest.mark.asyncio
+async def test_recent_forgets_what_has_not_been_seen_for_ttl_seconds(mocker) -> None:
+    # given: one clock tick per element
+    ticks = iter(range(100))
+    mocker.patch("snakestream.distinct.monotonic", side_effect=lambda: next(ticks))
+
+    # when: "a" turns up every 2 ticks, inside the 3-tick window; "b" every 4
+    data = ["a", "b", "a", "c", "a", "b", "a", "c"]
+    it = await Stream.of(data).distinct(strategy=recent(ttl=3)).collect(to_list())
+
+    # then
+    assert it == ["a", "b", "c", "b", "c"]
+
+
+def test_a_recent_record_never_outgrows_maxsize() -> None:
+    # given
+    record = recent(maxsize=10)()
+    # when
+    for i in range(1000):
+        if i not in record:
+            record.add(i)
+    # then
+    assert isinstance(record, Recent)
+    assert len(record) == 10
+
+
+@pytest.mark.asyncio
+async def test_bloom_never_lets_a_duplicate_through() -> None:
+    # given
+    data = [i % 500 for i in range(5000)]
+    # when
+    it = await Stream.of(data).distinct(strategy=bloom(500)).collect(to_list())
+    # then
+    assert len(it) == len(set(it))
+    assert len(it) >= 500 * 0.97
+
+
+def test_bloom_false_positives_stay_near_the_error_rate() -> None:
+    # given
+    record = bloom(10_000, 0.01)()
+    for i in range(10_000):
+        if ("seen", i) not in record:
+            record.add(("seen", i))
+
+    # when
+    false_positives = sum(("unseen", i) in record for i in range(10_000))
+
+    # then
+    assert false_positives < 10_000 * 0.02
+
+
+def test_bloom_memory_is_fixed_by_capacity_and_rate() -> None:
+    # given
+    record = bloom(100_000, 0.01)()
+    # then: about 9.6 bits per element at 1%
+    assert isinstance(record, Bloom)
+    assert 100_000 < len(record._array) < 130_000
+    assert record.hashes == 7
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy", [exact(), recent(maxsize=100), bloom(1000)])
+async def test_racing_branches_share_one_record(strategy) -> None:
+    # given
+    data = [i % 20 for i in range(200)]
+    # when
+    it = await Stream.of(data).parallel().map(slowly).distinct(strategy=strategy).collect(to_list())
+    # then
+    assert sorted(it) == list(range(20))
+
+
+@pytest.mark.asyncio
+async def test_one_record_per_run_whatever_the_branch_count() -> None:
+    # given
+    made = []
+
+    def strategy() -> set:
+        made.append(set())
+        return made[-1]
+
+    # when
+    it = await Stream.of([1, 1, 2, 2, 3]).parallel(workers=3).distinct(strategy=strategy).collect(to_list())
+
+    # then
+    assert sorted(it) == [1, 2, 3]
+    assert len(made) == 1
+
+
+@pytest.mark.parametrize(
+    "factory",
+    [
+        lambda: recent(),
+        lambda: recent(maxsize=0),
+        lambda: recent(ttl=0),
+        lambda: bloom(0),
+        lambda: bloom(10, 0),
+        lambda: bloom(10, 1),
+    ],
+)
+def test_strategies_reject_out_of_range_arguments(factory) -> None:
+    with pytest.raises(ValueError):
+        factory()
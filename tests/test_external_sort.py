@@ -0,0 +1,182 @@
+"""Covers sorted(spill_after=N): sorted runs of at most N elements written to
+temporary files and merged back on the way downstream, with the same result,
+ties included, as sorting the stream in memory."""
+
+import asyncio
+import random
+
+import pytest
+
+from snakestream import Stream
+from snakestream import sort as sort_module
+from snakestream.collector import to_list
+from snakestream.exception import StreamBuildException
+
+
+def by_rank(a: tuple[int, str], b: tuple[int, str]) -> int:
+    return (a[0] > b[0]) - (a[0] < b[0])
+
+
+async def async_by_rank(a: tuple[int, str], b: tuple[int, str]) -> int:
+    await asyncio.sleep(0)
+    return by_rank(a, b)
+
+
+class _LateAsync:
+    """A plain `def __call__` returning a coroutine: only the probe finds out."""
+
+    def __call__(self, a: tuple[int, str], b: tuple[int, str]):
+        return async_by_rank(a, b)
+
+
+def rank(t: tuple[int, str]) -> int:
+    return t[0]
+
+
+async def async_rank(t: tuple[int, str]) -> int:
+    await asyncio.sleep(0)
+    return t[0]
+
+
+async def _async_source(items: list):
+    for i in items:
+        yield i
+
+
+# few distinct ranks, so that ties cross run boundaries and the tag records
+# which of two tied elements came first
+_RNG = random.Random(11)
+_DATA = [(_RNG.randrange(5), f"#{i}") for i in range(90)]
+
+_ORDERINGS = [
+    {},
+    {"comparator": by_rank},
+    {"comparator": async_by_rank},
+    {"comparator": _LateAsync()},
+    {"key": rank},
+    {"key": async_rank},
+]
+
+
+@pytest.fixture
+def run_files(mocker) -> list:
+    """Every run file the sort writes, to check they are all closed after."""
+    files: list = []
+    write_run = sort_module.write_run
+
+    def recording(run):
+        f = write_run(run)
+        files.append(f)
+        return f
+
+    mocker.patch("snakestream.ops.write_run", side_effect=recording)
+    return files
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("spill_after", [2, 7, 40])
+@pytest.mark.parametrize("reverse", [False, True])
+@pytest.mark.parametrize("ordering", _ORDERINGS)
+@pytest.mark.parametrize("source", [list, _async_source])
+async def test_a_spilled_sort_matches_the_in_memory_one(run_files, source, ordering, reverse, spill_after) -> None:
+    # given
+    expected = await Stream.of(_DATA).sorted(reverse=reverse, **ordering).collect(to_list())
+
+    # when
+    stream = Stream.of(source(_DATA)).sorted(reverse=reverse, spill_after=spill_after, **ordering)
+    it = await stream.collect(to_list())
+
+    # then
+    assert it == expected
+    assert len(run_files) == len(_DATA) // spill_after
+    assert all(f.closed for f in run_files)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("ordering", [{}, {"comparator": async_by_rank}, {"key": rank}])
+async def test_a_batched_spilled_sort_matches_the_in_memory_one(run_files, ordering) -> None:
+    # given
+    expected = await Stream.of(_DATA).sorted(**ordering).collect(to_list())
+    # when
+    it = await Stream.of(_DATA).batched(8).sorted(spill_after=10, **ordering).collect(to_list())
+    # then
+    assert it == expected
+    assert run_files
+
+
+@pytest.mark.asyncio
+async def test_runs_are_read_back_a_chunk_at_a_time(mocker, run_files) -> None:
+    # given
+    mocker.patch("snakestream.sort.RUN_CHUNK", 3)
+    data = list(range(100, 0, -1))
+    # when
+    it = await Stream.of(data).sorted(spill_after=20).collect(to_list())
+    # then
+    assert it == sorted(data)
+    assert len(run_files) == 5
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("comparator", [None, async_by_rank])
+async def test_a_downstream_limit_stops_the_merge_and_closes_the_runs(run_files, comparator) -> None:
+    # given: a map in between, so this is not rewritten to a top-k
+    pushed: list = []
+
+    def record(x):
+        pushed.append(x)
+        return x
+
+    # when
+    stream = Stream.of(_DATA).sorted(comparator, spill_after=10).map(record).limit(3)
+    it = await stream.collect(to_list())
+
+    # then
+    assert it == sorted(_DATA, key=rank)[:3]
+    assert len(pushed) == 3
+    assert run_files and all(f.closed for f in run_files)
+
+
+@pytest.mark.asyncio
+async def test_a_failure_downstream_of_the_merge_still_closes_the_runs(run_files) -> None:
+    # given
+    def explode(x):
+        raise ValueError("boom")
+
+    # when / then
+    with pytest.raises(ValueError, match="boom"):
+        await Stream.of(_DATA).sorted(spill_after=10).map(explode).collect(to_list())
+    assert run_files and all(f.closed for f in run_files)
+
+
+@pytest.mark.asyncio
+async def test_an_async_comparator_returning_a_bool_is_rejected_in_the_merge() -> None:
+    # given
+    async def compare(a: int, b: int) -> bool:
+        return a > b
+
+    # when / then
+    with pytest.raises(TypeError):
+        await Stream.of([3, 1, 2, 5]).sorted(compare, spill_after=2).collect(to_list())
+
+
+def test_a_run_file_that_fails_to_write_is_closed(mocker) -> None:
+    # given
+    opened = []
+    temporary_file = sort_module.tempfile.TemporaryFile
+
+    def recording():
+        f = temporary_file()
+        opened.append(f)
+        return f
+
+    mocker.patch("snakestream.sort.tempfile.TemporaryFile", side_effect=recording)
+
+    # when / then
+    with pytest.raises(Exception):
+        sort_module.write_run([lambda: None])
+    assert opened and opened[0].closed
+
+
+def test_spill_after_below_two_is_rejected() -> None:
+    with pytest.raises(StreamBuildException):
+        Stream.of([1]).sorted(spill_after=1)
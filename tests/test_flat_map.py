@@ -1,5 +1,6 @@
 import pytest
 import asyncio
+import time
 
 from snakestream import Stream
 from snakestream.collector import to_generator, to_list
@@ -103,3 +104,121 @@ async def test_flat_map_async_function() -> None:
         pass
     else:
         assert False
+
+
+class _Orders:
+    """Per-user orders, fetched a page at a time with a delay, recording how
+    many users' fetches run at once and whether each was closed."""
+
+    running = 0
+    most_running = 0
+
+    def __init__(self) -> None:
+        self.closed: list[int] = []
+
+    async def fetch(self, user: int, pages: int = 3, delay: float = 0.01):
+        _Orders.running += 1
+        _Orders.most_running = max(_Orders.most_running, _Orders.running)
+        try:
+            for page in range(pages):
+                await asyncio.sleep(delay)
+                yield (user, page)
+        finally:
+            _Orders.running -= 1
+            self.closed.append(user)
+
+
+@pytest.mark.asyncio
+async def test_flat_map_with_concurrency_runs_inner_streams_at_once() -> None:
+    # given
+    orders = _Orders()
+    _Orders.running = _Orders.most_running = 0
+
+    async def run(concurrency: int) -> tuple[list, float]:
+        start = time.perf_counter()
+        it = (
+            await Stream.of(range(8))
+            .flat_map(lambda u: Stream.of(orders.fetch(u)), concurrency=concurrency)
+            .collect(to_list())
+        )
+        return it, time.perf_counter() - start
+
+    # when
+    serial, serial_time = await run(1)
+    merged, merged_time = await run(4)
+
+    # then: every element, each user's pages in order
+    assert sorted(merged) == serial
+    for user in range(8):
+        assert [p for u, p in merged if u == user] == [0, 1, 2]
+    assert _Orders.most_running == 4
+    assert merged_time < serial_time * 0.5
+
+
+@pytest.mark.asyncio
+async def test_flat_map_with_concurrency_interleaves_as_elements_arrive() -> None:
+    # given
+    async def inner(name: str, delay: float):
+        await asyncio.sleep(delay)
+        yield name
+
+    delays = {"slow": 0.05, "fast": 0.001}
+
+    # when
+    it = await Stream.of(["slow", "fast"]).flat_map(lambda n: Stream.of(inner(n, delays[n])), concurrency=2).collect(to_list())
+
+    # then
+    assert it == ["fast", "slow"]
+
+
+@pytest.mark.asyncio
+async def test_flat_map_with_concurrency_closes_inner_streams_on_limit() -> None:
+    # given
+    orders = _Orders()
+    # when
+    it = await (
+        Stream.of(range(100))
+        .flat_map(lambda u: Stream.of(orders.fetch(u, pages=50, delay=0.001)), concurrency=3)
+        .limit(5)
+        .collect(to_list())
+    )
+    # then
+    assert len(it) == 5
+    assert sorted(orders.closed) == [0, 1, 2]
+    assert {t for t in asyncio.all_tasks() if t is not asyncio.current_task()} == set()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("concurrency", [3, 5])
+async def test_flat_map_with_concurrency_raises_and_closes_the_rest(concurrency) -> None:
+    # given
+    orders = _Orders()
+
+    async def failing():
+        await asyncio.sleep(0.005)
+        raise ValueError("fetch failed")
+        yield
+
+    def flat_mapper(u: int) -> Stream:
+        return Stream.of(failing()) if u == 1 else Stream.of(orders.fetch(u, pages=50, delay=0.001))
+
+    # when
+    with pytest.raises(ValueError, match="fetch failed"):
+        await Stream.of(range(3)).flat_map(flat_mapper, concurrency=concurrency).collect(to_list())
+
+    # then: whether it failed while the window was full or while draining
+    assert sorted(orders.closed) == [0, 2]
+    assert {t for t in asyncio.all_tasks() if t is not asyncio.current_task()} == set()
+
+
+@pytest.mark.asyncio
+async def test_flat_map_with_concurrency_of_empty_inner_streams() -> None:
+    # when
+    it = await Stream.of([[], [1], [], [2, 3]]).flat_map(Stream.of, concurrency=2).collect(to_list())
+    # then
+    assert sorted(it) == [1, 2, 3]
+
+
+def test_flat_map_needs_a_concurrency_of_at_least_one() -> None:
+    with pytest.raises(StreamBuildException):
+        Stream.of([1]).flat_map(Stream.of, concurrency=0)
@@ -0,0 +1,150 @@
+"""Covers the compile step that fuses adjacent map/filter/peek ops into one
+sink: what it fuses, and that a fused run behaves exactly as the ops it
+replaced, whichever of its callables turn out to be async."""
+
+import asyncio
+import sys
+from collections.abc import AsyncGenerator
+from typing import Any
+
+import pytest
+
+from snakestream import Stream
+from snakestream.collector import to_list
+from snakestream.execution import _compile
+from snakestream.ops import _DistinctOp, _FilterOp, _FusedOp, _LimitOp, _MapOp, _PeekOp
+
+
+class _ReturnsCoroutine:
+    """A plain `def __call__` returning a coroutine: classified sync, found out
+    by the first result."""
+
+    def __init__(self, fn: Any) -> None:
+        self.fn = fn
+        self.calls = 0
+
+    def __call__(self, x: Any):
+        self.calls += 1
+        return self._run(x)
+
+    async def _run(self, x: Any) -> Any:
+        await asyncio.sleep(0)
+        return self.fn(x)
+
+
+async def _async_source(items: list[int]) -> AsyncGenerator[int, None]:
+    for i in items:
+        yield i
+
+
+async def _async_inc(x: int) -> int:
+    await asyncio.sleep(0)
+    return x + 1
+
+
+def test_compile_fuses_runs_of_two_or_more_and_leaves_the_rest() -> None:
+    # given
+    m1, f1, p1, d, m2, lim, m3, f2 = (
+        _MapOp(abs),
+        _FilterOp(bool),
+        _PeekOp(print),
+        _DistinctOp(),
+        _MapOp(abs),
+        _LimitOp(3),
+        _MapOp(abs),
+        _FilterOp(bool),
+    )
+
+    # when
+    compiled = _compile([m1, f1, p1, d, m2, lim, m3, f2])
+
+    # then: a single stateless op stays as it is, stateful ops break a run
+    assert [type(op) for op in compiled] == [_FusedOp, _DistinctOp, _MapOp, _LimitOp, _FusedOp]
+    assert compiled[1] is d and compiled[2] is m2 and compiled[3] is lim
+
+
+def test_compile_does_not_touch_the_streams_own_chain() -> None:
+    # given
+    chain = [_MapOp(abs), _MapOp(abs)]
+    # when
+    _compile(chain)
+    # then
+    assert [type(op) for op in chain] == [_MapOp, _MapOp]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("source", [list, _async_source])
+@pytest.mark.parametrize(
+    "mapper",
+    [lambda x: x + 1, _async_inc, _ReturnsCoroutine(lambda x: x + 1)],
+)
+async def test_a_fused_run_gives_what_the_unfused_ops_give(source, mapper) -> None:
+    # given
+    seen: list[int] = []
+
+    # when
+    it = await (
+        Stream.of(source(list(range(10))))
+        .map(lambda x: x * 2)
+        .filter(lambda x: x % 3 != 0)
+        .map(mapper)
+        .peek(seen.append)
+        .filter(lambda x: x < 16)
+        .collect(to_list())
+    )
+
+    # then
+    expected = [x * 2 + 1 for x in range(10) if (x * 2) % 3 != 0]
+    assert it == [x for x in expected if x < 16]
+    assert seen == expected
+
+
+@pytest.mark.asyncio
+async def test_a_stage_found_async_mid_run_is_called_once_per_element() -> None:
+    # given: stages either side of one that turns async on its first result
+    before: list[int] = []
+    after: list[int] = []
+    middle = _ReturnsCoroutine(lambda x: x * 10)
+
+    # when
+    it = await Stream.of([1, 2, 3]).peek(before.append).map(middle).peek(after.append).collect(to_list())
+
+    # then
+    assert it == [10, 20, 30]
+    assert before == [1, 2, 3]
+    assert after == [10, 20, 30]
+    assert middle.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_a_filter_found_async_mid_run_still_drops_elements() -> None:
+    # when
+    it = await Stream.of([1, 2, 3, 4]).map(lambda x: x + 1).filter(_ReturnsCoroutine(lambda x: x % 2 == 1)).collect(to_list())
+    kept = (
+        await Stream.of([1, 2, 3, 4]).map(lambda x: x + 1).filter(_ReturnsCoroutine(lambda x: x % 2 == 0)).collect(to_list())
+    )
+    # then: whether the element that tripped the switch is dropped or kept
+    assert it == [3, 5]
+    assert kept == [2, 4]
+
+
+@pytest.mark.asyncio
+async def test_a_run_longer_than_the_recursion_limit_does_not_recurse() -> None:
+    # given: unfused, every op would be one more nested accept() per element
+    stream = Stream.of([0, 1])
+    for _ in range(sys.getrecursionlimit() * 2):
+        stream = stream.map(lambda x: x + 1)
+
+    # when
+    it = await stream.collect(to_list())
+
+    # then
+    assert it == [sys.getrecursionlimit() * 2, sys.getrecursionlimit() * 2 + 1]
+
+
+@pytest.mark.asyncio
+async def test_limit_after_a_fused_run_stops_an_infinite_source() -> None:
+    # when
+    it = await Stream.iterate(0, lambda n: n + 1).map(lambda x: x * 2).filter(lambda x: x % 3 == 0).limit(3).collect(to_list())
+    # then
+    assert it == [0, 6, 12]
@@ -0,0 +1,196 @@
+"""Covers map_async(mapper, concurrency=N, ordered=...): one op keeping up to
+N calls of its mapper in flight while the rest of the chain runs sequentially."""
+
+import asyncio
+import time
+
+import pytest
+
+from snakestream import Stream
+from snakestream.collector import to_list
+from snakestream.exception import StreamBuildException
+
+
+class _Tracked:
+    """An async mapper that sleeps `delay(x)` and records how many of its calls
+    were running at once, and which were cancelled."""
+
+    def __init__(self, delay=lambda x: 0.02) -> None:
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+        self.cancelled: list[int] = []
+
+    async def __call__(self, x: int) -> int:
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.delay(x))
+        except asyncio.CancelledError:
+            self.cancelled.append(x)
+            raise
+        finally:
+            self.running -= 1
+        return x * 10
+
+
+def _other_tasks() -> list[asyncio.Task]:
+    return [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+
+@pytest.mark.asyncio
+async def test_map_async_overlaps_calls_and_keeps_encounter_order() -> None:
+    # given
+    mapper = _Tracked(lambda x: 0.05)
+
+    # when
+    started = time.time()
+    it = await Stream.of(list(range(8))).map_async(mapper, concurrency=4).collect(to_list())
+    elapsed = time.time() - started
+
+    # then: two windows of four rather than eight calls back to back
+    assert it == [x * 10 for x in range(8)]
+    assert elapsed < 0.3
+    assert mapper.peak == 4
+
+
+@pytest.mark.asyncio
+async def test_map_async_unordered_emits_as_completed() -> None:
+    # given: the earlier an element, the slower its call
+    mapper = _Tracked(lambda x: 0.01 * (5 - x))
+
+    # when
+    it = await Stream.of(list(range(5))).map_async(mapper, concurrency=5, ordered=False).collect(to_list())
+
+    # then
+    assert it == [40, 30, 20, 10, 0]
+
+
+@pytest.mark.asyncio
+async def test_map_async_never_exceeds_its_window() -> None:
+    # given
+    mapper = _Tracked(lambda x: 0.001 * (x % 3))
+
+    # when
+    ordered = await Stream.of(list(range(50))).map_async(mapper, concurrency=3).collect(to_list())
+    unordered = await Stream.of(list(range(50))).map_async(mapper, concurrency=3, ordered=False).collect(to_list())
+
+    # then
+    assert ordered == [x * 10 for x in range(50)]
+    assert sorted(unordered) == ordered
+    assert mapper.peak <= 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("ordered", [True, False])
+async def test_map_async_with_a_sync_mapper(ordered) -> None:
+    # when
+    it = await Stream.of([1, 2, 3]).map_async(lambda x: x + 1, concurrency=2, ordered=ordered).collect(to_list())
+    # then
+    assert sorted(it) == [2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_map_async_with_a_sync_call_returning_a_coroutine() -> None:
+    # given
+    class Wrapper:
+        def __call__(self, x: int):
+            async def inner() -> int:
+                return -x
+
+            return inner()
+
+    # when
+    it = await Stream.of([1, 2, 3]).map_async(Wrapper(), concurrency=2).collect(to_list())
+
+    # then
+    assert it == [-1, -2, -3]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("ordered", [True, False])
+async def test_downstream_cancellation_cancels_the_calls_in_flight(ordered) -> None:
+    # given: an infinite source, and calls slow enough to still be running
+    mapper = _Tracked(lambda x: 0.01 if x < 2 else 10)
+
+    # when
+    it = await Stream.iterate(0, lambda n: n + 1).map_async(mapper, concurrency=4, ordered=ordered).limit(2).collect(to_list())
+
+    # then: whatever was started past the limit was cancelled, not abandoned
+    assert sorted(it) == [0, 10]
+    assert mapper.cancelled and all(x >= 2 for x in mapper.cancelled)
+    assert mapper.running == 0
+    assert _other_tasks() == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("ordered", [True, False])
+async def test_a_failing_call_cancels_the_others_and_propagates(ordered) -> None:
+    # given
+    mapper = _Tracked(lambda x: 10)
+
+    async def explode(x: int) -> int:
+        if x == 1:
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+        return await mapper(x)
+
+    # when / then
+    with pytest.raises(ValueError, match="boom"):
+        await Stream.of(list(range(3))).map_async(explode, concurrency=3, ordered=ordered).collect(to_list())
+    assert sorted(mapper.cancelled) == [0, 2]
+    assert _other_tasks() == []
+
+
+@pytest.mark.asyncio
+async def test_a_failing_sync_mapper_cancels_the_calls_already_started() -> None:
+    # given: async for the first element, then a raise straight out of the call
+    mapper = _Tracked(lambda x: 10)
+
+    def mixed(x: int):
+        if x == 1:
+            raise ValueError("boom")
+        return mapper(x)
+
+    # when / then
+    with pytest.raises(ValueError, match="boom"):
+        await Stream.of([0, 1]).map_async(mixed, concurrency=2).collect(to_list())
+    assert _other_tasks() == []
+
+
+@pytest.mark.asyncio
+async def test_a_failure_while_draining_cancels_the_rest() -> None:
+    # given: every call still in flight when the source runs out
+    mapper = _Tracked(lambda x: 10)
+
+    async def explode(x: int) -> int:
+        if x == 0:
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+        return await mapper(x)
+
+    # when / then
+    with pytest.raises(ValueError, match="boom"):
+        await Stream.of([0, 1, 2]).map_async(explode, concurrency=8).collect(to_list())
+    assert sorted(mapper.cancelled) == [1, 2]
+    assert _other_tasks() == []
+
+
+@pytest.mark.asyncio
+async def test_map_async_composes_with_the_rest_of_the_chain() -> None:
+    # when
+    it = [
+        x
+        async for x in Stream.of(list(range(10)))
+        .filter(lambda x: x % 2 == 0)
+        .map_async(_Tracked(), concurrency=3)
+        .map(lambda x: x + 1)
+        .iterator()
+    ]
+    # then
+    assert it == [1, 21, 41, 61, 81]
+
+
+def test_map_async_rejects_a_concurrency_below_one() -> None:
+    with pytest.raises(StreamBuildException):
+        Stream.of([1]).map_async(lambda x: x, concurrency=0)
@@ -0,0 +1,259 @@
+"""Covers Stream.merge(), every stream pulled at once and each element yielded
+as it arrives, and Stream.merge_sorted(), sorted streams interleaved into one
+order through a heap of their heads; both close every stream however the run
+ends."""
+
+import asyncio
+import time
+
+import pytest
+
+from snakestream import Stream
+from snakestream.collector import to_list
+from snakestream.exception import StreamBuildException
+
+
+def _leftover_tasks() -> set:
+    return {t for t in asyncio.all_tasks() if t is not asyncio.current_task()}
+
+
+class _Feed:
+    """An async source with a delay per element, recording what it gave, when
+    it was pulled while another pull was running, and whether it was closed."""
+
+    running = 0
+    most_running = 0
+
+    def __init__(self, items: list, delay: float = 0.0, fail_at: int | None = None) -> None:
+        self.items = items
+        self.delay = delay
+        self.fail_at = fail_at
+        self.given = 0
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.given == self.fail_at:
+            raise ValueError("feed failed")
+        if self.given >= len(self.items) or self.closed:
+            raise StopAsyncIteration
+        _Feed.running += 1
+        _Feed.most_running = max(_Feed.most_running, _Feed.running)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            _Feed.running -= 1
+        self.given += 1
+        return self.items[self.given - 1]
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_merge_yields_every_element_each_stream_in_its_order() -> None:
+    # given
+    a = Stream.of([1, 2, 3]).map(lambda x: x * 10)
+    b = Stream.of(_Feed(["x", "y"], delay=0.001))
+    c = Stream.of([7, 8, 9, 9]).distinct()
+    # when
+    it = await Stream.merge(a, b, c).collect(to_list())
+    # then
+    assert sorted(map(str, it)) == sorted(["10", "20", "30", "x", "y", "7", "8", "9"])
+    assert [x for x in it if x in (10, 20, 30)] == [10, 20, 30]
+    assert [x for x in it if x in ("x", "y")] == ["x", "y"]
+
+
+@pytest.mark.asyncio
+async def test_merge_pulls_every_stream_at_once() -> None:
+    # given
+    feeds = [Stream.of(_Feed(list(range(5)), delay=0.01)) for _ in range(4)]
+    # when
+    start = time.perf_counter()
+    it = await Stream.merge(*feeds).collect(to_list())
+    elapsed = time.perf_counter() - start
+    # then: four feeds of 0.05s each, side by side rather than one after another
+    assert sorted(it) == sorted(list(range(5)) * 4)
+    assert elapsed < 0.2 * 0.75
+
+
+@pytest.mark.asyncio
+async def test_merge_yields_whichever_arrives_first() -> None:
+    # given
+    slow = Stream.of(_Feed(["slow"], delay=0.05))
+    fast = Stream.of(_Feed(["fast"], delay=0.001))
+    # when
+    it = await Stream.merge(slow, fast).collect(to_list())
+    # then
+    assert it == ["fast", "slow"]
+
+
+@pytest.mark.asyncio
+async def test_max_concurrency_bounds_the_pulls_and_every_stream_takes_turns() -> None:
+    # given
+    _Feed.running = _Feed.most_running = 0
+    feeds = [_Feed([(i, j) for j in range(3)], delay=0.001) for i in range(5)]
+    # when
+    it = await Stream.merge(*map(Stream.of, feeds), max_concurrency=2).collect(to_list())
+    # then
+    assert _Feed.most_running == 2
+    assert sorted(it) == [(i, j) for i in range(5) for j in range(3)]
+    # the last stream starts before the first one ends
+    assert it.index((4, 0)) < it.index((0, 2))
+
+
+@pytest.mark.asyncio
+async def test_stopping_early_closes_every_stream() -> None:
+    # given
+    feeds = [_Feed(list(range(100)), delay=0.001) for _ in range(3)]
+    # when
+    it = await Stream.merge(*map(Stream.of, feeds)).limit(4).collect(to_list())
+    # then
+    assert len(it) == 4
+    assert all(f.closed for f in feeds)
+    assert _leftover_tasks() == set()
+
+
+@pytest.mark.asyncio
+async def test_a_failing_stream_fails_the_merge_and_closes_the_rest() -> None:
+    # given
+    ok = _Feed(list(range(100)), delay=0.001)
+    bad = _Feed(list(range(100)), delay=0.001, fail_at=2)
+    # when
+    with pytest.raises(ValueError, match="feed failed"):
+        await Stream.merge(Stream.of(ok), Stream.of(bad)).collect(to_list())
+    # then
+    assert ok.closed and bad.closed
+    assert _leftover_tasks() == set()
+
+
+@pytest.mark.asyncio
+async def test_merge_of_nothing_or_of_empty_streams_is_empty() -> None:
+    assert await Stream.merge().collect(to_list()) == []
+    assert await Stream.merge(Stream.empty(), Stream.of([])).collect(to_list()) == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "kwargs, streams, expected",
+    [
+        ({}, [[1, 4, 7], [2, 5, 8], [3, 6, 9]], [1, 2, 3, 4, 5, 6, 7, 8, 9]),
+        ({"reverse": True}, [[7, 4, 1], [9, 2], [8, 3]], [9, 8, 7, 4, 3, 2, 1]),
+        ({"key": len}, [["a", "ccc"], ["bb", "dddd"]], ["a", "bb", "ccc", "dddd"]),
+        ({"key": len, "reverse": True}, [["ccc", "a"], ["dddd", "bb"]], ["dddd", "ccc", "bb", "a"]),
+        ({"comparator": lambda a, b: a - b}, [[1, 3], [2, 4]], [1, 2, 3, 4]),
+        ({"comparator": lambda a, b: a - b, "reverse": True}, [[3, 1], [4, 2]], [4, 3, 2, 1]),
+        ({}, [[], [2, 3], [], [1]], [1, 2, 3]),
+        ({}, [], []),
+    ],
+)
+async def test_merge_sorted_interleaves_into_one_order(kwargs, streams, expected) -> None:
+    # when
+    it = await Stream.merge_sorted(*map(Stream.of, streams), **kwargs).collect(to_list())
+    # then
+    assert it == expected
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("reverse", [False, True])
+async def test_merge_sorted_takes_an_async_comparator_or_key(reverse) -> None:
+    # given
+    async def comparator(a: int, b: int) -> int:
+        await asyncio.sleep(0)
+        return a - b
+
+    async def key(x: int) -> int:
+        await asyncio.sleep(0)
+        return x
+
+    streams = [[1, 5, 9], [2, 3], [4, 6, 7, 8]]
+    expected = sorted(sum(streams, []), reverse=reverse)
+    runs = [sorted(s, reverse=reverse) for s in streams]
+
+    # when
+    by_comparator = await Stream.merge_sorted(*map(Stream.of, runs), comparator=comparator, reverse=reverse).collect(to_list())
+    by_key = await Stream.merge_sorted(*map(Stream.of, runs), key=key, reverse=reverse).collect(to_list())
+
+    # then
+    assert by_comparator == by_key == expected
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("kwargs", [{}, {"key": lambda p: p[0]}, {"comparator": lambda a, b: a[0] - b[0]}])
+async def test_merge_sorted_gives_ties_to_the_stream_given_first(kwargs) -> None:
+    # given: pairs compared by their number alone, and never compared whole
+    class Pair(tuple):
+        def __lt__(self, other):
+            return self[0] < other[0]
+
+        def __eq__(self, other):
+            return self[0] == other[0]
+
+        __hash__ = tuple.__hash__
+
+    a = [Pair((1, "a")), Pair((2, "a"))]
+    b = [Pair((1, "b")), Pair((2, "b"))]
+
+    # when
+    it = await Stream.merge_sorted(Stream.of(a), Stream.of(b), **kwargs).collect(to_list())
+
+    # then
+    assert [p[1] for p in it] == ["a", "b", "a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_merge_sorted_pulls_the_first_heads_at_once() -> None:
+    # given
+    feeds = [Stream.of(_Feed([i], delay=0.05)) for i in range(4)]
+    # when
+    start = time.perf_counter()
+    it = await Stream.merge_sorted(*feeds).collect(to_list())
+    elapsed = time.perf_counter() - start
+    # then
+    assert it == [0, 1, 2, 3]
+    assert elapsed < 0.2 * 0.75
+
+
+@pytest.mark.asyncio
+async def test_merge_sorted_holds_one_head_per_stream() -> None:
+    # given
+    feeds = [_Feed(list(range(i, 300, 3))) for i in range(3)]
+    # when
+    it = await Stream.merge_sorted(*map(Stream.of, feeds)).limit(6).collect(to_list())
+    # then
+    assert it == [0, 1, 2, 3, 4, 5]
+    assert [f.given for f in feeds] == [3, 3, 2]
+    assert all(f.closed for f in feeds)
+
+
+@pytest.mark.asyncio
+async def test_a_failing_stream_fails_merge_sorted_and_closes_the_rest() -> None:
+    # given
+    ok = _Feed([1, 2, 3], delay=0.001)
+    bad = _Feed([1, 2, 3], delay=0.001, fail_at=0)
+    # when
+    with pytest.raises(ValueError, match="feed failed"):
+        await Stream.merge_sorted(Stream.of(ok), Stream.of(bad)).collect(to_list())
+    # then
+    assert ok.closed and bad.closed
+    assert _leftover_tasks() == set()
+
+
+@pytest.mark.asyncio
+async def test_a_comparator_must_return_an_int() -> None:
+    # given
+    async def comparator(a, b):
+        return "less"
+
+    # then
+    with pytest.raises(TypeError):
+        await Stream.merge_sorted(Stream.of([1]), Stream.of([2]), comparator=comparator).collect(to_list())
+
+
+def test_merge_arguments_are_checked_when_built() -> None:
+    with pytest.raises(StreamBuildException):
+        Stream.merge(Stream.of([1]), max_concurrency=0)
+    with pytest.raises(StreamBuildException):
+        Stream.merge_sorted(Stream.of([1]), comparator=lambda a, b: 0, key=abs)
@@ -0,0 +1,158 @@
+"""Covers .parallel(ordered=True): racing that yields in encounter order,
+through a reorder buffer bounded by a window rather than by the stream."""
+
+import asyncio
+import time
+
+import pytest
+
+from snakestream import Stream
+from snakestream.collector import to_list
+from snakestream.execution import OrderedRacing
+
+
+async def _delayed(x: int) -> int:
+    # later elements finish sooner, so completion order != encounter order
+    await asyncio.sleep((8 - x) * 0.02)
+    return x
+
+
+@pytest.mark.asyncio
+async def test_ordered_parallel_returns_encounter_order() -> None:
+    # when
+    it = await Stream.of(list(range(8))).parallel(ordered=True).map(_delayed).collect(to_list())
+    # then
+    assert it == list(range(8))
+
+
+@pytest.mark.asyncio
+async def test_ordered_parallel_still_races() -> None:
+    # given
+    async def slow(x: int) -> int:
+        await asyncio.sleep(0.1)
+        return x
+
+    # when
+    started = time.time()
+    it = await Stream.of(list(range(8))).parallel(ordered=True).map(slow).collect(to_list())
+    elapsed = time.time() - started
+
+    # then: four branches, so well under the 0.8s a sequential run takes
+    assert it == list(range(8))
+    assert elapsed < 0.35
+
+
+@pytest.mark.asyncio
+async def test_ordered_parallel_filter_keeps_order() -> None:
+    # given
+    async def even(x: int) -> bool:
+        await asyncio.sleep((20 - x) * 0.001)
+        return x % 2 == 0
+
+    # when
+    it = await Stream.of(list(range(20))).parallel(ordered=True).filter(even).collect(to_list())
+
+    # then
+    assert it == list(range(0, 20, 2))
+
+
+@pytest.mark.asyncio
+async def test_ordered_parallel_runs_stateful_ops_over_the_ordered_output() -> None:
+    # when: limit() and distinct() after the raced map see encounter order, so
+    # they keep exactly what the sequential stream would
+    it = await Stream.of([5, 1, 5, 2, 1, 3, 4]).parallel(ordered=True).map(_delayed).distinct().limit(3).collect(to_list())
+
+    # then
+    assert it == [5, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_ordered_parallel_pulls_no_further_ahead_than_the_window() -> None:
+    # given
+    pulled: list[int] = []
+
+    def source():
+        for i in range(100):
+            pulled.append(i)
+            yield i
+
+    stream = Stream(source())
+    stream._executor = OrderedRacing(2, window=5)
+
+    # when: only the first element is consumed
+    it = stream.map(_delayed).iterator()
+    first = await it.__anext__()
+    await it.aclose()
+
+    # then
+    assert first == 0
+    assert len(pulled) <= 5
+
+
+@pytest.mark.asyncio
+async def test_for_each_ordered_races_under_an_ordered_executor() -> None:
+    # given
+    seen: list[int] = []
+
+    async def slow(x: int) -> int:
+        await asyncio.sleep(0.1)
+        return x
+
+    # when
+    started = time.time()
+    await Stream.of(list(range(8))).parallel(ordered=True).map(slow).for_each_ordered(seen.append)
+    elapsed = time.time() - started
+
+    # then: the consumer saw encounter order without giving up the race
+    assert seen == list(range(8))
+    assert elapsed < 0.35
+
+
+@pytest.mark.asyncio
+async def test_find_first_under_an_ordered_executor() -> None:
+    # when
+    it = await Stream.of(list(range(8))).parallel(ordered=True).map(_delayed).find_first()
+    # then
+    assert it == 0
+
+
+@pytest.mark.asyncio
+async def test_ordered_threads_keep_encounter_order() -> None:
+    # given
+    def blocking(x: int) -> int:
+        time.sleep((8 - x) * 0.005)
+        return x
+
+    # when
+    it = await Stream.of(list(range(8))).parallel(threads=4, ordered=True).map(blocking).collect(to_list())
+
+    # then
+    assert it == list(range(8))
+
+
+@pytest.mark.asyncio
+async def test_ordered_parallel_with_no_leading_stateless_op() -> None:
+    # when
+    it = await Stream.of([3, 1, 2]).parallel(ordered=True).sorted().collect(to_list())
+    # then
+    assert it == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_ordered_parallel_propagates_a_mapper_exception() -> None:
+    # given
+    async def explode(x: int) -> int:
+        if x == 3:
+            raise ValueError("boom")
+        return x
+
+    # when / then
+    with pytest.raises(ValueError, match="boom"):
+        await Stream.of(list(range(10))).parallel(ordered=True).map(explode).collect(to_list())
+
+
+def test_ordered_racing_rejects_bad_sizes() -> None:
+    with pytest.raises(ValueError):
+        OrderedRacing(0)
+    with pytest.raises(ValueError):
+        OrderedRacing(2, window=0)
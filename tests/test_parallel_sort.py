@@ -0,0 +1,185 @@
+"""Covers sorted() under the racing executors: the chain up to sorted() races,
+the whole stream comes out sorted, as one sort and not one per branch, and the
+rest of the chain runs once over it."""
+
+import asyncio
+import random
+
+import pytest
+
+from snakestream import Stream
+from snakestream import sort as sort_module
+from snakestream.collector import to_list
+
+
+def by_rank(a: tuple[int, str], b: tuple[int, str]) -> int:
+    return (a[0] > b[0]) - (a[0] < b[0])
+
+
+async def async_by_rank(a: tuple[int, str], b: tuple[int, str]) -> int:
+    await asyncio.sleep(0)
+    return by_rank(a, b)
+
+
+class _LateAsync:
+    def __call__(self, a: tuple[int, str], b: tuple[int, str]):
+        return async_by_rank(a, b)
+
+
+def rank(t: tuple[int, str]) -> int:
+    return t[0]
+
+
+async def async_rank(t: tuple[int, str]) -> int:
+    await asyncio.sleep(0)
+    return t[0]
+
+
+async def slowly(t: tuple[int, str]) -> tuple[int, str]:
+    await asyncio.sleep(0.001)
+    return t
+
+
+_RNG = random.Random(13)
+_DATA = [(_RNG.randrange(1000), f"#{i}") for i in range(120)]
+
+_EXECUTORS = [
+    lambda s: s.parallel(),
+    lambda s: s.parallel(workers=3),
+    lambda s: s.parallel(threads=2),
+    lambda s: s.parallel(adaptive=True),
+]
+
+_ORDERINGS = [
+    {},
+    {"comparator": by_rank},
+    {"comparator": async_by_rank},
+    {"comparator": _LateAsync()},
+    {"key": rank},
+    {"key": async_rank},
+]
+
+
+def _ranks(items: list) -> list[int]:
+    return [t[0] for t in items]
+
+
+@pytest.fixture
+def run_files(mocker) -> list:
+    files: list = []
+    write_run = sort_module.write_run
+
+    def recording(run):
+        f = write_run(run)
+        files.append(f)
+        return f
+
+    mocker.patch("snakestream.ops.write_run", side_effect=recording)
+    return files
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("spill_after", [None, 7])
+@pytest.mark.parametrize("reverse", [False, True])
+@pytest.mark.parametrize("ordering", _ORDERINGS)
+@pytest.mark.parametrize("prefix", [lambda s: s, lambda s: s.map(slowly)])
+@pytest.mark.parametrize("parallel", _EXECUTORS)
+async def test_a_raced_sort_sorts_the_whole_stream(parallel, prefix, ordering, reverse, spill_after) -> None:
+    # when
+    stream = prefix(parallel(Stream.of(_DATA))).sorted(reverse=reverse, spill_after=spill_after, **ordering)
+    it = await stream.collect(to_list())
+
+    # then: ties between branches have no encounter order to keep
+    assert _ranks(it) == sorted(_ranks(_DATA), reverse=reverse)
+    assert sorted(it) == sorted(_DATA)
+
+
+@pytest.mark.asyncio
+async def test_the_rest_of_the_chain_runs_once_over_the_sorted_stream() -> None:
+    # given
+    mapped: list = []
+
+    def record(x: int) -> int:
+        mapped.append(x)
+        return x
+
+    # when
+    it = await Stream.of(list(range(50, 0, -1))).parallel().sorted().map(record).limit(3).collect(to_list())
+
+    # then
+    assert it == [1, 2, 3]
+    assert mapped == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_state_before_the_sort_is_shared_by_the_branches() -> None:
+    # when
+    stream = Stream.of([3, 1, 3, 2, 1, 5, 4, 5]).parallel(workers=3).map(slowly).distinct().sorted(reverse=True)
+    it = await stream.collect(to_list())
+    # then
+    assert it == [5, 4, 3, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_a_second_sort_after_the_first_runs_on_its_output() -> None:
+    # when
+    it = await Stream.of(_DATA).parallel().sorted(key=rank).map(rank).sorted(reverse=True).collect(to_list())
+    # then
+    assert it == sorted(_ranks(_DATA), reverse=True)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("concurrency", [1, 2])
+async def test_async_comparisons_overlap_across_the_branches(concurrency) -> None:
+    # given
+    running = 0
+    peak = 0
+
+    async def compare(a: int, b: int) -> int:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001)
+        running -= 1
+        return a - b
+
+    data = list(range(64, 0, -1))
+
+    # when
+    it = await Stream.of(data).parallel(workers=4).sorted(compare, concurrency=concurrency).collect(to_list())
+
+    # then
+    assert it == sorted(data)
+    assert 1 < peak <= 4 * concurrency
+
+
+@pytest.mark.asyncio
+async def test_the_run_files_are_closed_when_a_limit_stops_the_merge(run_files) -> None:
+    # when
+    stream = Stream.of(_DATA).parallel().map(slowly).sorted(key=rank, spill_after=10).map(rank).limit(2)
+    it = await stream.collect(to_list())
+
+    # then
+    assert it == sorted(_ranks(_DATA))[:2]
+    assert run_files and all(f.closed for f in run_files)
+
+
+@pytest.mark.asyncio
+async def test_a_failing_comparator_propagates_and_leaves_no_branch_running(run_files) -> None:
+    # given
+    async def explode(a: tuple[int, str], b: tuple[int, str]) -> int:
+        await asyncio.sleep(0)
+        raise ValueError("boom")
+
+    # when / then
+    with pytest.raises(ValueError, match="boom"):
+        await Stream.of(_DATA).parallel().map(slowly).sorted(explode, spill_after=200).collect(to_list())
+    with pytest.raises(ValueError, match="boom"):
+        await Stream.of(_DATA).parallel().map(slowly).sorted(explode, spill_after=10).collect(to_list())
+    assert all(f.closed for f in run_files)
+    assert [t for t in asyncio.all_tasks() if t is not asyncio.current_task()] == []
+
+
+@pytest.mark.asyncio
+async def test_an_empty_stream_sorts_to_nothing() -> None:
+    assert await Stream.of([]).parallel().sorted().collect(to_list()) == []
@@ -0,0 +1,225 @@
+"""Covers .parallel(workers=N), .parallel(adaptive=True) and parallelism(): a
+branch count chosen per stream, or left to the run to find by additive increase
+and multiplicative decrease on what each window of elements cost."""
+
+import asyncio
+
+import pytest
+
+from snakestream import Stream
+from snakestream.collector import to_list
+from snakestream.exception import StreamBuildException
+from snakestream.execution import AdaptiveRacing, Racing, _Aimd
+
+
+class _Concurrency:
+    """An async mapper that records how many of its calls overlap at most."""
+
+    def __init__(self, delay: float, limit: asyncio.Semaphore | None = None) -> None:
+        self.delay = delay
+        self.limit = limit
+        self.running = 0
+        self.peak = 0
+
+    async def __call__(self, x: int) -> int:
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            if self.limit is None:
+                await asyncio.sleep(self.delay)
+            else:
+                async with self.limit:
+                    await asyncio.sleep(self.delay)
+        finally:
+            self.running -= 1
+        return x
+
+
+class _Scripted(_Aimd):
+    """A controller that starts wide and drops to one branch on its first sample."""
+
+    def __init__(self, minimum: int, maximum: int) -> None:
+        super().__init__(minimum, maximum)
+        self.level = maximum
+
+    def observe(self, throughput: float, latency: float) -> int:
+        self.level = self.minimum
+        return self.level
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("workers", [1, 2, 6])
+async def test_workers_sets_how_many_branches_race(workers) -> None:
+    # given
+    mapper = _Concurrency(0.01)
+    # when
+    it = await Stream.of(list(range(12))).parallel(workers=workers).map(mapper).collect(to_list())
+    # then
+    assert sorted(it) == list(range(12))
+    assert mapper.peak == workers
+
+
+@pytest.mark.asyncio
+async def test_ordered_racing_takes_the_workers_count() -> None:
+    # given
+    mapper = _Concurrency(0.01)
+    # when
+    stream = Stream.of(list(range(12))).parallel(workers=3, ordered=True)
+    it = await stream.map(mapper).collect(to_list())
+    # then
+    assert it == list(range(12))
+    assert mapper.peak == 3
+
+
+def test_parallelism_reports_the_executor_width() -> None:
+    source = Stream.of([1])
+    assert source.parallelism() == 1
+    assert Stream.of([1]).parallel().parallelism() == 4
+    assert Stream.of([1]).parallel(workers=7).parallelism() == 7
+    assert Stream.of([1]).parallel(workers=3, ordered=True).parallelism() == 3
+    assert Stream.of([1]).parallel(processes=3).parallelism() == 3
+    assert Stream.of([1]).parallel(threads=2).parallelism() == 2
+    assert Stream.of([1]).parallel(adaptive=True).parallelism() == 1
+    assert Stream.of([1]).parallel(workers=5).map(lambda x: x).parallelism() == 5
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"workers": 2, "processes": 2},
+        {"workers": 2, "threads": 2},
+        {"adaptive": True, "ordered": True},
+        {"adaptive": True, "threads": 2},
+        {"adaptive": True, "processes": 2},
+    ],
+)
+def test_parallel_rejects_conflicting_arguments(kwargs) -> None:
+    with pytest.raises(StreamBuildException):
+        Stream.of([1]).parallel(**kwargs)
+
+
+@pytest.mark.parametrize("kwargs", [{"workers": 0}, {"processes": 0}, {"threads": -1}, {"workers": 0, "adaptive": True}])
+def test_parallel_rejects_counts_below_one(kwargs) -> None:
+    with pytest.raises(StreamBuildException):
+        Stream.of([1]).parallel(**kwargs)
+
+
+def test_racing_rejects_out_of_range_worker_counts() -> None:
+    with pytest.raises(ValueError):
+        Racing(0)
+    with pytest.raises(ValueError):
+        AdaptiveRacing(4, min_workers=5)
+    with pytest.raises(ValueError):
+        AdaptiveRacing(4, min_workers=0)
+
+
+def test_aimd_adds_a_branch_while_latency_holds() -> None:
+    # given
+    control = _Aimd(1, 3)
+    # when / then: the first sample has nothing to compare with
+    assert control.observe(100.0, 0.01) == 2
+    assert control.observe(200.0, 0.01) == 3
+    # and the ceiling holds
+    assert control.observe(300.0, 0.01) == 3
+
+
+def test_aimd_keeps_growing_while_throughput_follows_latency() -> None:
+    # given
+    control = _Aimd(1, 8)
+    control.observe(100.0, 0.01)
+    # when: latency rose, but so did throughput
+    level = control.observe(150.0, 0.02)
+    # then
+    assert level == 3
+
+
+def test_aimd_halves_when_latency_rises_without_throughput() -> None:
+    # given
+    control = _Aimd(1, 16)
+    for _ in range(7):
+        control.observe(100.0, 0.01)
+    assert control.level == 8
+    # when
+    level = control.observe(100.0, 0.02)
+    # then
+    assert level == 4
+
+
+def test_aimd_never_halves_below_its_minimum() -> None:
+    # given
+    control = _Aimd(2, 4)
+    control.observe(100.0, 0.01)
+    # when
+    level = control.observe(90.0, 0.05)
+    # then
+    assert level == 2
+
+
+@pytest.mark.asyncio
+async def test_adaptive_grows_while_more_branches_keep_paying_off(mocker) -> None:
+    # given: every call costs the same however many overlap
+    mocker.patch("snakestream.execution.SAMPLE_WINDOW", 4)
+    mapper = _Concurrency(0.005)
+    stream = Stream.of(list(range(200))).parallel(workers=8, adaptive=True)
+
+    # when
+    it = await stream.map(mapper).collect(to_list())
+
+    # then
+    assert sorted(it) == list(range(200))
+    assert mapper.peak >= 4
+    assert stream.parallelism() >= 4
+
+
+@pytest.mark.asyncio
+async def test_adaptive_backs_off_a_shared_bottleneck(mocker) -> None:
+    # given: a backend that serves two calls at a time and queues the rest
+    mocker.patch("snakestream.execution.SAMPLE_WINDOW", 4)
+    mapper = _Concurrency(0.005, asyncio.Semaphore(2))
+
+    # when
+    it = await Stream.of(list(range(200))).parallel(workers=32, adaptive=True).map(mapper).collect(to_list())
+
+    # then: a fixed 32 branches would have queued 30 calls on it
+    assert sorted(it) == list(range(200))
+    assert mapper.peak <= 6
+
+
+@pytest.mark.asyncio
+async def test_adaptive_shrinking_parks_branches_without_losing_elements(mocker) -> None:
+    # given
+    mocker.patch("snakestream.execution.SAMPLE_WINDOW", 4)
+    mocker.patch("snakestream.execution._Aimd", _Scripted)
+    mapper = _Concurrency(0.001)
+    stream = Stream.of(list(range(50))).parallel(workers=4, adaptive=True)
+
+    # when
+    it = await stream.map(mapper).distinct().collect(to_list())
+
+    # then
+    assert sorted(it) == list(range(50))
+    assert stream.parallelism() == 1
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limit_stops_an_infinite_source() -> None:
+    # when
+    it = await Stream.iterate(0, lambda n: n + 1).parallel(adaptive=True).map(lambda x: x).limit(40).collect(to_list())
+    # then
+    assert len(it) == 40
+
+
+@pytest.mark.asyncio
+async def test_adaptive_propagates_a_mapper_exception_and_cancels_the_rest() -> None:
+    # given
+    async def explode(x: int) -> int:
+        await asyncio.sleep(0)
+        if x == 30:
+            raise ValueError("boom")
+        return x
+
+    # when / then
+    with pytest.raises(ValueError, match="boom"):
+        await Stream.of(list(range(100))).parallel(adaptive=True).map(explode).collect(to_list())
+    tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+    assert tasks == []
@@ -0,0 +1,155 @@
+"""Covers the pipelined executor: every op in a task of its own, joined by
+bounded queues, with the sequential result, stage-level overlap, and every
+task gone however the run ends."""
+
+import asyncio
+import time
+
+import pytest
+
+from snakestream import Stream
+from snakestream.collector import to_list
+from snakestream.exception import StreamBuildException
+from snakestream.execution import Pipelined
+
+
+async def slowly(x: int) -> int:
+    await asyncio.sleep(0.01)
+    return x
+
+
+async def _async_source(items: list):
+    for i in items:
+        yield i
+
+
+def _leftover_tasks() -> set:
+    return {t for t in asyncio.all_tasks() if t is not asyncio.current_task()}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "build",
+    [
+        lambda s: s.map(lambda x: x % 7).distinct().sorted(),
+        lambda s: s.filter(lambda x: x % 2).skip(3).limit(5),
+        lambda s: s.sorted(reverse=True).limit(4),
+        lambda s: s.map(lambda x: x // 3).sorted().distinct(),
+        lambda s: s.flat_map(lambda x: Stream.of([x, x])).map_async(slowly, concurrency=4),
+        lambda s: s.assume_sorted().filter(bool),
+        lambda s: s,
+    ],
+)
+@pytest.mark.parametrize("source", [list, _async_source])
+async def test_pipelined_gives_the_sequential_result(source, build) -> None:
+    # given
+    data = [5, 3, 9, 1, 3, 8, 2, 7, 7, 0, 4, 6, 11, 10]
+    # when
+    expected = await build(Stream.of(source(data))).collect(to_list())
+    it = await build(Stream.of(source(data)).pipelined(queue_size=2)).collect(to_list())
+    # then
+    assert it == expected
+    assert _leftover_tasks() == set()
+
+
+@pytest.mark.asyncio
+async def test_a_slow_stage_overlaps_the_stages_around_it() -> None:
+    # given
+    async def run(stream: Stream) -> float:
+        start = time.perf_counter()
+        await stream.map(slowly).filter(lambda x: x >= 0).map(slowly).collect(to_list())
+        return time.perf_counter() - start
+
+    # when
+    sequential = await run(Stream.of(range(20)))
+    pipelined = await run(Stream.of(range(20)).pipelined())
+
+    # then: two 10ms stages in turn, against the two at once
+    assert pipelined < sequential * 0.75
+
+
+@pytest.mark.asyncio
+async def test_a_stage_is_held_back_by_a_full_queue() -> None:
+    # given
+    mapped = []
+    consumed = []
+
+    def record(x: int) -> int:
+        mapped.append(x)
+        return x
+
+    async def consume(x: int) -> None:
+        await asyncio.sleep(0.002)
+        consumed.append(len(mapped) - len(consumed))
+
+    # when
+    await Stream.of(range(50)).pipelined(queue_size=2).map(record).for_each(consume)
+
+    # then: a full queue, one more held waiting for room, and the one consumed
+    assert max(consumed) <= 2 + 2
+
+
+@pytest.mark.asyncio
+async def test_a_limit_stops_every_stage_and_the_source() -> None:
+    # given
+    closed = []
+
+    async def source():
+        try:
+            for i in range(1000):
+                yield i
+        finally:
+            closed.append(True)
+
+    # when
+    it = await Stream.of(source()).pipelined().map(slowly).limit(3).collect(to_list())
+
+    # then
+    assert it == [0, 1, 2]
+    assert closed == [True]
+    assert _leftover_tasks() == set()
+
+
+@pytest.mark.asyncio
+async def test_closing_the_iterator_early_cancels_every_stage() -> None:
+    # given
+    it = Stream.of(range(1000)).pipelined().map(slowly).filter(bool).iterator()
+    # when
+    first = await it.__anext__()
+    await it.aclose()
+    # then
+    assert first == 1
+    assert _leftover_tasks() == set()
+
+
+@pytest.mark.asyncio
+async def test_a_failing_stage_raises_after_what_it_passed_on() -> None:
+    # given
+    seen = []
+
+    def boom(x: int) -> int:
+        if x == 4:
+            raise ValueError("stage failed")
+        return x
+
+    # when
+    with pytest.raises(ValueError, match="stage failed"):
+        await Stream.of(range(10)).pipelined().map(boom).map(slowly).for_each(seen.append)
+
+    # then
+    assert seen == [0, 1, 2, 3]
+    assert _leftover_tasks() == set()
+
+
+def test_pipelined_is_a_mode_switch() -> None:
+    # given
+    stream = Stream.of([1]).map(abs).pipelined(queue_size=3)
+    # then
+    assert isinstance(stream._executor, Pipelined)
+    assert stream._executor.queue_size == 3
+    assert not stream.is_parallel()
+    assert stream.parallelism() == 1
+    with pytest.raises(ValueError):
+        Pipelined(0)
+    with pytest.raises(StreamBuildException):
+        Stream.of([1]).pipelined(0)
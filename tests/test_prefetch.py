@@ -0,0 +1,187 @@
+"""Covers prefetch(n): an async source pulled up to n elements ahead of the
+chain by a task of its own, so its I/O overlaps the chain's work, and closed
+however the run ends."""
+
+import asyncio
+import time
+
+import pytest
+
+from snakestream import Stream
+from snakestream.collector import to_list
+from snakestream.exception import StreamBuildException
+from snakestream.source import SyncSource
+
+
+class _Cursor:
+    """A paged async source: a delay per element, a record of how far it has
+    been pulled and whether it was closed."""
+
+    def __init__(self, n: int, delay: float = 0.0, fail_at: int | None = None) -> None:
+        self.n = n
+        self.delay = delay
+        self.fail_at = fail_at
+        self.pulled = 0
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> int:
+        if self.pulled == self.fail_at:
+            raise ValueError("page fetch failed")
+        if self.pulled >= self.n or self.closed:
+            raise StopAsyncIteration
+        await asyncio.sleep(self.delay)
+        self.pulled += 1
+        return self.pulled - 1
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+async def _slow_work(x: int) -> int:
+    await asyncio.sleep(0.01)
+    return x
+
+
+@pytest.mark.asyncio
+async def test_prefetch_keeps_elements_and_order() -> None:
+    # when
+    it = await Stream.of(_Cursor(50)).prefetch(4).map(lambda x: x * 2).collect(to_list())
+    # then
+    assert it == [x * 2 for x in range(50)]
+
+
+@pytest.mark.asyncio
+async def test_source_io_overlaps_the_chains_work() -> None:
+    # given
+    async def run(prefetch: bool) -> float:
+        stream = Stream.of(_Cursor(20, delay=0.01))
+        if prefetch:
+            stream = stream.prefetch(4)
+        start = time.perf_counter()
+        await stream.map(_slow_work).collect(to_list())
+        return time.perf_counter() - start
+
+    # when
+    serial = await run(False)
+    prefetched = await run(True)
+
+    # then: both halves take 0.2s; overlapped, the run takes about one
+    assert prefetched < serial * 0.75
+
+
+@pytest.mark.asyncio
+async def test_the_source_is_never_more_than_n_ahead() -> None:
+    # given
+    cursor = _Cursor(30)
+    ahead = []
+
+    async def consume(x: int) -> None:
+        await asyncio.sleep(0.001)
+        ahead.append(cursor.pulled - x - 1)
+
+    # when
+    await Stream.of(cursor).prefetch(3).peek(consume).count()
+
+    # then: three queued, and one in hand waiting for room
+    assert max(ahead) <= 4
+
+
+@pytest.mark.asyncio
+async def test_stopping_early_cancels_the_task_and_closes_the_source() -> None:
+    # given
+    cursor = _Cursor(1000)
+    # when
+    it = await Stream.of(cursor).prefetch(8).limit(3).collect(to_list())
+    await asyncio.sleep(0)
+    # then
+    assert it == [0, 1, 2]
+    assert cursor.closed
+    assert cursor.pulled < 20
+
+
+@pytest.mark.asyncio
+async def test_closing_does_not_swallow_a_cancellation_of_the_closer() -> None:
+    # given: a source slow to close, and a closer cancelled while it waits
+    class _SlowToClose(_Cursor):
+        async def aclose(self) -> None:
+            await asyncio.sleep(1)
+            self.closed = True
+
+    prefetched = Stream.of(_SlowToClose(10)).prefetch(2)._stream
+    await prefetched.__anext__()
+    closer = asyncio.create_task(prefetched.aclose())
+    await asyncio.sleep(0.01)
+    # when
+    closer.cancel()
+    # then
+    with pytest.raises(asyncio.CancelledError):
+        await closer
+
+
+@pytest.mark.asyncio
+async def test_a_source_never_pulled_is_still_closed() -> None:
+    # given
+    cursor = _Cursor(10)
+    # when
+    it = await Stream.of(cursor).prefetch(2).limit(0).collect(to_list())
+    # then
+    assert it == []
+    assert cursor.closed
+    assert cursor.pulled == 0
+
+
+@pytest.mark.asyncio
+async def test_a_failing_source_raises_after_what_came_before() -> None:
+    # given
+    seen = []
+    # when
+    with pytest.raises(ValueError, match="page fetch failed"):
+        await Stream.of(_Cursor(10, fail_at=3)).prefetch(2).for_each(seen.append)
+    # then
+    assert seen == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_an_exception_can_still_be_an_element() -> None:
+    # given
+    error = ValueError("an element")
+
+    async def source():
+        yield error
+
+    # when
+    it = await Stream.of(source()).prefetch(1).collect(to_list())
+
+    # then
+    assert it == [error]
+
+
+@pytest.mark.asyncio
+async def test_an_iterator_pulled_past_its_end_stays_ended() -> None:
+    # given
+    it = Stream.of(_Cursor(1)).prefetch(1).iterator()
+    # when
+    first = [x async for x in it]
+    again = [x async for x in it]
+    # then
+    assert (first, again) == ([0], [])
+
+
+@pytest.mark.asyncio
+async def test_racing_branches_share_the_prefetched_source() -> None:
+    # when
+    it = await Stream.of(_Cursor(40)).prefetch(4).parallel().map(_slow_work).collect(to_list())
+    # then
+    assert sorted(it) == list(range(40))
+
+
+def test_a_sync_source_is_left_as_it_is() -> None:
+    assert isinstance(Stream.of([1, 2, 3]).prefetch(2)._stream, SyncSource)
+
+
+def test_prefetch_needs_room_for_an_element() -> None:
+    with pytest.raises(StreamBuildException):
+        Stream.of(_Cursor(1)).prefetch(0)
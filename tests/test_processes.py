@@ -0,0 +1,118 @@
+"""Covers .parallel(processes=N): the leading map/filter/peek ops running in a
+pool of worker processes. Every callable handed to an offloaded op is defined
+at module level, since a worker can only receive what pickle can carry."""
+
+import asyncio
+
+import pytest
+
+from snakestream import Stream
+from snakestream.collector import to_list
+from snakestream.exception import StreamBuildException
+from snakestream.execution import Processes, _run_chunk
+from snakestream.ops import _FilterOp, _MapOp
+
+
+def square(x: int) -> int:
+    return x * x
+
+
+def is_even(x: int) -> bool:
+    return x % 2 == 0
+
+
+async def async_double(x: int) -> int:
+    await asyncio.sleep(0)
+    return x * 2
+
+
+def explode(x: int) -> int:
+    if x == 7:
+        raise ValueError("boom")
+    return x
+
+
+@pytest.mark.asyncio
+async def test_processes_preserves_encounter_order() -> None:
+    # when
+    it = await Stream.of(list(range(200))).parallel(processes=2).map(square).collect(to_list())
+    # then
+    assert it == [x * x for x in range(200)]
+
+
+@pytest.mark.asyncio
+async def test_processes_runs_filter_and_map_in_workers() -> None:
+    # when
+    it = await Stream.of(list(range(50))).filter(is_even).map(square).parallel(processes=2).collect(to_list())
+    # then
+    assert it == [x * x for x in range(50) if x % 2 == 0]
+
+
+@pytest.mark.asyncio
+async def test_processes_dispatches_an_async_mapper_in_the_worker() -> None:
+    # when
+    it = await Stream.of([1, 2, 3]).parallel(processes=2).map(async_double).collect(to_list())
+    # then
+    assert it == [2, 4, 6]
+
+
+@pytest.mark.asyncio
+async def test_processes_runs_the_rest_of_the_chain_in_this_process() -> None:
+    # given: distinct() is stateful and a lambda is not picklable, so both have
+    # to stay behind in the parent once the offloadable prefix ends
+    source = [3, 1, 3, 2, 1]
+
+    # when
+    it = await Stream.of(source).parallel(processes=2).map(square).distinct().map(lambda x: -x).collect(to_list())
+
+    # then
+    assert it == [-9, -1, -4]
+
+
+@pytest.mark.asyncio
+async def test_processes_with_no_offloadable_prefix_still_runs_the_chain() -> None:
+    # when
+    it = await Stream.of([3, 1, 2]).parallel(processes=2).sorted().map(lambda x: x + 1).collect(to_list())
+    # then
+    assert it == [2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_processes_limit_stops_pulling_an_infinite_source() -> None:
+    # when
+    it = await Stream.iterate(0, lambda n: n + 1).parallel(processes=2).map(square).limit(5).collect(to_list())
+    # then
+    assert it == [0, 1, 4, 9, 16]
+
+
+@pytest.mark.asyncio
+async def test_processes_rejects_an_unpicklable_callable_up_front() -> None:
+    # when / then
+    with pytest.raises(StreamBuildException, match="cannot be pickled"):
+        await Stream.of([1, 2, 3]).parallel(processes=2).map(lambda x: x).collect(to_list())
+
+
+@pytest.mark.asyncio
+async def test_processes_propagates_a_worker_exception() -> None:
+    # when / then
+    with pytest.raises(ValueError, match="boom"):
+        await Stream.of(list(range(10))).parallel(processes=2).map(explode).collect(to_list())
+
+
+@pytest.mark.asyncio
+async def test_processes_reports_parallel() -> None:
+    assert Stream.of([1]).parallel(processes=2).is_parallel() is True
+
+
+def test_processes_rejects_a_worker_count_below_one() -> None:
+    with pytest.raises(ValueError):
+        Processes(0)
+    with pytest.raises(ValueError):
+        Processes(1, chunk_size=0)
+
+
+def test_a_chunk_runs_through_the_stages_own_sinks() -> None:
+    # when: the worker entry point, driven in this process
+    out = _run_chunk([_FilterOp(is_even), _MapOp(square)], [1, 2, 3, 4])
+    # then
+    assert out == [4, 16]
@@ -0,0 +1,151 @@
+"""Covers skip() and limit() at the head of a chain pushed down into a sync
+source: a sequence is indexed into rather than pulled through, and anything
+else is skipped through by islice(), with the same elements out either way."""
+
+import asyncio
+
+import pytest
+from hypothesis import given
+from hypothesis import strategies as st
+
+from snakestream import Stream
+from snakestream.collector import to_list
+
+
+class _Watched(list):
+    # a list that counts the elements read out of it
+    reads = 0
+
+    def __getitem__(self, i):
+        _Watched.reads += 1
+        return super().__getitem__(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+async def slowly(x):
+    await asyncio.sleep(0.001)
+    return x
+
+
+def _apply(stream: Stream, ops: list[tuple[str, int]]) -> Stream:
+    for name, n in ops:
+        stream = stream.skip(n) if name == "skip" else stream.limit(n)
+    return stream
+
+
+def _expected(values: list[int], ops: list[tuple[str, int]]) -> list[int]:
+    for name, n in ops:
+        n = max(n, 0)
+        values = values[n:] if name == "skip" else values[:n]
+    return values
+
+
+@pytest.mark.asyncio
+async def test_a_sequence_is_indexed_into_not_pulled_through() -> None:
+    # given
+    _Watched.reads = 0
+    big = _Watched(range(100_000))
+    # when
+    it = await Stream.of(big).skip(90_000).limit(10).map(lambda x: x * 2).collect(to_list())
+    # then
+    assert it == [x * 2 for x in range(90_000, 90_010)]
+    assert _Watched.reads == 10
+
+
+@given(
+    values=st.lists(st.integers(), max_size=30),
+    ops=st.lists(st.tuples(st.sampled_from(["skip", "limit"]), st.integers(min_value=-3, max_value=12)), max_size=4),
+)
+@pytest.mark.asyncio
+async def test_any_head_of_skips_and_limits_matches_slicing(values, ops) -> None:
+    # when
+    from_list = await _apply(Stream.of(values), ops).collect(to_list())
+    from_range = await _apply(Stream.of(range(len(values))), ops).collect(to_list())
+    from_iterator = await _apply(Stream.of(iter(values)), ops).collect(to_list())
+    # then
+    assert from_list == from_iterator == _expected(values, ops)
+    assert from_range == _expected(list(range(len(values))), ops)
+
+
+@pytest.mark.asyncio
+async def test_an_iterator_is_not_pulled_past_the_limit() -> None:
+    # given
+    source = iter(range(10))
+    # when
+    it = await Stream.of(source).skip(2).limit(3).collect(to_list())
+    # then
+    assert it == [2, 3, 4]
+    assert next(source) == 5
+
+
+@pytest.mark.asyncio
+async def test_only_the_head_is_pushed_down() -> None:
+    # given
+    calls = []
+
+    def mapper(x: int) -> int:
+        calls.append(x)
+        return x
+
+    # when
+    it = await Stream.of(list(range(10))).skip(2).map(mapper).skip(3).limit(2).collect(to_list())
+
+    # then: the mapper still sees what the later skip() drops
+    assert it == [5, 6]
+    assert calls == [2, 3, 4, 5, 6]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("terminal", ["collect", "for_each_ordered", "find_first", "iterator"])
+async def test_every_way_of_running_a_stream_pushes_down(terminal) -> None:
+    # given
+    _Watched.reads = 0
+    stream = Stream.of(_Watched(range(1000))).skip(500).limit(3)
+    got: list[int] = []
+
+    # when
+    if terminal == "collect":
+        got = await stream.collect(to_list())
+    elif terminal == "for_each_ordered":
+        await stream.for_each_ordered(got.append)
+    elif terminal == "find_first":
+        got = [await stream.find_first()]
+    else:
+        got = [x async for x in stream.iterator()]
+
+    # then
+    assert got == [500, 501, 502][: len(got)]
+    assert _Watched.reads == len(got)
+
+
+@pytest.mark.asyncio
+async def test_a_pushed_down_source_is_left_consumed() -> None:
+    # given
+    stream = Stream.of([1, 2, 3, 4]).skip(1)
+    # when
+    first = await stream.collect(to_list())
+    again = await stream.collect(to_list())
+    # then
+    assert (first, again) == ([2, 3, 4], [])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("parallel", [lambda s: s.parallel(), lambda s: s.parallel(ordered=True)])
+async def test_racing_branches_pull_from_the_narrowed_source(parallel) -> None:
+    # when
+    it = await parallel(Stream.of(list(range(100))).skip(90).limit(5)).map(slowly).collect(to_list())
+    # then
+    assert sorted(it) == [90, 91, 92, 93, 94]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("source", [list, iter])
+async def test_a_negative_skip_or_limit_is_taken_as_zero(source) -> None:
+    # when
+    limited = await Stream.of(source([1, 2, 3])).limit(-1).collect(to_list())
+    skipped = await Stream.of(source([1, 2, 3])).skip(-1).collect(to_list())
+    # then: not sliced from the end
+    assert (limited, skipped) == ([], [1, 2, 3])
@@ -7,6 +7,7 @@ from hypothesis import strategies as st
 
 from snakestream import Stream
 from snakestream.collector import to_list
+from snakestream.exception import StreamBuildException
 
 
 @pytest.mark.asyncio
@@ -129,3 +130,83 @@ async def test_sorted_rejects_async_bool_comparator() -> None:
     # when / then
     with pytest.raises(TypeError):
         await Stream.of(outset).sorted(comparator=async_compare).collect(to_list())
+
+
+class _CoroutineReturning:
+    """A plain `def __call__` returning a coroutine: classifies as sync, so
+    only a call finds out it has to be awaited."""
+
+    def __init__(self, fn) -> None:
+        self.fn = fn
+
+    def __call__(self, *args):
+        async def inner():
+            return self.fn(*args)
+
+        return inner()
+
+
+@pytest.mark.asyncio
+async def test_sorted_sync_comparator_never_reaches_merge_sort(mocker) -> None:
+    # given
+    mocker.patch("snakestream.sort.merge_sort", side_effect=AssertionError("merge_sort ran"))
+    # when
+    actual = await Stream.of([3, -1, 2, -3]).sorted(comparator=_compare_by_abs).collect(to_list())
+    # then: ties keep encounter order, as list.sort() does
+    assert actual == [-1, 2, 3, -3]
+
+
+@pytest.mark.asyncio
+async def test_sorted_comparator_found_async_by_the_probe() -> None:
+    # when
+    actual = await Stream.of([3, -1, 2, -3]).sorted(_CoroutineReturning(_compare_by_abs)).collect(to_list())
+    # then
+    assert actual == [-1, 2, 3, -3]
+
+
+@given(values=st.lists(st.integers()))
+@pytest.mark.asyncio
+async def test_sorted_key_matches_builtin_sorted(values: list[int]) -> None:
+    # when
+    actual = await Stream.of(values).sorted(key=abs).collect(to_list())
+    backwards = await Stream.of(values).sorted(reverse=True, key=abs).collect(to_list())
+
+    # then: reverse is the stable ascending order reversed, as without a key
+    assert actual == sorted(values, key=abs)
+    assert backwards == sorted(values, key=abs)[::-1]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("limit", [None, 2])
+async def test_sorted_key_calls_an_async_key_once_per_element(limit) -> None:
+    # given
+    calls: list[int] = []
+
+    async def key(x: int) -> int:
+        calls.append(x)
+        await asyncio.sleep(0)
+        return abs(x)
+
+    stream = Stream.of([3, -1, 2, -3]).sorted(key=key)
+
+    # when
+    actual = await (stream if limit is None else stream.limit(limit)).collect(to_list())
+
+    # then
+    assert actual == [-1, 2, 3, -3][:limit]
+    assert sorted(calls) == [-3, -1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_sorted_key_found_async_at_its_first_call() -> None:
+    # when
+    whole = await Stream.of([3, -1, 2, -3]).sorted(key=_CoroutineReturning(abs)).collect(to_list())
+    top = await Stream.of([3, -1, 2, -3]).sorted(key=_CoroutineReturning(abs)).limit(3).collect(to_list())
+    # then
+    assert whole == [-1, 2, 3, -3]
+    assert top == [-1, 2, 3]
+
+
+def test_sorted_rejects_both_a_comparator_and_a_key() -> None:
+    with pytest.raises(StreamBuildException):
+        Stream.of([1]).sorted(_compare_by_abs, key=abs)
@@ -0,0 +1,241 @@
+"""Covers the sync-first drive of a sequential terminal over a sync source:
+accept_sync() down the chain while no callable needs an await, and accept()
+from the first element one does, with every element processed exactly once."""
+
+import asyncio
+from collections.abc import AsyncGenerator, Callable
+from typing import Any
+
+import pytest
+
+from snakestream import Stream
+from snakestream.collector import Collector, averaging_int, summarizing_int, to_list
+from snakestream.ops import _FusedSink, _LimitOp, _MapSink
+from snakestream.sink import Counter, IntermediateSink, StatelessOp
+from snakestream.source import SyncSource
+from snakestream.terminals import _FindSink, _MatchSink
+
+
+class _Recording:
+    """A plain `def __call__` that returns a coroutine, so it classifies as sync
+    and is only found out by the one-time isawaitable() check. Records every
+    element it is called with."""
+
+    def __init__(self, fn: Callable[..., Any]) -> None:
+        self.fn = fn
+        self.calls: list[Any] = []
+
+    def __call__(self, *args: Any):
+        self.calls.append(args)
+        return self._run(*args)
+
+    async def _run(self, *args: Any) -> Any:
+        await asyncio.sleep(0)
+        return self.fn(*args)
+
+
+async def _async_source(items: list[int]) -> AsyncGenerator[int, None]:
+    for i in items:
+        yield i
+
+
+class _PassThroughSink(IntermediateSink[Any]):
+    """A sink written against the async protocol only, as a third party would."""
+
+    async def accept(self, element: Any) -> None:
+        await self.downstream.accept(element)
+
+
+class _PassThroughOp(StatelessOp):
+    _sink_cls = _PassThroughSink
+
+
+@pytest.mark.asyncio
+async def test_a_sync_chain_never_awaits_an_intermediate_accept(mocker) -> None:
+    # given: the async accept() of map's sink, alone or fused, is off limits
+    mocker.patch.object(_MapSink, "accept", side_effect=AssertionError("async path taken"))
+    mocker.patch.object(_FusedSink, "accept", side_effect=AssertionError("async path taken"))
+
+    # when
+    single = await Stream.of([1, 2, 3]).map(lambda x: x + 1).collect(to_list())
+    fused = await Stream.of([1, 2, 3]).map(lambda x: x + 1).filter(lambda x: x > 2).collect(to_list())
+
+    # then
+    assert single == [2, 3, 4]
+    assert fused == [3, 4]
+
+
+@pytest.mark.parametrize(
+    "build, expected",
+    [
+        (lambda s, f: s.map(_Recording(f)).collect(to_list()), [2, 4, 6, 8]),
+        (lambda s, f: s.filter(_Recording(lambda x: x % 2 == 1)).collect(to_list()), [1, 3]),
+        (lambda s, f: s.peek(_Recording(f)).collect(to_list()), [1, 2, 3, 4]),
+        (lambda s, f: s.for_each(_Recording(f)), None),
+        (lambda s, f: s.reduce(0, _Recording(lambda a, b: a + b)), 10),
+        (lambda s, f: s.reduce(_Recording(lambda a, b: a + b)), 10),
+        (lambda s, f: s.max(_Recording(lambda a, b: (a > b) - (a < b))), 4),
+        (lambda s, f: s.any_match(_Recording(lambda x: x == 1)), True),
+        (lambda s, f: s.collect(list, _Recording(lambda c, x: c.append(x)), lambda a, b: a), [1, 2, 3, 4]),
+        (lambda s, f: s.collect(Collector(list, _Recording(lambda c, x: c.append(x)))), [1, 2, 3, 4]),
+        (lambda s, f: s.collect(averaging_int(_Recording(f))), 5.0),
+    ],
+)
+@pytest.mark.asyncio
+@pytest.mark.parametrize("source", [list, _async_source])
+async def test_a_callable_found_async_at_the_first_element_still_gives_the_same_result(build, expected, source) -> None:
+    # when: over a list the drive starts sync and switches at element one;
+    # over an async generator it is async from the start
+    it = await build(Stream.of(source([1, 2, 3, 4])), lambda x: x * 2)
+    # then
+    assert it == expected
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("source", [list, _async_source])
+async def test_summarizing_with_a_callable_found_async_matches_the_sync_result(source) -> None:
+    # when
+    it = await Stream.of(source([1, 2, 3, 4])).collect(summarizing_int(_Recording(lambda x: x * 2)))
+    # then
+    assert it == await Stream.of([1, 2, 3, 4]).collect(summarizing_int(lambda x: x * 2))
+
+
+@pytest.mark.asyncio
+async def test_switching_to_async_mid_chain_runs_each_callable_once_per_element() -> None:
+    # given: a sync mapper upstream of a callable that turns out to be async
+    seen: list[int] = []
+
+    def record(x: int) -> int:
+        seen.append(x)
+        return x
+
+    double = _Recording(lambda x: x * 2)
+
+    # when
+    it = await Stream.of([1, 2, 3]).map(record).map(double).map(record).collect(to_list())
+
+    # then: the element that tripped the switch was not run through `record` twice
+    assert it == [2, 4, 6]
+    assert seen == [1, 2, 2, 4, 3, 6]
+    assert double.calls == [(1,), (2,), (3,)]
+
+
+@pytest.mark.asyncio
+async def test_a_sink_without_accept_sync_turns_the_drive_async() -> None:
+    # when
+    it = await Stream.of([1, 2, 3])._derive(_PassThroughOp()).map(lambda x: x + 1).collect(to_list())  # type: ignore[attr-defined]
+    # then
+    assert it == [2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_cancellation_ends_the_sync_drive_over_an_infinite_source() -> None:
+    # given
+    def naturals():
+        n = 0
+        while True:
+            yield n
+            n += 1
+
+    # when / then
+    assert await Stream.of(naturals()).map(lambda x: x * 2).limit(3).collect(to_list()) == [0, 2, 4]
+    assert await Stream.of(naturals()).find_first() == 0
+    assert await Stream.of(naturals()).any_match(lambda x: x == 5) is True
+
+
+@pytest.mark.asyncio
+async def test_cancellation_after_the_switch_ends_the_async_drive() -> None:
+    # given
+    def naturals():
+        n = 0
+        while True:
+            yield n
+            n += 1
+
+    # when
+    it = await Stream.of(naturals()).map(_Recording(lambda x: x + 1)).limit(3).collect(to_list())
+    first = await Stream.of(naturals()).filter(_Recording(lambda x: x > 4)).limit(1).collect(to_list())
+
+    # then
+    assert it == [1, 2, 3]
+    assert first == [5]
+
+
+@pytest.mark.asyncio
+async def test_sinks_past_their_cancellation_ignore_further_sync_elements() -> None:
+    # given: a driver other than the sequential one may still push after
+    # cancellation, e.g. a racing branch whose shared limit another branch filled
+    found = _FindSink()
+    matched = _MatchSink(lambda x: x > 0, True, False)
+    op = _LimitOp(1)
+    limited = op.link(_FindSink())
+    full = Counter()
+    full.value = 1
+    await found.begin({})
+    await matched.begin({})
+    await limited.begin({op: full})
+
+    # when
+    for sink in (found, matched):
+        sink.accept_sync(1)
+        sink.accept_sync(-1)
+    limited.accept_sync(1)
+    await found.end()
+    await matched.end()
+
+    # then
+    assert found.result() == 1
+    assert matched.result() is True
+    assert limited.cancellation_requested() is True
+
+
+class _NextOnly:
+    # __next__ and no __iter__
+    def __init__(self, n: int) -> None:
+        self.left = n
+
+    def __next__(self) -> int:
+        if not self.left:
+            raise StopIteration
+        self.left -= 1
+        return self.left
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "source, expected",
+    [
+        ([1, 2, 3], [1, 2, 3]),
+        (range(3), [0, 1, 2]),
+        (iter((1, 2)), [1, 2]),
+        (_NextOnly(2), [1, 0]),
+        ("ab", ["ab"]),
+        (7, [7]),
+    ],
+)
+async def test_no_sync_source_is_pulled_through_an_await(mocker, source, expected) -> None:
+    # given
+    mocker.patch.object(SyncSource, "__anext__", side_effect=AssertionError("awaited a sync source"))
+    # when
+    it = await Stream.of(source).map(lambda x: x).collect(to_list())
+    # then
+    assert it == expected
+
+
+@pytest.mark.asyncio
+async def test_an_iterator_over_a_sync_source_pulls_no_further_than_asked(mocker) -> None:
+    # given
+    mocker.patch.object(SyncSource, "__anext__", side_effect=AssertionError("awaited a sync source"))
+    pulled = []
+
+    def source():
+        for i in range(10):
+            pulled.append(i)
+            yield i
+
+    # when
+    it = [x async for x in Stream.of(source()).map(lambda x: x * 2).limit(2).iterator()]
+
+    # then
+    assert it == [0, 2]
+    assert pulled == [0, 1]
@@ -0,0 +1,230 @@
+"""Covers one source feeding several consumers in one pass: collect_all() into
+several collectors, and tee() into several streams that share a bounded
+buffer, closing the source with the last of them."""
+
+import asyncio
+
+import pytest
+
+from snakestream import Stream
+from snakestream.collector import Collector, counting, grouping_by, summarizing_double, to_generator, to_list
+from snakestream.exception import IllegalStateException, StreamBuildException
+
+
+class _Expensive:
+    """An async source that records how many times it was read through, and
+    whether it was closed."""
+
+    def __init__(self, n: int, fail_at: int | None = None) -> None:
+        self.n = n
+        self.fail_at = fail_at
+        self.reads = 0
+        self.closed = False
+
+    async def rows(self):
+        self.reads += 1
+        try:
+            for i in range(self.n):
+                if i == self.fail_at:
+                    raise ValueError("read failed")
+                await asyncio.sleep(0)
+                yield i
+        finally:
+            self.closed = True
+
+
+def _leftover_tasks() -> set:
+    return {t for t in asyncio.all_tasks() if t is not asyncio.current_task()}
+
+
+@pytest.mark.asyncio
+async def test_collect_all_reads_the_source_once() -> None:
+    # given
+    source = _Expensive(10)
+    # when
+    count, summary, groups = await Stream.of(source.rows()).collect_all(
+        counting(), summarizing_double(float), grouping_by(lambda x: x % 2)
+    )
+    # then
+    assert count == 10
+    assert (summary.count, summary.sum, summary.min, summary.max) == (10, 45.0, 0.0, 9.0)
+    assert groups == {0: [0, 2, 4, 6, 8], 1: [1, 3, 5, 7, 9]}
+    assert source.reads == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "build",
+    [
+        lambda s: s,
+        lambda s: s.map(lambda x: x * 2).filter(lambda x: x % 3),
+        lambda s: s.batched(4),
+        lambda s: s.parallel(),
+    ],
+)
+async def test_collect_all_gives_what_each_collect_would(build) -> None:
+    # given
+    async def add_later(acc: list, x: int) -> None:
+        await asyncio.sleep(0)
+        acc.append(x)
+
+    collectors = [to_list(), Collector(list, add_later), counting()]
+
+    # when
+    together = await build(Stream.of(list(range(20)))).collect_all(*collectors)
+    apart = [await build(Stream.of(list(range(20)))).collect(c) for c in collectors]
+
+    # then
+    assert sorted(together[0]) == sorted(apart[0])
+    assert sorted(together[1]) == sorted(apart[1])
+    assert together[2] == apart[2]
+
+
+@pytest.mark.asyncio
+async def test_collect_all_of_an_async_collector_between_sync_ones() -> None:
+    # given: the async one found out on the first element, in the middle
+    async def add_later(acc: list, x: int) -> None:
+        acc.append(x)
+
+    # when
+    it = await Stream.of([1, 2, 3]).collect_all(to_list(), Collector(list, add_later), to_list())
+
+    # then
+    assert it == ([1, 2, 3], [1, 2, 3], [1, 2, 3])
+
+
+@pytest.mark.asyncio
+async def test_collect_all_takes_only_collectors() -> None:
+    with pytest.raises(StreamBuildException):
+        Stream.of([1]).collect_all(to_list(), to_generator)  # type: ignore[arg-type]
+    assert await Stream.of([1]).collect_all() == ()
+
+
+@pytest.mark.asyncio
+async def test_tee_branches_each_see_every_element() -> None:
+    # given
+    source = _Expensive(50)
+    a, b, c = Stream.of(source.rows()).map(lambda x: x * 2).tee(3, buffer=4)
+
+    # when
+    total, evens, first = await asyncio.gather(
+        a.count(), b.filter(lambda x: x % 4 == 0).collect(to_list()), c.limit(3).collect(to_list())
+    )
+
+    # then
+    assert total == 50
+    assert evens == list(range(0, 100, 4))
+    assert first == [0, 2, 4]
+    assert source.reads == 1
+    assert source.closed
+    assert _leftover_tasks() == set()
+
+
+@pytest.mark.asyncio
+async def test_a_branch_runs_no_more_than_the_buffer_ahead() -> None:
+    # given
+    fast, slow = Stream.of(range(100)).tee(2, buffer=5)
+    seen = {"fast": 0, "slow": 0}
+    ahead = []
+
+    async def take(name: str, delay: float) -> None:
+        async for _ in fast.iterator() if name == "fast" else slow.iterator():
+            seen[name] += 1
+            ahead.append(seen["fast"] - seen["slow"])
+            await asyncio.sleep(delay)
+
+    # when
+    await asyncio.gather(take("fast", 0), take("slow", 0.001))
+
+    # then: five buffered for the slow one, and one more taken from the queue
+    assert seen == {"fast": 100, "slow": 100}
+    assert max(ahead) <= 5 + 1
+
+
+@pytest.mark.asyncio
+async def test_a_closed_branch_no_longer_holds_the_others_back() -> None:
+    # given
+    source = _Expensive(1000)
+    quitter, stayer = Stream.of(source.rows()).tee(2, buffer=2)
+    # when
+    first = await quitter.find_first()
+    rest = await stayer.count()
+    # then
+    assert (first, rest) == (0, 1000)
+    assert source.closed
+
+
+@pytest.mark.asyncio
+async def test_a_failing_source_fails_every_branch_after_what_came_before() -> None:
+    # given
+    source = _Expensive(10, fail_at=3)
+    a, b = Stream.of(source.rows()).tee(2)
+    seen_a: list[int] = []
+    seen_b: list[int] = []
+
+    # when
+    results = await asyncio.gather(a.for_each(seen_a.append), b.for_each(seen_b.append), return_exceptions=True)
+
+    # then
+    assert [type(r) for r in results] == [ValueError, ValueError]
+    assert seen_a == seen_b == [0, 1, 2]
+    assert source.closed
+
+
+@pytest.mark.asyncio
+async def test_a_branch_closed_with_elements_left_lets_the_others_on() -> None:
+    # given
+    source = _Expensive(20)
+    ahead, behind = Stream.of(source.rows()).tee(2, buffer=3)
+    it = ahead.iterator()
+    # when: three wait for the branch behind, which takes one and stops
+    taken = [await it.__anext__() for _ in range(3)]
+    first = await behind.find_first()
+    rest = [x async for x in it]
+    # then
+    assert (taken, first, rest) == ([0, 1, 2], 0, list(range(3, 20)))
+    assert source.closed
+
+
+@pytest.mark.asyncio
+async def test_a_branch_pulled_past_its_end_or_closed_twice_stays_ended() -> None:
+    # given
+    (only,) = Stream.of([1, 2]).tee(1)
+    branch = only._stream
+    # when
+    first = [x async for x in branch]
+    again = [x async for x in branch]
+    await branch.aclose()
+    await branch.aclose()
+    # then
+    assert (first, again) == ([1, 2], [])
+
+
+def test_tee_consumes_the_stream_and_checks_its_arguments() -> None:
+    # given
+    stream = Stream.of([1])
+    # when
+    stream.tee()
+    # then
+    with pytest.raises(IllegalStateException):
+        stream.tee()
+    with pytest.raises(StreamBuildException):
+        Stream.of([1]).tee(0)
+    with pytest.raises(StreamBuildException):
+        Stream.of([1]).tee(2, buffer=0)
+
+
+@pytest.mark.asyncio
+async def test_a_branch_consumed_alone_past_the_buffer_fails_every_branch() -> None:
+    # given
+    source = _Expensive(10)
+    a, b = Stream.of(source.rows()).tee(2, buffer=3)
+    # when: a cannot end until b is pulled, and b not until a is done
+    with pytest.raises(IllegalStateException):
+        await a.collect(to_list())
+    # then: b gets what was buffered for it, then the same failure
+    seen: list[int] = []
+    with pytest.raises(IllegalStateException):
+        await b.for_each(seen.append)
+    assert seen == [0, 1, 2]
+    assert source.closed
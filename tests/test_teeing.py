@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from snakestream.collector import (
+    Collector,
+    averaging_int,
+    counting,
+    grouping_by,
+    max_by,
+    min_by,
+    teeing,
+    to_generator,
+    to_list,
+)
+from snakestream.exception import StreamBuildException
+from snakestream.stream import Stream
+
+
+async def _async_append(acc: list, x: int) -> None:
+    await asyncio.sleep(0)
+    acc.append(x)
+
+
+async def _async_merger(*results):
+    return tuple(reversed(results))
+
+
+def _compare(a: int, b: int) -> int:
+    return a - b
+
+
+@pytest.mark.asyncio
+async def test_teeing_merges_two_downstreams() -> None:
+    # when
+    result = await Stream.of([3, 1, 4, 1, 5]).collect(teeing(counting(), averaging_int(lambda x: x), lambda n, avg: (n, avg)))
+
+    # then
+    assert result == (5, 2.8)
+
+
+@pytest.mark.asyncio
+async def test_teeing_generalises_to_any_number_of_downstreams() -> None:
+    # when
+    report = await Stream.of([3, 1, 4, 1, 5]).collect(
+        teeing(min_by(_compare), max_by(_compare), counting(), lambda lo, hi, n: {"min": lo, "max": hi, "count": n})
+    )
+
+    # then
+    assert report == {"min": 1, "max": 5, "count": 5}
+
+
+@pytest.mark.asyncio
+async def test_teeing_reads_the_source_once() -> None:
+    # given
+    reads = []
+
+    async def source():
+        reads.append(True)
+        for i in range(4):
+            yield i
+
+    # when
+    result = await Stream.of(source()).collect(teeing(to_list(), counting(), lambda xs, n: (xs, n)))
+
+    # then
+    assert result == ([0, 1, 2, 3], 4)
+    assert reads == [True]
+
+
+@pytest.mark.asyncio
+async def test_teeing_mixes_sync_and_async_parts() -> None:
+    # given
+    collectors = [to_list(), Collector(list, _async_append), grouping_by(lambda x: x % 2)]
+    # when
+    result = await Stream.of([1, 2, 3]).collect(teeing(*collectors, _async_merger))
+    # then
+    assert result == ({1: [1, 3], 0: [2]}, [1, 2, 3], [1, 2, 3])
+
+
+@pytest.mark.asyncio
+async def test_teeing_of_an_empty_stream_still_merges() -> None:
+    # when
+    result = await Stream.of([]).collect(teeing(counting(), to_list(), lambda n, xs: (n, xs)))
+    # then
+    assert result == (0, [])
+
+
+@pytest.mark.asyncio
+async def test_teeing_under_parallel() -> None:
+    # when
+    n, total = await Stream.of(list(range(100))).parallel().collect(teeing(counting(), to_list(), lambda n, xs: (n, sum(xs))))
+    # then
+    assert (n, total) == (100, 4950)
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        (),
+        (lambda: None,),
+        (to_list(),),
+        (to_generator, tuple),
+        (to_list(), counting()),
+        (to_list(), "not callable"),
+    ],
+)
+def test_teeing_rejects_what_is_not_downstreams_and_a_merger(args) -> None:
+    with pytest.raises(StreamBuildException):
+        teeing(*args)
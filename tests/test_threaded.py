@@ -0,0 +1,112 @@
+"""Covers .parallel(threads=N): racing branches whose sync callables run on a
+bounded thread pool instead of blocking the event loop."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from snakestream import Stream
+from snakestream.collector import to_list
+from snakestream.exception import StreamBuildException
+from snakestream.execution import Threaded
+
+
+@pytest.mark.asyncio
+async def test_threaded_overlaps_blocking_sync_mappers() -> None:
+    # given: a mapper that blocks the calling thread outright
+    def blocking(x: int) -> int:
+        time.sleep(0.1)
+        return x
+
+    # when
+    started = time.time()
+    it = await Stream.of(list(range(8))).parallel(threads=4).map(blocking).collect(to_list())
+    elapsed = time.time() - started
+
+    # then: 8 * 0.1s would be the serialized time; four threads overlap it
+    assert sorted(it) == list(range(8))
+    assert elapsed < 0.35
+
+
+@pytest.mark.asyncio
+async def test_plain_racing_serializes_blocking_sync_mappers() -> None:
+    # given: the same blocking mapper, as the contrast for the test above
+    def blocking(x: int) -> int:
+        time.sleep(0.05)
+        return x
+
+    # when
+    started = time.time()
+    await Stream.of(list(range(4))).parallel().map(blocking).collect(to_list())
+    elapsed = time.time() - started
+
+    # then: the event loop itself was blocked, so the branches took turns
+    assert elapsed >= 0.2
+
+
+@pytest.mark.asyncio
+async def test_threaded_runs_sync_callables_off_the_loop_and_async_ones_on_it() -> None:
+    # given
+    loop_thread = threading.current_thread()
+    sync_threads: list[threading.Thread] = []
+    async_threads: list[threading.Thread] = []
+
+    def keep(x: int) -> bool:
+        sync_threads.append(threading.current_thread())
+        return x % 2 == 0
+
+    async def double(x: int) -> int:
+        async_threads.append(threading.current_thread())
+        await asyncio.sleep(0)
+        return x * 2
+
+    # when
+    it = await Stream.of(list(range(10))).parallel(threads=2).filter(keep).map(double).collect(to_list())
+
+    # then
+    assert sorted(it) == [0, 4, 8, 12, 16]
+    assert sync_threads and all(t is not loop_thread for t in sync_threads)
+    assert async_threads and all(t is loop_thread for t in async_threads)
+
+
+@pytest.mark.asyncio
+async def test_threaded_awaits_a_sync_callable_that_returns_an_awaitable() -> None:
+    # given: a plain def __call__ returning a coroutine classifies as sync, so
+    # it runs in a thread, but its result still has to be awaited
+    class Wrapper:
+        def __call__(self, x: int):
+            async def inner() -> int:
+                return x + 1
+
+            return inner()
+
+    # when
+    it = await Stream.of([1, 2, 3]).parallel(threads=2).map(Wrapper()).collect(to_list())
+
+    # then
+    assert sorted(it) == [2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_threaded_limit_stops_an_infinite_source() -> None:
+    # when
+    it = await Stream.iterate(0, lambda n: n + 1).parallel(threads=2).map(lambda x: x).limit(5).collect(to_list())
+    # then
+    assert len(it) == 5
+
+
+@pytest.mark.asyncio
+async def test_threaded_reports_parallel() -> None:
+    assert Stream.of([1]).parallel(threads=2).is_parallel() is True
+
+
+def test_parallel_rejects_both_processes_and_threads() -> None:
+    with pytest.raises(StreamBuildException):
+        Stream.of([1]).parallel(processes=2, threads=2)
+
+
+def test_threaded_rejects_a_worker_count_below_one() -> None:
+    with pytest.raises(ValueError):
+        Threaded(0)
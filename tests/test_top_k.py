@@ -0,0 +1,199 @@
+"""Covers the compile step's rewrite of sorted().limit(k), and sorted() before
+find_first(), into a top-k sink holding k elements: same elements, same order,
+ties included, as the full sort it replaces."""
+
+import asyncio
+import random
+
+import pytest
+
+from snakestream import Stream
+from snakestream.collector import to_list
+from snakestream.execution import TOP_K_MAX, _compile
+from snakestream.ops import _LimitOp, _MapOp, _SortedOp, _SortedSink, _TopKOp, _TopKSink
+
+
+def by_rank(a: tuple[int, str], b: tuple[int, str]) -> int:
+    return (a[0] > b[0]) - (a[0] < b[0])
+
+
+async def async_by_rank(a: tuple[int, str], b: tuple[int, str]) -> int:
+    await asyncio.sleep(0)
+    return by_rank(a, b)
+
+
+class _LateAsync:
+    """A plain `def __call__` returning a coroutine: classifies as sync and is
+    only found out at its first result, which is mid-search."""
+
+    def __call__(self, a: tuple[int, str], b: tuple[int, str]):
+        return async_by_rank(a, b)
+
+
+def _expected(data: list, k: int, reverse: bool) -> list:
+    ascending = sorted(data, key=lambda t: t[0])
+    return (ascending[::-1] if reverse else ascending)[:k]
+
+
+# ranks drawn from a small range, so that most elements tie with another and
+# the tag records which of them came first
+_RNG = random.Random(7)
+_DATA = [(_RNG.randrange(6), f"#{i}") for i in range(60)]
+
+
+async def _async_source(items: list):
+    for i in items:
+        yield i
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("k", [1, 3, 10, 60, 75])
+@pytest.mark.parametrize("reverse", [False, True])
+@pytest.mark.parametrize("comparator", [by_rank, async_by_rank, _LateAsync()])
+@pytest.mark.parametrize("source", [list, _async_source])
+async def test_top_k_matches_the_full_sort_ties_and_all(source, comparator, reverse, k) -> None:
+    # when
+    it = await Stream.of(source(_DATA)).sorted(comparator, reverse).limit(k).collect(to_list())
+    # then
+    assert it == _expected(_DATA, k, reverse)
+
+
+def rank(t: tuple[int, str]) -> int:
+    return t[0]
+
+
+async def async_rank(t: tuple[int, str]) -> int:
+    await asyncio.sleep(0)
+    return t[0]
+
+
+class _LateAsyncKey:
+    def __call__(self, t: tuple[int, str]):
+        return async_rank(t)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("k", [1, 10, 75])
+@pytest.mark.parametrize("reverse", [False, True])
+@pytest.mark.parametrize("key", [rank, async_rank, _LateAsyncKey()])
+@pytest.mark.parametrize("source", [list, _async_source])
+async def test_top_k_by_key_matches_the_full_sort(source, key, reverse, k) -> None:
+    # when
+    it = await Stream.of(source(_DATA)).sorted(reverse=reverse, key=key).limit(k).collect(to_list())
+    batched = await Stream.of(_DATA).batched(8).sorted(reverse=reverse, key=key).limit(k).collect(to_list())
+    # then
+    assert it == _expected(_DATA, k, reverse)
+    assert batched == it
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("reverse", [False, True])
+@pytest.mark.parametrize("source", [list, _async_source])
+async def test_top_k_in_natural_order(source, reverse) -> None:
+    # given
+    data = [_RNG.randrange(1000) for _ in range(500)]
+    # when
+    it = await Stream.of(source(data)).sorted(reverse=reverse).limit(7).collect(to_list())
+    # then
+    assert it == sorted(data, reverse=reverse)[:7]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("reverse", [False, True])
+@pytest.mark.parametrize("comparator", [by_rank, async_by_rank, _LateAsync()])
+async def test_top_k_batched_matches_unbatched(comparator, reverse) -> None:
+    # when
+    it = await Stream.of(_DATA).batched(8).sorted(comparator, reverse).limit(5).collect(to_list())
+    # then
+    assert it == _expected(_DATA, 5, reverse)
+
+
+@pytest.mark.asyncio
+async def test_sorted_then_find_first_never_buffers_the_stream(mocker) -> None:
+    # given
+    mocker.patch.object(_SortedSink, "end", side_effect=AssertionError("full sort ran"))
+    # when
+    first = await Stream.of(_DATA).sorted(by_rank).find_first()
+    last = await Stream.of(_DATA).sorted(by_rank, reverse=True).find_first()
+    # then
+    assert first == _expected(_DATA, 1, False)[0]
+    assert last == _expected(_DATA, 1, True)[0]
+
+
+@pytest.mark.asyncio
+async def test_a_later_smaller_limit_stops_the_flush() -> None:
+    # when
+    it = await Stream.of(_DATA).sorted(by_rank).limit(10).limit(2).collect(to_list())
+    # then
+    assert it == _expected(_DATA, 2, False)
+
+
+@pytest.mark.asyncio
+async def test_one_comparison_drops_an_element_that_cannot_displace_the_kept() -> None:
+    # given: ascending input, so every element after the first k sorts last
+    calls = 0
+
+    def counting(a: int, b: int) -> int:
+        nonlocal calls
+        calls += 1
+        return a - b
+
+    # when
+    it = await Stream.of(list(range(1000))).sorted(counting).limit(3).collect(to_list())
+
+    # then
+    assert it == [0, 1, 2]
+    assert calls < 1000 + 10
+
+
+@pytest.mark.asyncio
+async def test_the_sink_holds_at_most_k_elements() -> None:
+    # given
+    seen: list[int] = []
+    sink = _TopKSink(_Collecting(seen), None, False, None, 4)
+    await sink.begin({})
+
+    # when / then
+    for i in range(100, 0, -1):
+        sink.accept_sync(i)
+        assert len(sink._kept) <= 4
+    await sink.end()
+    assert seen == [1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_a_comparator_returning_a_non_int_is_rejected() -> None:
+    with pytest.raises(TypeError, match="comparator must return an int"):
+        await Stream.of([3, 1, 2]).sorted(lambda a, b: a < b).limit(2).collect(to_list())
+
+
+def test_compile_rewrites_only_a_sorted_directly_before_a_bounded_limit() -> None:
+    # given
+    def kinds(chain: list) -> list[type]:
+        return [type(op) for op in _compile(chain)]
+
+    # then
+    assert kinds([_SortedOp(None, False, None, None, 1), _LimitOp(3)]) == [_TopKOp, _LimitOp]
+    assert kinds([_SortedOp(None, False, None, None, 1), _LimitOp(0)]) == [_SortedOp, _LimitOp]
+    assert kinds([_SortedOp(None, False, None, None, 1), _LimitOp(TOP_K_MAX + 1)]) == [_SortedOp, _LimitOp]
+    assert kinds([_SortedOp(None, False, None, None, 1), _MapOp(abs), _LimitOp(3)]) == [_SortedOp, _MapOp, _LimitOp]
+    assert kinds([_LimitOp(3), _SortedOp(None, False, None, None, 1)]) == [_LimitOp, _SortedOp]
+
+
+class _Collecting:
+    """Just enough of a downstream sink to see what a sink under test pushes."""
+
+    def __init__(self, into: list) -> None:
+        self.into = into
+
+    async def begin(self, state_map) -> None:
+        pass
+
+    async def accept(self, element) -> None:
+        self.into.append(element)
+
+    def cancellation_requested(self) -> bool:
+        return False
+
+    async def end(self) -> None:
+        pass